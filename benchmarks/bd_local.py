@@ -0,0 +1,82 @@
+"""
+BD temporal para benchmarks y pruebas manuales, sin Docker.
+
+- postgres: crea un cluster con initdb en un directorio temporal y lo arranca
+  con pg_ctl en un puerto libre (solo por 127.0.0.1). Busca los binarios en
+  PG_BIN o en el PATH; al salir para el servidor y borra el directorio.
+- sqlite: un fichero en un directorio temporal.
+- auto: postgres si hay binarios, si no sqlite.
+
+Uso:
+    with bd_temporal("auto") as url:
+        os.environ["DATABASE_URL"] = url
+"""
+import contextlib
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional
+
+MOTORES = ("auto", "sqlite", "postgres")
+
+
+def binario_postgres(nombre: str) -> Optional[str]:
+    pg_bin = os.getenv("PG_BIN")
+    if pg_bin:
+        ruta = Path(pg_bin) / nombre
+        return str(ruta) if ruta.exists() else None
+    return shutil.which(nombre)
+
+
+def hay_postgres() -> bool:
+    return all(binario_postgres(b) for b in ("initdb", "pg_ctl"))
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def _postgres(tmp: Path) -> Iterator[str]:
+    datos = tmp / "pgdata"
+    puerto = _puerto_libre()
+    subprocess.run(
+        [binario_postgres("initdb"), "-D", str(datos), "-U", "bench", "--auth=trust", "--encoding=UTF8"],
+        check=True, stdout=subprocess.DEVNULL,
+    )
+    # Socket unix dentro del directorio temporal: no choca con un servidor ya instalado
+    opciones = f"-p {puerto} -k {tmp} -c listen_addresses=127.0.0.1 -c fsync=off"
+    subprocess.run(
+        [binario_postgres("pg_ctl"), "-D", str(datos), "-o", opciones, "-l", str(tmp / "postgres.log"), "-w", "start"],
+        check=True, stdout=subprocess.DEVNULL,
+    )
+    try:
+        yield f"postgresql://bench@127.0.0.1:{puerto}/postgres"
+    finally:
+        subprocess.run(
+            [binario_postgres("pg_ctl"), "-D", str(datos), "-m", "fast", "-w", "stop"],
+            stdout=subprocess.DEVNULL,
+        )
+
+
+@contextlib.contextmanager
+def bd_temporal(motor: str = "auto") -> Iterator[str]:
+    """Devuelve la DATABASE_URL de una BD vacía que se borra al salir."""
+    if motor not in MOTORES:
+        raise ValueError(f"Motor no válido: {motor} (opciones: {', '.join(MOTORES)})")
+    if motor == "postgres" and not hay_postgres():
+        raise RuntimeError("No se encontraron initdb/pg_ctl (define PG_BIN con la carpeta de binarios de Postgres)")
+    tmp = Path(tempfile.mkdtemp(prefix="bench_lol_"))
+    try:
+        if motor == "postgres" or (motor == "auto" and hay_postgres()):
+            with _postgres(tmp) as url:
+                yield url
+        else:
+            yield f"sqlite:///{tmp / 'bench.db'}"
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
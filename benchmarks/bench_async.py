@@ -0,0 +1,173 @@
+"""
+Benchmark de carga: rutas de lectura con el engine síncrono (threadpool) frente
+al AsyncEngine (DB_ASYNC=1, aiosqlite / asyncpg).
+
+Arranca la API con uvicorn en un proceso aparte por cada modo, sobre la misma
+BD ya poblada, y la carga con --conexiones clientes concurrentes (httpx, una
+conexión keep-alive por cliente). Cada cliente pide en bucle una mezcla de
+listados filtrados, páginas por cursor y GET por id con ?fields= (sin caché).
+
+Mide peticiones por segundo, latencias p50/p95/p99 y errores.
+
+Uso:
+    python benchmarks/bench_async.py --conexiones 500 --segundos 20
+    python benchmarks/bench_async.py --motor postgres   # Postgres local temporal (initdb, PG_BIN)
+    DATABASE_URL=postgresql://... python benchmarks/bench_async.py --sin-poblar
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import List
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from bd_local import MOTORES, bd_temporal  # noqa: E402
+from utils.paginacion import codificar_cursor  # noqa: E402
+
+# Proceso servidor
+SERVIDOR = """
+import sys, uvicorn
+uvicorn.run("main:app", host="127.0.0.1", port=int(sys.argv[1]), log_level="warning", backlog=2048)
+"""
+
+
+def _poblar(n_teams: int, n_players: int) -> None:
+    from sqlalchemy import insert
+    from utils.db import engine, crear_db
+    from data.models import Team, Player
+
+    crear_db()
+    rnd = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(insert(Team), [
+            {"name": f"Team {i}", "region": rnd.choice(["LCK", "LPL", "LEC", "LCS"]), "is_deleted": False}
+            for i in range(1, n_teams + 1)
+        ])
+        conn.execute(insert(Player), [
+            {"nickname": f"player{i}", "real_name": f"Jugador {i}",
+             "role": rnd.choice(["Top", "Jungle", "Mid", "ADC", "Support"]),
+             "team_id": rnd.randint(1, n_teams), "kda": round(rnd.uniform(1, 8), 2), "is_deleted": False}
+            for i in range(n_players)
+        ])
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _arrancar(modo_async: bool, puerto: int) -> subprocess.Popen:
+    env = dict(os.environ, DB_ASYNC="1" if modo_async else "0")
+    proceso = subprocess.Popen(
+        [sys.executable, "-c", SERVIDOR, str(puerto)],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        try:
+            if httpx.get(f"http://127.0.0.1:{puerto}/health").status_code == 200:
+                return proceso
+        except httpx.TransportError:
+            time.sleep(0.2)
+    proceso.kill()
+    raise RuntimeError("El servidor no arrancó")
+
+
+def _peticion(rnd: random.Random, n_players: int) -> tuple:
+    tipo = rnd.random()
+    if tipo < 0.4:
+        return "/players/", {"limit": 20, "kda__gte": round(rnd.uniform(1, 7.5), 2), "sort": "-kda"}
+    if tipo < 0.7:
+        return "/players/", {"limit": 20, "cursor": codificar_cursor((rnd.randint(1, n_players),))}
+    return f"/players/{rnd.randint(1, n_players)}", {"fields": "nickname,role,kda"}
+
+
+async def _cliente(base: str, fin: float, n_players: int, semilla: int, tiempos: List[float], errores: List[int]):
+    rnd = random.Random(semilla)
+    async with httpx.AsyncClient(base_url=base, timeout=60.0) as client:
+        while time.perf_counter() < fin:
+            ruta, params = _peticion(rnd, n_players)
+            t0 = time.perf_counter()
+            try:
+                r = await client.get(ruta, params=params)
+                if r.status_code != 200:
+                    errores.append(r.status_code)
+                    continue
+            except httpx.HTTPError:
+                errores.append(0)
+                continue
+            tiempos.append(time.perf_counter() - t0)
+
+
+async def _cargar(base: str, conexiones: int, segundos: float, n_players: int) -> tuple:
+    tiempos: List[float] = []
+    errores: List[int] = []
+    fin = time.perf_counter() + segundos
+    await asyncio.gather(*[
+        _cliente(base, fin, n_players, i, tiempos, errores) for i in range(conexiones)
+    ])
+    return tiempos, errores
+
+
+def _informe(modo: str, tiempos: List[float], errores: List[int], segundos: float) -> None:
+    tiempos = sorted(tiempos)
+    if not tiempos:
+        print(f"[{modo}] sin respuestas correctas ({len(errores)} errores)")
+        return
+
+    def p(q: float) -> float:
+        return tiempos[min(int(len(tiempos) * q), len(tiempos) - 1)] * 1000
+
+    print(f"[{modo}] {len(tiempos) / segundos:8.1f} req/s | p50 {p(0.50):7.1f} ms | "
+          f"p95 {p(0.95):7.1f} ms | p99 {p(0.99):7.1f} ms | errores {len(errores)}")
+
+
+def _comparar(args) -> None:
+    print(f"Carga: {args.conexiones} conexiones concurrentes durante {args.segundos:.0f} s por modo")
+
+    for modo_async in (False, True):
+        puerto = _puerto_libre()
+        servidor = _arrancar(modo_async, puerto)
+        try:
+            tiempos, errores = asyncio.run(
+                _cargar(f"http://127.0.0.1:{puerto}", args.conexiones, args.segundos, args.players)
+            )
+        finally:
+            servidor.terminate()
+            servidor.wait()
+        _informe("async (AsyncEngine)" if modo_async else "sync (threadpool)  ", tiempos, errores, args.segundos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=500)
+    parser.add_argument("--players", type=int, default=50_000)
+    parser.add_argument("--conexiones", type=int, default=500)
+    parser.add_argument("--segundos", type=float, default=20.0)
+    parser.add_argument("--motor", choices=MOTORES, default="auto",
+                        help="BD temporal: Postgres local si hay binarios (auto), si no SQLite")
+    parser.add_argument("--sin-poblar", action="store_true", help="Usar DATABASE_URL tal cual, ya con datos")
+    args = parser.parse_args()
+
+    with ExitStack() as pila:
+        if not args.sin_poblar:
+            os.environ["DATABASE_URL"] = pila.enter_context(bd_temporal(args.motor))
+            _poblar(args.teams, args.players)
+            print(f"Datos: {args.teams} equipos, {args.players} jugadores "
+                  f"({os.environ['DATABASE_URL'].split(':', 1)[0]})")
+        _comparar(args)
+
+
+if __name__ == "__main__":
+    main()
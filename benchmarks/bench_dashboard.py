@@ -0,0 +1,131 @@
+"""
+Benchmark del dashboard (GET /) con tablas grandes.
+
+Crea una base SQLite temporal con N equipos y M partidas, y mide:
+- la reconstrucción completa del read model (GROUP BY en SQL)
+- la latencia de GET / con el read model materializado
+- el algoritmo anterior (joins en Python O(equipos x partidas)), solo hasta
+  --legacy-max-matches porque a escala real no termina en un tiempo razonable
+
+Uso:
+    python benchmarks/bench_dashboard.py --teams 10000 --matches 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def _poblar(engine, n_teams: int, n_matches: int, n_players: int, n_champions: int) -> None:
+    from sqlalchemy import insert
+    from data.models import Team, Player, Champion, MatchSummary
+
+    rnd = random.Random(42)
+    chunk = 50_000
+    with engine.begin() as conn:
+        conn.execute(insert(Team), [
+            {"name": f"Team {i}", "region": rnd.choice(["LCK", "LPL", "LEC", "LCS"]),
+             "wins": rnd.randint(0, 30), "losses": rnd.randint(0, 30),
+             "avg_kda": round(rnd.uniform(1, 6), 2), "avg_duration": "-", "is_deleted": False}
+            for i in range(1, n_teams + 1)
+        ])
+        conn.execute(insert(Player), [
+            {"nickname": f"player{i}", "role": rnd.choice(["Top", "Jungle", "Mid", "ADC", "Support"]),
+             "team_id": rnd.randint(1, n_teams), "kda": round(rnd.uniform(1, 8), 2), "is_deleted": False}
+            for i in range(n_players)
+        ])
+        conn.execute(insert(Champion), [
+            {"slug": f"champ-{i}", "name": f"Champ {i}", "pick_rate": rnd.random(), "ban_rate": rnd.random(),
+             "win_rate": rnd.random(), "kda": round(rnd.uniform(1, 6), 2), "is_deleted": False}
+            for i in range(n_champions)
+        ])
+        for start in range(0, n_matches, chunk):
+            filas = []
+            for _ in range(min(chunk, n_matches - start)):
+                a, b = rnd.randint(1, n_teams), rnd.randint(1, n_teams)
+                filas.append({"stage": "Groups", "team_a_id": a, "team_b_id": b, "winner_id": rnd.choice([a, b]),
+                              "avg_duration_min": round(rnd.uniform(22, 45), 1),
+                              "avg_kills_per_game": round(rnd.uniform(15, 35), 1), "is_deleted": False})
+            conn.execute(insert(MatchSummary), filas)
+
+
+def _legacy(equipos, jugadores, matches) -> None:
+    """Copia del cálculo anterior de home: joins con listas en Python."""
+    for equipo in equipos:
+        team_matches = [m for m in matches if m.team_a_id == equipo.id or m.team_b_id == equipo.id]
+        if team_matches:
+            sum(m.avg_duration_min for m in team_matches) / len(team_matches)
+    for jugador in jugadores:
+        next((e for e in equipos if e.id == jugador.team_id), None)
+    for match in matches:
+        next((e for e in equipos if e.id == match.team_a_id), None)
+        next((e for e in equipos if e.id == match.team_b_id), None)
+        next((e for e in equipos if e.id == match.winner_id), None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=10_000)
+    parser.add_argument("--matches", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=50_000)
+    parser.add_argument("--champions", type=int, default=170)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--legacy-max-matches", type=int, default=2_000)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_lol_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.db'}"
+
+    from sqlmodel import Session, select
+    from utils.db import engine, crear_db
+    from data.models import Team, Player, MatchSummary
+    from operations.dashboard_db import recalcular_dashboard
+
+    crear_db()
+    t0 = time.perf_counter()
+    _poblar(engine, args.teams, args.matches, args.players, args.champions)
+    print(f"Datos: {args.teams} equipos, {args.matches} partidas, {args.players} jugadores "
+          f"({time.perf_counter() - t0:.1f}s de carga)")
+
+    with Session(engine) as session:
+        t0 = time.perf_counter()
+        recalcular_dashboard(session)
+        print(f"Reconstrucción del read model (GROUP BY): {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        client.get("/")  # calentamiento
+        tiempos = []
+        for _ in range(args.requests):
+            t0 = time.perf_counter()
+            r = client.get("/")
+            tiempos.append(time.perf_counter() - t0)
+            assert r.status_code == 200
+        tiempos.sort()
+        print(f"GET / -> p50 {tiempos[len(tiempos) // 2] * 1000:.1f} ms, "
+              f"p95 {tiempos[int(len(tiempos) * 0.95) - 1] * 1000:.1f} ms")
+
+    n_legacy = min(args.matches, args.legacy_max_matches)
+    with Session(engine) as session:
+        equipos = session.exec(select(Team)).all()
+        jugadores = session.exec(select(Player).limit(n_legacy)).all()
+        matches = session.exec(select(MatchSummary).limit(n_legacy)).all()
+        t0 = time.perf_counter()
+        _legacy(equipos, jugadores, matches)
+        dt = time.perf_counter() - t0
+    # El coste crece linealmente con las partidas (para un número fijo de equipos)
+    estimado = dt * args.matches / n_legacy if n_legacy else 0.0
+    print(f"Algoritmo anterior con {n_legacy} partidas y jugadores: {dt * 1000:.0f} ms "
+          f"(estimado para {args.matches}: {estimado:.0f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark de la serialización de listados: modelos + response_model frente a
+filas proyectadas + orjson (RESPUESTA_RAPIDA).
+
+Mide:
+- GET /players/?limit=100 con cada modo (TestClient, latencia p50/p95)
+- una exportación de --export filas de jugadores sin HTTP: la ruta de FastAPI
+  (ORM -> model_dump -> validación contra List[Player] -> JSON) frente a
+  listar(campos=todas las columnas) + orjson
+
+Uso:
+    python benchmarks/bench_serializacion.py --players 50000 --export 10000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def _poblar(engine, n_teams: int, n_players: int) -> None:
+    from sqlalchemy import insert
+    from data.models import Team, Player
+
+    rnd = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(insert(Team), [
+            {"name": f"Team {i}", "region": rnd.choice(["LCK", "LPL", "LEC", "LCS"]), "is_deleted": False}
+            for i in range(1, n_teams + 1)
+        ])
+        conn.execute(insert(Player), [
+            {"nickname": f"player{i}", "real_name": f"Jugador {i}",
+             "role": rnd.choice(["Top", "Jungle", "Mid", "ADC", "Support"]),
+             "team_id": rnd.randint(1, n_teams), "kda": round(rnd.uniform(1, 8), 2), "is_deleted": False}
+            for i in range(n_players)
+        ])
+
+
+def _percentiles(tiempos: List[float]) -> str:
+    tiempos = sorted(tiempos)
+    return (f"p50 {tiempos[len(tiempos) // 2] * 1000:.2f} ms, "
+            f"p95 {tiempos[max(int(len(tiempos) * 0.95) - 1, 0)] * 1000:.2f} ms")
+
+
+def _medir(funcion, repeticiones: int) -> List[float]:
+    funcion()  # calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=500)
+    parser.add_argument("--players", type=int, default=50_000)
+    parser.add_argument("--export", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--repeticiones", type=int, default=10)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_lol_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.db'}"
+
+    from pydantic import TypeAdapter
+    from sqlmodel import Session
+    from utils.db import engine, crear_db
+    from utils.serializacion import a_json
+    from data.models import Player
+    from operations.operations_db import jugadores, listar_jugadores
+
+    crear_db()
+    _poblar(engine, args.teams, args.players)
+    print(f"Datos: {args.teams} equipos, {args.players} jugadores")
+
+    from fastapi.testclient import TestClient
+    import main as app_main
+    from utils import serializacion
+
+    with TestClient(app_main.app) as client:
+        cuerpos = {}
+        for rapida in (False, True):
+            serializacion.RESPUESTA_RAPIDA = rapida
+            serializacion.campos_pedidos.cache_clear()
+            tiempos = _medir(lambda: client.get("/players/", params={"limit": 100}), args.requests)
+            cuerpos[rapida] = client.get("/players/", params={"limit": 100}).json()
+            modo = "filas + orjson     " if rapida else "modelos + pydantic "
+            print(f"GET /players/?limit=100 [{modo}] -> {_percentiles(tiempos)}")
+        assert cuerpos[False] == cuerpos[True], "las dos rutas deben devolver el mismo JSON"
+
+    adaptador = TypeAdapter(List[Player])
+
+    def exportar_modelos() -> bytes:
+        # Lo que hace FastAPI con response_model: dump, validación de nuevo y codificación
+        with Session(engine) as session:
+            items = listar_jugadores(session, limit=args.export)
+            validados = adaptador.validate_python([i.model_dump() for i in items])
+            return json.dumps(adaptador.dump_python(validados, mode="json")).encode("utf-8")
+
+    def exportar_filas() -> bytes:
+        with Session(engine) as session:
+            return a_json(listar_jugadores(session, limit=args.export, campos=jugadores.campos))
+
+    assert json.loads(exportar_modelos()) == json.loads(exportar_filas())
+    lento = _medir(exportar_modelos, args.repeticiones)
+    rapido = _medir(exportar_filas, args.repeticiones)
+    print(f"Exportación de {args.export} filas [modelos + pydantic ] -> {_percentiles(lento)}")
+    print(f"Exportación de {args.export} filas [filas + orjson     ] -> {_percentiles(rapido)}")
+    print(f"Mejora (p50): x{sorted(lento)[len(lento) // 2] / sorted(rapido)[len(rapido) // 2]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
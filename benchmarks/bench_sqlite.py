@@ -0,0 +1,197 @@
+"""
+Benchmark de carga mixta lectura/escritura sobre SQLite: valores por defecto
+(rollback journal, synchronous=FULL) frente al perfil "produccion" de utils.db
+(WAL, synchronous=NORMAL, mmap, cache, temp_store y busy_timeout), y ese mismo
+perfil con las escrituras por el escritor único (utils.escritor, group commit).
+
+Cada modo usa su propia copia de la BD y su propio engine. --lectores hilos
+piden páginas de jugadores por cursor y GET por id; --escritores hilos crean y
+actualizan jugadores, todo con las funciones de operations (un commit por
+operación, como la API; con escritor único, un COMMIT por lote).
+
+Mide operaciones por segundo, latencia p50/p95 por tipo y errores
+("database is locked").
+
+Uso:
+    python benchmarks/bench_sqlite.py --lectores 8 --escritores 4 --segundos 10
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def _poblar(engine, n_teams: int, n_players: int) -> None:
+    from sqlalchemy import insert
+    from data.models import Team, Player
+
+    rnd = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(insert(Team), [
+            {"name": f"Team {i}", "region": rnd.choice(["LCK", "LPL", "LEC", "LCS"]), "is_deleted": False}
+            for i in range(1, n_teams + 1)
+        ])
+        conn.execute(insert(Player), [
+            {"nickname": f"player{i}", "real_name": f"Jugador {i}",
+             "role": rnd.choice(["Top", "Jungle", "Mid", "ADC", "Support"]),
+             "team_id": rnd.randint(1, n_teams), "kda": round(rnd.uniform(1, 8), 2), "is_deleted": False}
+            for i in range(n_players)
+        ])
+
+
+def _percentiles(tiempos: List[float]) -> str:
+    if not tiempos:
+        return "-"
+    tiempos = sorted(tiempos)
+    return (f"p50 {tiempos[len(tiempos) // 2] * 1000:.2f} ms, "
+            f"p95 {tiempos[max(int(len(tiempos) * 0.95) - 1, 0)] * 1000:.2f} ms")
+
+
+def _actualizar_kda(session, player_id: int, kda: float) -> None:
+    from data.models import Player
+    from operations.operations_db import actualizar_jugador, obtener_jugador
+
+    datos = obtener_jugador(session, player_id).model_dump(exclude={"id", "is_deleted"})
+    datos["kda"] = kda
+    actualizar_jugador(session, player_id, Player(**datos))
+
+
+def _carga(
+    engine, escritor, n_players: int, n_teams: int, lectores: int, escritores: int, segundos: float
+) -> Dict[str, list]:
+    from fastapi import HTTPException
+    from sqlalchemy.exc import OperationalError
+    from sqlmodel import Session
+    from data.models import Player
+    from operations.operations_db import crear_jugador, listar_jugadores, obtener_jugador
+
+    def escribir(funcion, *args):
+        if escritor is not None:
+            return escritor.enviar(funcion, *args).result()
+        with Session(engine) as session:
+            return funcion(session, *args)
+
+    resultados: Dict[str, list] = {"lectura": [], "escritura": [], "errores": []}
+    lock = threading.Lock()
+    fin = time.perf_counter() + segundos
+
+    def lector(semilla: int) -> None:
+        rnd = random.Random(semilla)
+        tiempos = []
+        errores = 0
+        while time.perf_counter() < fin:
+            t0 = time.perf_counter()
+            try:
+                with Session(engine) as session:
+                    if rnd.random() < 0.5:
+                        listar_jugadores(session, limit=20, after=(rnd.randint(1, n_players),))
+                    else:
+                        obtener_jugador(session, rnd.randint(1, n_players))
+            except (OperationalError, HTTPException):  # Repositorio convierte "database is locked" en 500
+                errores += 1
+                continue
+            tiempos.append(time.perf_counter() - t0)
+        with lock:
+            resultados["lectura"].extend(tiempos)
+            resultados["errores"].extend(["lectura"] * errores)
+
+    def escritor_hilo(semilla: int) -> None:
+        rnd = random.Random(semilla)
+        tiempos = []
+        errores = 0
+        n = 0
+        while time.perf_counter() < fin:
+            n += 1
+            t0 = time.perf_counter()
+            try:
+                if rnd.random() < 0.5:
+                    escribir(crear_jugador, Player(
+                        nickname=f"nuevo{semilla}_{n}", real_name="Bench", role="Mid",
+                        team_id=rnd.randint(1, n_teams), kda=round(rnd.uniform(1, 8), 2),
+                    ))
+                else:
+                    escribir(_actualizar_kda, rnd.randint(1, n_players), round(rnd.uniform(1, 8), 2))
+            except (OperationalError, HTTPException):  # Repositorio convierte "database is locked" en 500
+                errores += 1
+                continue
+            tiempos.append(time.perf_counter() - t0)
+        with lock:
+            resultados["escritura"].extend(tiempos)
+            resultados["errores"].extend(["escritura"] * errores)
+
+    hilos = [threading.Thread(target=lector, args=(i,)) for i in range(lectores)]
+    hilos += [threading.Thread(target=escritor_hilo, args=(1000 + i,)) for i in range(escritores)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=500)
+    parser.add_argument("--players", type=int, default=50_000)
+    parser.add_argument("--lectores", type=int, default=8)
+    parser.add_argument("--escritores", type=int, default=4)
+    parser.add_argument("--segundos", type=float, default=10.0)
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench_lol_"))
+    base = tmp / "base.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{base}"
+    # journal_mode=WAL queda guardado en el fichero: la BD base se crea sin perfil
+    os.environ["SQLITE_PERFIL"] = "ninguno"
+
+    from sqlmodel import create_engine
+    from utils.db import configurar_sqlite, crear_db, engine, pragmas_sqlite
+    import data.models  # noqa: F401  (registra las tablas para crear_db)
+
+    crear_db()
+    _poblar(engine, args.teams, args.players)
+    engine.dispose()
+    print(f"Datos: {args.teams} equipos, {args.players} jugadores")
+    print(f"Carga: {args.lectores} lectores + {args.escritores} escritores durante {args.segundos:.0f} s por modo")
+
+    from utils.escritor import EscritorUnico, crear_motor_escritor
+
+    for perfil, con_escritor in (("ninguno", False), ("produccion", False), ("produccion", True)):
+        nombre = perfil + (" + escritor" if con_escritor else "")
+        copia = tmp / f"{perfil}{'_escritor' if con_escritor else ''}.db"
+        shutil.copy(base, copia)
+        motor = create_engine(
+            f"sqlite:///{copia}", pool_size=args.lectores + args.escritores,
+            connect_args={"check_same_thread": False},
+        )
+        configurar_sqlite(motor, pragmas_sqlite(perfil))
+        with motor.connect() as conn:
+            modo = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+        escritor = None
+        if con_escritor:
+            escritor = EscritorUnico(crear_motor_escritor(f"sqlite:///{copia}", pragmas_sqlite(perfil)))
+            escritor.iniciar()
+        r = _carga(motor, escritor, args.players, args.teams, args.lectores, args.escritores, args.segundos)
+        motor.dispose()
+        lotes = ""
+        if escritor is not None:
+            escritor.detener()
+            escritor.motor.dispose()
+            lotes = f" | {escritor.operaciones / max(escritor.lotes, 1):.1f} escrituras/COMMIT"
+        total = len(r["lectura"]) + len(r["escritura"])
+        print(f"[{nombre:21} {modo:6}] {total / args.segundos:8.1f} ops/s | "
+              f"lecturas {len(r['lectura']) / args.segundos:7.1f}/s ({_percentiles(r['lectura'])}) | "
+              f"escrituras {len(r['escritura']) / args.segundos:6.1f}/s ({_percentiles(r['escritura'])}) | "
+              f"errores {len(r['errores'])}{lotes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Réplica de lectura local con dos ficheros SQLite, para probar DATABASE_READ_URL
+sin un servidor con replicación.
+
+Copia la BD primaria sobre la réplica con la API de backup de SQLite cada
+--intervalo segundos: la réplica va por detrás de la primaria como mucho ese
+tiempo (más lo que tarde la copia). Con --intervalo mayor que
+DB_LECTURA_PROPIA_SEGUNDOS se ve el retraso en las lecturas de otros clientes.
+
+Uso (en otra terminal, junto a la API):
+    python benchmarks/replica_sqlite.py lol.db lol_replica.db --intervalo 1
+    DATABASE_URL=sqlite:///lol.db DATABASE_READ_URL=sqlite:///lol_replica.db uvicorn main:app
+"""
+import argparse
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+def copiar(origen: str, destino: str) -> None:
+    """Copia consistente de origen sobre destino (los lectores de destino no se quedan a medias)."""
+    with sqlite3.connect(origen) as src, sqlite3.connect(destino) as dst:
+        src.backup(dst, pages=0)
+
+
+class ReplicaSqlite:
+    """Hilo que repite copiar() cada intervalo segundos hasta detener()."""
+
+    def __init__(self, origen: str, destino: str, intervalo: float = 1.0):
+        self.origen = origen
+        self.destino = destino
+        self.intervalo = intervalo
+        self.copias = 0
+        self._parar = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name="replica-sqlite", daemon=True)
+
+    def iniciar(self) -> "ReplicaSqlite":
+        copiar(self.origen, self.destino)
+        self._hilo.start()
+        return self
+
+    def detener(self) -> None:
+        self._parar.set()
+        self._hilo.join()
+
+    def _bucle(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            copiar(self.origen, self.destino)
+            self.copias += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("primaria", type=Path)
+    parser.add_argument("replica", type=Path)
+    parser.add_argument("--intervalo", type=float, default=1.0, help="Segundos entre copias")
+    args = parser.parse_args()
+
+    replica = ReplicaSqlite(str(args.primaria), str(args.replica), args.intervalo).iniciar()
+    print(f"Replicando {args.primaria} -> {args.replica} cada {args.intervalo:g} s (Ctrl+C para salir)")
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        replica.detener()
+
+
+if __name__ == "__main__":
+    main()
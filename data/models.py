@@ -1,4 +1,5 @@
 from typing import Optional, List
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field, Relationship
 
 # BASE COMÚN: ID + SOFT DELETE
@@ -16,9 +17,27 @@ class TableBase(SQLModel):
         extra = "forbid"
         validate_assignment = True
 
+# ÍNDICES
+# Casi todas las consultas filtran is_deleted = 0: los índices parciales solo
+# contienen filas activas y encajan con ese filtro (mismo literal que genera SQLAlchemy).
+# Las columnas que encabezan un índice son las que admiten ?campo__op= y sort= (utils.filtros).
+# Los índices (categoría, métrica) sirven "filtrar por categoría y ordenar por la métrica"
+# sin B-tree temporal; los de una columna siguen dando el orden por id de esos filtros.
+
+def _indice_activos(nombre: str, *columnas: str) -> Index:
+    return Index(nombre, *columnas, sqlite_where=text("is_deleted = 0"), postgresql_where=text("NOT is_deleted"))
+
+
+def _indice_eliminados(tabla: str) -> Index:
+    """Para los listados de historial (is_deleted = 1), que son pocas filas."""
+    return Index(f"ix_{tabla}_eliminados", "id", sqlite_where=text("is_deleted = 1"), postgresql_where=text("is_deleted"))
+
 # TABLA INTERMEDIA N:M (CHAMPION <-> MATCHSUMMARY)
 
 class MatchChampionLink(SQLModel, table=True):
+    # La PK (match_id, champion_id) cubre "campeones de un match"; este cubre "matches de un campeón"
+    __table_args__ = (Index("ix_matchchampionlink_champion", "champion_id"),)
+
     match_id: Optional[int] = Field(
         default=None,
         foreign_key="matchsummary.id",
@@ -35,6 +54,13 @@ class MatchChampionLink(SQLModel, table=True):
 
 class Champion(TableBase, table=True):
     __tablename__ = "champion"
+    __table_args__ = (
+        _indice_activos("ix_champion_activos_win_rate", "win_rate"),
+        _indice_activos("ix_champion_activos_pick_rate", "pick_rate"),
+        _indice_activos("ix_champion_activos_ban_rate", "ban_rate"),
+        _indice_activos("ix_champion_activos_kda", "kda"),
+        _indice_eliminados("champion"),
+    )
 
     slug: str = Field(index=True, unique=True, description="Identificador único del campeón")
     name: str = Field(min_length=1, max_length=100)
@@ -52,6 +78,13 @@ class Champion(TableBase, table=True):
 
 class Team(TableBase, table=True):
     __tablename__ = "team"
+    __table_args__ = (
+        _indice_activos("ix_team_activos_region", "region"),
+        _indice_activos("ix_team_activos_region_wins", "region", "wins"),
+        _indice_activos("ix_team_activos_wins", "wins"),
+        _indice_activos("ix_team_activos_avg_kda", "avg_kda"),
+        _indice_eliminados("team"),
+    )
 
     name: str = Field(index=True, unique=True, min_length=1, max_length=100)
     region: str = Field(min_length=1, max_length=50)
@@ -91,6 +124,16 @@ class Team(TableBase, table=True):
 
 class MatchSummary(TableBase, table=True):
     __tablename__ = "matchsummary"
+    __table_args__ = (
+        _indice_activos("ix_matchsummary_activos_winner", "winner_id"),
+        # (equipo, stage) + rowid: /teams/{id}/matches saca los ids de cada lado sin leer la tabla
+        _indice_activos("ix_matchsummary_activos_team_a_stage", "team_a_id", "stage"),
+        _indice_activos("ix_matchsummary_activos_team_b_stage", "team_b_id", "stage"),
+        _indice_activos("ix_matchsummary_activos_stage", "stage"),
+        _indice_activos("ix_matchsummary_activos_stage_duracion", "stage", "avg_duration_min"),
+        _indice_activos("ix_matchsummary_activos_duracion", "avg_duration_min"),
+        _indice_eliminados("matchsummary"),
+    )
 
     # Info básica
     stage: str = Field(
@@ -133,6 +176,14 @@ class MatchSummary(TableBase, table=True):
 
 class Player(TableBase, table=True):
     __tablename__ = "player"
+    __table_args__ = (
+        _indice_activos("ix_player_activos_team", "team_id"),
+        _indice_activos("ix_player_activos_team_kda", "team_id", "kda"),
+        _indice_activos("ix_player_activos_role", "role"),
+        _indice_activos("ix_player_activos_role_kda", "role", "kda"),
+        _indice_activos("ix_player_activos_kda", "kda"),
+        _indice_eliminados("player"),
+    )
 
     nickname: str = Field(index=True, min_length=1, max_length=50)
     real_name: Optional[str] = Field(default=None, max_length=100)
@@ -149,6 +200,40 @@ class Player(TableBase, table=True):
     kda: float = Field(default=0.0, description="Promedio KDA del jugador")
 
 
+# READ MODEL DEL DASHBOARD
+# Agregados que las operaciones de escritura mantienen en la misma transacción,
+# para que el dashboard no recorra todas las tablas en cada visita.
+
+class DashboardStats(SQLModel, table=True):
+    __tablename__ = "dashboard_stats"
+
+    id: Optional[int] = Field(default=1, primary_key=True)
+
+    # Conteos de registros activos
+    teams: int = Field(default=0)
+    players: int = Field(default=0)
+    champions: int = Field(default=0)
+    matches: int = Field(default=0)
+
+    # Sumas para los promedios (se dividen al leer)
+    champion_pick_rate_sum: float = Field(default=0.0)
+    champion_win_rate_sum: float = Field(default=0.0)
+    team_win_rate_sum: float = Field(default=0.0)
+    team_duration_sum: float = Field(default=0.0, description="Suma de la duración promedio de cada equipo")
+    teams_with_duration: int = Field(default=0)
+    player_kda_sum: float = Field(default=0.0, description="Suma del avg_kda del equipo de cada jugador")
+    players_with_team: int = Field(default=0)
+
+
+class TeamStats(SQLModel, table=True):
+    __tablename__ = "team_stats"
+
+    team_id: Optional[int] = Field(default=None, foreign_key="team.id", primary_key=True)
+    matches: int = Field(default=0, description="Partidas activas en las que participa")
+    duration_sum: float = Field(default=0.0, description="Suma de avg_duration_min de esas partidas")
+    players: int = Field(default=0, description="Jugadores activos del equipo")
+
+
 __all__ = [
     "TableBase",
     "Champion",
@@ -156,4 +241,6 @@ __all__ = [
     "MatchSummary",
     "MatchChampionLink",
     "Player",
+    "DashboardStats",
+    "TeamStats",
 ]
\ No newline at end of file
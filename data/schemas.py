@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, model_validator
 
 # CHAMPION
 
@@ -82,12 +82,24 @@ class MatchSummaryUpdate(BaseModel):
 class MatchSummaryRead(MatchSummaryBase):
     id: int
 
+
+class MatchSummaryConEquipos(MatchSummaryRead):
+    """Partida con los nombres de los equipos (None si el equipo no existe o está eliminado)."""
+    team_a_name: Optional[str] = None
+    team_b_name: Optional[str] = None
+    winner_name: Optional[str] = None
+
 # LINK CHAMPION <-> MATCH
 
 class MatchChampionLinkIn(BaseModel):
     match_id: int
     champion_id: int
 
+
+class CampeonesDeMatch(BaseModel):
+    """Conjunto completo de campeones del match (PUT reemplaza los enlaces anteriores)."""
+    champion_ids: List[int] = Field(max_length=500)
+
 # PLAYER (SCHEMAS)
 
 class PlayerBase(BaseModel):
@@ -115,4 +127,17 @@ class PlayerUpdate(BaseModel):
 
 
 class PlayerRead(PlayerBase):
-    id: int
\ No newline at end of file
+    id: int
+
+# OPERACIONES POR LOTES (bulk-delete / bulk-restore)
+
+class SeleccionLote(BaseModel):
+    """Registros a afectar: lista de ids o filtro por igualdad de columnas (ej: {"stage": "Groups"})."""
+    ids: Optional[List[int]] = Field(default=None, min_length=1, max_length=50_000)
+    filter: Optional[Dict[str, Any]] = Field(default=None, min_length=1)
+
+    @model_validator(mode="after")
+    def _uno_de_los_dos(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Debe indicar 'ids' o 'filter' (solo uno)")
+        return self
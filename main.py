@@ -1,21 +1,45 @@
 from fastapi import FastAPI, Depends, HTTPException, Query, Request
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from sqlmodel import Session
-from typing import List
-from utils.db import get_session, crear_db
+from typing import List, Literal, Optional
+import asyncio
+import json
+import time
+from utils.db import (
+    get_db, get_session, crear_db, ejecutar, engine, async_engine,
+    HAY_REPLICA, LECTURA_PROPIA_COOKIE, LECTURA_PROPIA_SEGUNDOS, anotar_escritura, lee_de_replica, replica_al_dia,
+)
+from utils.escritor import escribir, escritor
+from utils.cache import CacheLRU, CacheVersionada
+from utils.cambios import version_actual, etag_tablas, suscribir
+from utils.broadcaster import broadcaster, publicar_cambios
+from utils.paginacion import decodificar_cursor, anotar_siguiente_pagina
+from utils.filtros import descripcion_filtros, leer_filtros
+from utils.serializacion import RespuestaJSON, a_json, campos_pedidos
 from data.models import Champion, Team, MatchSummary, Player
+from data.schemas import CampeonesDeMatch, MatchSummaryConEquipos, SeleccionLote
+from operations.busqueda_db import (
+    ActualizadorSugerencias, asegurar_busqueda, buscar_global, cargar_sugerencias, sugerir, CAMPOS_SUGERENCIAS, MODELOS,
+)
+from operations.dashboard_db import asegurar_dashboard, obtener_estadisticas, obtener_team_stats
 from operations.operations_db import (
     crear_campeon, listar_campeones, listar_campeones_eliminados, restaurar_campeon,
     buscar_campeon_por_nombre, filtrar_campeones_por_winrate, obtener_campeon, actualizar_campeon, eliminar_campeon,
+    crear_campeones_lote, eliminar_campeones_lote, restaurar_campeones_lote,
     crear_equipo, listar_equipos, listar_equipos_eliminados, restaurar_equipo,
-    buscar_equipo_por_nombre, filtrar_equipo_por_region, obtener_equipo, actualizar_equipo, eliminar_equipo,
-    crear_resumen, listar_resumenes, listar_resumenes_eliminados, restaurar_resumen,
+    buscar_equipo_por_nombre, buscar_equipos_difuso, filtrar_equipo_por_region, obtener_equipo, actualizar_equipo, eliminar_equipo,
+    crear_equipos_lote, eliminar_equipos_lote, restaurar_equipos_lote,
+    crear_resumen, listar_resumenes, listar_resumenes_con_equipos, listar_resumenes_eliminados, restaurar_resumen,
+    listar_partidas_de_equipo, obtener_campeones_de_match, asignar_campeones_a_match, expandir_campeones,
+    eliminar_resumen, obtener_resumen,
     buscar_resumen_por_etapa, filtrar_resumen_por_ganador,
+    crear_resumenes_lote, eliminar_resumenes_lote, restaurar_resumenes_lote,
     crear_jugador, listar_jugadores, listar_jugadores_eliminados, restaurar_jugador,
-    buscar_jugadores_por_nickname, filtrar_jugadores_por_rol, filtrar_jugadores_por_equipo,
+    buscar_jugadores_por_nickname, buscar_jugadores_difuso, filtrar_jugadores_por_rol, filtrar_jugadores_por_equipo,
     obtener_jugador, actualizar_jugador, eliminar_jugador,
+    crear_jugadores_lote, eliminar_jugadores_lote, restaurar_jugadores_lote,
 )
 
 app = FastAPI(
@@ -33,176 +57,414 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 @app.on_event("startup")
 def on_startup():
     crear_db()
+    with Session(engine) as session:
+        asegurar_dashboard(session)
+        asegurar_busqueda(session)
+        cargar_sugerencias(session)
+    actualizador_sugerencias.iniciar()
+    suscribir(actualizador_sugerencias.encolar)
+    suscribir(_invalidar_cache_entidades)
+    suscribir(anotar_escritura)
+
+
+# Los índices de /suggest se actualizan fuera del commit, en su propio hilo
+actualizador_sugerencias = ActualizadorSugerencias(lambda: Session(engine))
+
+
+@app.on_event("startup")
+async def iniciar_eventos():
+    # Los commits se hacen en otros hilos (threadpool, escritor único): el broadcaster necesita el loop
+    broadcaster.iniciar(asyncio.get_running_loop())
+    suscribir(publicar_cambios)
+    if escritor is not None:
+        escritor.iniciar()
+
+
+@app.on_event("shutdown")
+async def cerrar_eventos():
+    if escritor is not None:
+        # Las escrituras ya aceptadas se confirman antes de cerrar
+        await asyncio.to_thread(escritor.detener)
+    broadcaster.cerrar()
+    await asyncio.to_thread(actualizador_sugerencias.detener)
+    if async_engine is not None:
+        await async_engine.dispose()
+
+async def marcar_lectura_propia(request: Request, call_next):
+    """Tras una escritura correcta el cliente lee de la primaria durante LECTURA_PROPIA_SEGUNDOS."""
+    response = await call_next(request)
+    if request.method in ("POST", "PUT", "PATCH", "DELETE") and response.status_code < 400:
+        response.set_cookie(
+            LECTURA_PROPIA_COOKIE, str(time.time() + LECTURA_PROPIA_SEGUNDOS),
+            max_age=int(LECTURA_PROPIA_SEGUNDOS) + 1, httponly=True, samesite="lax",
+        )
+    return response
+
+# Sin réplica todas las lecturas van a la primaria: ni middleware ni cookie
+if HAY_REPLICA:
+    app.middleware("http")(marcar_lectura_propia)
+
 
 @app.get("/health", tags=["Root"])
 def health():
     return {"status": "ok"}
 
+
+# JSON ya serializado de GET /{entidad}/{id}, por tabla
+cache_entidades = {
+    tabla: CacheLRU(max_entradas=10_000, ttl=60.0)
+    for tabla in ("champion", "team", "matchsummary", "player")
+}
+
+
+def _invalidar_cache_entidades(cambios) -> None:
+    """Cada escritura confirmada descarta su entrada; los lotes (id None) vacían la tabla."""
+    for c in cambios:
+        cache = cache_entidades.get(c.entidad)
+        if cache is None:
+            continue
+        if c.id is None:
+            cache.limpiar()
+        else:
+            cache.invalidar(c.id)
+
+
+def _respuesta_cacheada(session: Session, tabla: str, obj_id: int, fields: Optional[str], obtener) -> Response:
+    """
+    obtener(session, id, campos) devuelve el modelo (campos None) o la fila proyectada como dict.
+    - Solo se cachea la respuesta completa: las de ?fields= van siempre a la BD (una fila por PK).
+    - Lo leído de la réplica justo después de una escritura puede ir atrasado: no se guarda.
+    """
+    campos = campos_pedidos(MODELOS[tabla], fields)
+    if fields:
+        return RespuestaJSON(obtener(session, obj_id, campos))
+    guardar = not lee_de_replica(session) or replica_al_dia()
+
+    def generar() -> bytes:
+        if campos is not None:
+            return a_json(obtener(session, obj_id, campos))
+        return obtener(session, obj_id, None).model_dump_json().encode("utf-8")
+
+    return Response(content=cache_entidades[tabla].obtener(obj_id, generar, guardar), media_type="application/json")
+
+
+def _solo_campos(items: list, campos) -> list:
+    """Quita de las filas las columnas de orden que el listado añadió para el cursor y no se pidieron."""
+    if campos is None or not items or len(items[0]) == len(campos):
+        return items
+    return [{campo: fila[campo] for campo in campos} for fila in items]
+
+
+def _filas(items: list, campos, response: Optional[Response] = None):
+    """Con campos los items ya son dicts: se codifican sin revalidarlos contra response_model."""
+    if campos is None:
+        return items
+    return RespuestaJSON(_solo_campos(items, campos), headers=response.headers if response is not None else None)
+
+
+# ?fields= en listados y GET por id (id siempre incluido)
+UPSERT_QUERY = Query(False, description="Si ya existe un registro con el mismo valor único, actualizarlo en vez de dar error")
+CAMPOS_QUERY = Query(None, description="Campos a devolver separados por comas, ej. id,name,win_rate")
+ORDEN_QUERY = Query(None, description="Columnas de orden separadas por comas; '-' para descendente, ej. -kda,name")
+
+
+@app.get("/cache/stats", tags=["Root"])
+def estadisticas_cache():
+    return {tabla: cache.estadisticas() for tabla, cache in cache_entidades.items()}
+
+# HTML del dashboard ya renderizado, por versión de datos.
+# El dashboard lee de la primaria (get_session): su caché y sus ETag van por la
+# versión de los commits, que una réplica atrasada todavía no reflejaría.
+dashboard_cache = CacheVersionada()
+
+
 @app.get("/", response_class=HTMLResponse, tags=["Front"])
 def home(
         request: Request,
         session: Session = Depends(get_session),
 ):
     """Dashboard principal con todas las secciones integradas"""
+    # Entre dos escrituras el HTML es idéntico: se sirve desde caché
+    html = dashboard_cache.obtener(version_actual(), lambda: _renderizar_dashboard(request, session))
+    return HTMLResponse(content=html)
 
-    # Cargar TODOS los datos
-    equipos = listar_equipos(session, skip=0, limit=100, include_deleted=False)
-    jugadores = listar_jugadores(session, skip=0, limit=200, include_deleted=False)
-    campeones = listar_campeones(session, skip=0, limit=200, include_deleted=False)
-    matches = listar_resumenes(session, skip=0, limit=500, include_deleted=False)
-
-    # Agregar win_rate calculado a cada equipo para que Jinja2 pueda accederlo
-    equipos_con_winrate = []
-    total_team_win_rate = 0.0
-    total_team_duration = 0.0
-    teams_with_duration = 0
-    
-    for equipo in equipos:
-        # Convertir a dict y agregar win_rate calculado
-        equipo_dict = equipo.model_dump()
-        total_games = equipo.wins + equipo.losses
-        win_rate = (equipo.wins / total_games * 100) if total_games > 0 else 0.0
-        equipo_dict['win_rate'] = win_rate
-        total_team_win_rate += win_rate
-        
-        # Calcular duración promedio de las partidas de este equipo
-        team_matches = [m for m in matches if m.team_a_id == equipo.id or m.team_b_id == equipo.id]
-        if len(team_matches) > 0:
-            team_avg_duration = sum(m.avg_duration_min for m in team_matches) / len(team_matches)
-            equipo_dict['avg_duration'] = f"{team_avg_duration:.1f} min"
-            total_team_duration += team_avg_duration
-            teams_with_duration += 1
-        else:
-            equipo_dict['avg_duration'] = "-"
-        
-        equipos_con_winrate.append(equipo_dict)
-
-    # Calcular promedios de campeones
-    avg_champion_pick_rate = 0.0
-    avg_champion_win_rate = 0.0
-    if len(campeones) > 0:
-        total_pick_rate = sum(c.pick_rate for c in campeones)
-        total_win_rate = sum(c.win_rate for c in campeones)
-        avg_champion_pick_rate = (total_pick_rate / len(campeones)) * 100
-        avg_champion_win_rate = (total_win_rate / len(campeones)) * 100
-
-    # Calcular promedios de equipos
-    avg_team_win_rate = (total_team_win_rate / len(equipos)) if len(equipos) > 0 else 0.0
-    avg_team_duration = "-"
-    
-    if teams_with_duration > 0:
-        avg_team_duration = f"{(total_team_duration / teams_with_duration):.1f} min"
-
-    # Calcular promedios de jugadores (basados en el KDA promedio de sus equipos)
-    # Como no tenemos win_rate ni KDA individual por jugador, calculamos el promedio de los equipos
-    total_player_kda = 0.0
-    players_with_team = 0
-    
-    for jugador in jugadores:
-        if jugador.team_id:
-            # Buscar el equipo correspondiente
-            equipo = next((e for e in equipos if e.id == jugador.team_id), None)
-            if equipo:
-                total_player_kda += equipo.avg_kda
-                players_with_team += 1
-
-    avg_player_win_rate = avg_team_win_rate  # Usamos el mismo promedio que equipos
-    avg_player_kda = (total_player_kda / players_with_team) if players_with_team > 0 else 0.0
-
-    # Calcular estadísticas
-    stats = {
-        "teams": len(equipos),
-        "players": len(jugadores),
-        "champions": len(campeones),
-        "matches": len(matches),
-        "avg_champion_pick_rate": avg_champion_pick_rate,
-        "avg_champion_win_rate": avg_champion_win_rate,
-        "avg_team_win_rate": avg_team_win_rate,
-        "avg_team_duration": avg_team_duration,
-        "avg_player_win_rate": avg_player_win_rate,
-        "avg_player_kda": avg_player_kda,
-    }
 
-    # Agregar nombres de equipos a los matches para la visualización
-    matches_with_names = []
-    for match in matches:
-        match_dict = match.model_dump()
-        
-        # Buscar los nombres de los equipos
-        team_a = next((e for e in equipos if e.id == match.team_a_id), None)
-        team_b = next((e for e in equipos if e.id == match.team_b_id), None)
-        winner = next((e for e in equipos if e.id == match.winner_id), None)
-        
-        match_dict['team_a_name'] = team_a.name if team_a else f"Team {match.team_a_id}"
-        match_dict['team_b_name'] = team_b.name if team_b else f"Team {match.team_b_id}"
-        match_dict['winner_name'] = winner.name if winner else f"Team {match.winner_id}"
-        
-        matches_with_names.append(match_dict)
+# Tablas de las que depende cada sección del dashboard (para ETag por sección)
+SECCIONES_DASHBOARD = {
+    "stats": ("champion", "team", "matchsummary", "player"),
+    "champions": ("champion",),
+    "teams": ("team", "matchsummary"),
+    "players": ("player",),
+    "matches": ("matchsummary", "team"),
+}
+
+
+def _datos_dashboard(session: Session, secciones) -> dict:
+    """Datos de las secciones pedidas del dashboard (listas ya serializables)."""
+    datos = {}
+
+    if "stats" in secciones:
+        # Estadísticas globales: una sola fila mantenida por las operaciones de escritura
+        datos["stats"] = obtener_estadisticas(session)
+
+    if "teams" in secciones:
+        equipos = listar_equipos(session, skip=0, limit=100, include_deleted=False)
+        # Duración promedio por equipo desde los agregados materializados
+        team_stats = obtener_team_stats(session, [equipo.id for equipo in equipos])
+
+        # Agregar win_rate calculado a cada equipo para que Jinja2 pueda accederlo
+        equipos_con_winrate = []
+        for equipo in equipos:
+            equipo_dict = equipo.model_dump()
+            equipo_dict['win_rate'] = equipo.win_rate
+
+            ts = team_stats.get(equipo.id)
+            if ts and ts.matches > 0:
+                equipo_dict['avg_duration'] = f"{(ts.duration_sum / ts.matches):.1f} min"
+            else:
+                equipo_dict['avg_duration'] = "-"
+
+            equipos_con_winrate.append(equipo_dict)
+        datos["teams"] = equipos_con_winrate
 
     # Convertir jugadores y campeones a diccionarios para serialización JSON
-    jugadores_dict = [jugador.model_dump() for jugador in jugadores]
-    campeones_dict = [campeon.model_dump() for campeon in campeones]
+    if "players" in secciones:
+        jugadores = listar_jugadores(session, skip=0, limit=200, include_deleted=False)
+        datos["players"] = [jugador.model_dump() for jugador in jugadores]
 
-    # Retornar la respuesta con los cálculos de los promedios
-    return templates.TemplateResponse(
-        "index.html",
+    if "champions" in secciones:
+        campeones = listar_campeones(session, skip=0, limit=200, include_deleted=False)
+        datos["champions"] = [campeon.model_dump() for campeon in campeones]
+
+    if "matches" in secciones:
+        # Nombres de equipos de cada partida resueltos con JOIN en SQL
+        datos["matches"] = listar_resumenes_con_equipos(session, skip=0, limit=500)
+
+    return datos
+
+
+def _renderizar_dashboard(request: Request, session: Session) -> bytes:
+    datos = _datos_dashboard(session, SECCIONES_DASHBOARD)
+
+    # Retornar el HTML con los cálculos de los promedios
+    return templates.get_template("index.html").render(
         {
             "request": request,
-            "stats": stats,
-            "equipos": equipos_con_winrate,
-            "jugadores": jugadores_dict,
-            "campeones": campeones_dict,
-            "matches": matches_with_names,
+            "stats": datos["stats"],
+            "equipos": datos["teams"],
+            "jugadores": datos["players"],
+            "campeones": datos["champions"],
+            "matches": datos["matches"],
         },
+    ).encode("utf-8")
+
+
+def _etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidatos = {c.strip().removeprefix("W/") for c in if_none_match.split(",")}
+    return "*" in candidatos or etag in candidatos
+
+
+@app.get("/api/dashboard", tags=["Front"])
+def api_dashboard(
+    request: Request,
+    sections: Optional[str] = Query(
+        None,
+        description=f"Secciones separadas por coma ({', '.join(SECCIONES_DASHBOARD)}). Por defecto todas.",
+    ),
+    session: Session = Depends(get_session),
+):
+    """Datos del dashboard en JSON con ETag fuerte; responde 304 si no cambió nada."""
+    secciones = [s.strip() for s in sections.split(",") if s.strip()] if sections else list(SECCIONES_DASHBOARD)
+    desconocidas = [s for s in secciones if s not in SECCIONES_DASHBOARD]
+    if desconocidas:
+        raise HTTPException(status_code=400, detail=f"Secciones no válidas: {', '.join(desconocidas)}")
+
+    # La versión se lee ANTES que los datos: el ETag nunca es más nuevo que el contenido
+    tablas = {t for s in secciones for t in SECCIONES_DASHBOARD[s]}
+    etag = etag_tablas(tablas, extra=",".join(sorted(secciones)))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(_datos_dashboard(session, secciones), headers=headers)
+
+
+# Sin mensajes durante este tiempo se manda un comentario para mantener viva la conexión
+SSE_KEEPALIVE_SEGUNDOS = 15
+
+
+@app.get("/events", tags=["Front"])
+async def eventos(request: Request):
+    """Stream SSE con un mensaje {entity, id, op, version} por cada registro confirmado."""
+    cliente = broadcaster.conectar()
+
+    async def stream():
+        try:
+            yield f"retry: 3000\nevent: hello\ndata: {version_actual()}\n\n"
+            while True:
+                try:
+                    mensaje = await asyncio.wait_for(cliente.cola.get(), SSE_KEEPALIVE_SEGUNDOS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                if mensaje is None:  # expulsado por lento o servidor cerrando
+                    break
+                yield f"event: change\ndata: {mensaje}\n\n"
+        finally:
+            broadcaster.desconectar(cliente)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
+# BÚSQUEDA GLOBAL
+
+@app.get("/search", tags=["Search"])
+async def buscar_en_todo(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    session=Depends(get_db),
+):
+    """Campeones, equipos, jugadores y partidas que coinciden con q, los más relevantes primero."""
+    return await ejecutar(session, buscar_global, q, limit)
+
+
+@app.get("/suggest", tags=["Search"])
+def sugerir_nombres(
+    prefix: str = Query(..., min_length=1),
+    entity: Optional[str] = Query(None, description=f"Una de: {', '.join(CAMPOS_SUGERENCIAS)}. Por defecto todas."),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Autocompletar nombres de campeones, equipos y jugadores desde un índice en memoria."""
+    if entity is not None and entity not in CAMPOS_SUGERENCIAS:
+        raise HTTPException(status_code=400, detail=f"Entidad no válida: {entity}")
+    return sugerir(prefix, entity, limit)
+
+
+# CARGA POR LOTES
+# Cuerpo: array JSON o NDJSON (un objeto por línea, Content-Type application/x-ndjson)
+
+MAX_LOTE = 50_000
+
+LOTE_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": {"type": "object"}}},
+            "application/x-ndjson": {"schema": {"type": "string"}},
+        },
+    }
+}
+
+
+async def _leer_lote(request: Request) -> list:
+    cuerpo = await request.body()
+    tipo = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in tipo or "jsonlines" in tipo:
+            items = [json.loads(linea) for linea in cuerpo.splitlines() if linea.strip()]
+        else:
+            items = json.loads(cuerpo)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Cuerpo no es JSON/NDJSON válido: {e}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Se esperaba un array JSON de objetos")
+    if len(items) > MAX_LOTE:
+        raise HTTPException(status_code=413, detail=f"El lote supera el máximo de {MAX_LOTE} elementos")
+    return items
+
+
 # CHAMPIONS  (orden: estáticas -> dinámicas)
 
 @app.post("/champions/", response_model=Champion, tags=["Champions"])
-def crear_nuevo_campeon(obj: Champion, session: Session = Depends(get_session)):
+async def crear_nuevo_campeon(obj: Champion):
     # respuesta de creación NO incluye 'id' ni 'is_deleted' (se controla en operations)
-    return crear_campeon(session, obj)
-
-@app.get("/champions/", response_model=List[Champion], tags=["Champions"])
-def listar_todos_los_campeones(
-    skip: int = 0,
+    return await escribir(crear_campeon, obj)
+
+@app.post("/champions/bulk", tags=["Champions"], openapi_extra=LOTE_OPENAPI)
+async def crear_lote_campeones(request: Request, upsert: bool = UPSERT_QUERY):
+    items = await _leer_lote(request)
+    return await escribir(crear_campeones_lote, items, upsert)
+
+@app.post("/champions/bulk-delete", tags=["Champions"])
+async def eliminar_lote_campeones(sel: SeleccionLote):
+    return await escribir(eliminar_campeones_lote, ids=sel.ids, filtro=sel.filter)
+
+@app.post("/champions/bulk-restore", tags=["Champions"])
+async def restaurar_lote_campeones(sel: SeleccionLote):
+    return await escribir(restaurar_campeones_lote, ids=sel.ids, filtro=sel.filter)
+
+@app.get("/champions/", response_model=List[Champion], tags=["Champions"], description=descripcion_filtros(Champion))
+async def listar_todos_los_campeones(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, description="Obsoleto: usar cursor"),
     limit: int = Query(10, le=100),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
     include_deleted: bool = Query(False, description="Incluir eliminados lógicamente"),
-    session: Session = Depends(get_session)
+    fields: Optional[str] = CAMPOS_QUERY,
+    sort: Optional[str] = ORDEN_QUERY,
+    session=Depends(get_db),
 ):
-    return listar_campeones(session, skip=skip, limit=limit, include_deleted=include_deleted)
+    campos = campos_pedidos(Champion, fields)
+    filtros = leer_filtros(Champion, request.query_params.multi_items(), sort, include_deleted)
+    items = await ejecutar(
+        session, listar_campeones, skip=skip, limit=limit, include_deleted=include_deleted,
+        after=decodificar_cursor(cursor, filtros.orden), campos=campos, filtros=filtros,
+    )
+    anotar_siguiente_pagina(request, response, items, limit, filtros.orden)
+    return _filas(items, campos, response)
 
 # --- RUTAS ESTÁTICAS
 @app.get("/champions/deleted", response_model=List[Champion], tags=["Champions"])
-def listar_campeones_borrados(session: Session = Depends(get_session)):
-    return listar_campeones_eliminados(session)
+async def listar_campeones_borrados(fields: Optional[str] = CAMPOS_QUERY, session=Depends(get_db)):
+    campos = campos_pedidos(Champion, fields)
+    return _filas(await ejecutar(session, listar_campeones_eliminados, campos), campos)
 
 @app.post("/champions/{champion_id}/restore", tags=["Champions"])
-def restaurar_campeon_por_id(champion_id: int, session: Session = Depends(get_session)):
-    if restaurar_campeon(session, champion_id):
+async def restaurar_campeon_por_id(champion_id: int):
+    if await escribir(restaurar_campeon, champion_id):
         return {"message": "Campeón restaurado correctamente"}
     raise HTTPException(status_code=404, detail="No fue posible restaurar el campeón")
 
 @app.get("/champions/search/", response_model=List[Champion], tags=["Champions"])
-def buscar_campeon(nombre: str = Query(..., min_length=1), session: Session = Depends(get_session)):
-    return buscar_campeon_por_nombre(session, nombre)
+async def buscar_campeon(
+    nombre: str = Query(..., min_length=1),
+    fields: Optional[str] = CAMPOS_QUERY,
+    session=Depends(get_db),
+):
+    campos = campos_pedidos(Champion, fields)
+    return _filas(await ejecutar(session, buscar_campeon_por_nombre, nombre, campos), campos)
 
 @app.get("/champions/filter/winrate/", response_model=List[Champion], tags=["Champions"])
-def filtrar_campeones_por_winrate_minimo(min_winrate: float = Query(0.5, ge=0.0), session: Session = Depends(get_session)):
-    return filtrar_campeones_por_winrate(session, min_winrate)
+async def filtrar_campeones_por_winrate_minimo(
+    min_winrate: float = Query(0.5, ge=0.0),
+    fields: Optional[str] = CAMPOS_QUERY,
+    session=Depends(get_db),
+):
+    campos = campos_pedidos(Champion, fields)
+    return _filas(await ejecutar(session, filtrar_campeones_por_winrate, min_winrate, campos), campos)
 
 # --- RUTAS CON PARÁMETRO
 @app.get("/champions/{champion_id}", response_model=Champion, tags=["Champions"])
-def obtener_campeon_por_id(champion_id: int, session: Session = Depends(get_session)):
-    return obtener_campeon(session, champion_id)
+async def obtener_campeon_por_id(
+    champion_id: int, fields: Optional[str] = CAMPOS_QUERY, session=Depends(get_db)
+):
+    return await ejecutar(session, _respuesta_cacheada, "champion", champion_id, fields, obtener_campeon)
 
 @app.put("/champions/{champion_id}", response_model=Champion, tags=["Champions"])
-def actualizar_datos_campeon(champion_id: int, obj: Champion, session: Session = Depends(get_session)):
-    return actualizar_campeon(session, champion_id, obj)
+async def actualizar_datos_campeon(champion_id: int, obj: Champion):
+    return await escribir(actualizar_campeon, champion_id, obj)
 
 @app.delete("/champions/{champion_id}", tags=["Champions"])
-def eliminar_campeon_por_id(champion_id: int, session: Session = Depends(get_session)):
-    if eliminar_campeon(session, champion_id):
+async def eliminar_campeon_por_id(champion_id: int):
+    if await escribir(eliminar_campeon, champion_id):
         return {"message": "Campeón eliminado correctamente"}
     raise HTTPException(status_code=404, detail="Campeón no encontrado")
 
@@ -210,52 +472,111 @@ def eliminar_campeon_por_id(champion_id: int, session: Session = Depends(get_ses
 # TEAMS  (orden: estáticas -> dinámicas)
 
 @app.post("/teams/", response_model=Team, tags=["Teams"])
-def crear_nuevo_equipo(obj: Team, session: Session = Depends(get_session)):
-    return crear_equipo(session, obj)
-
-@app.get("/teams/", response_model=List[Team], tags=["Teams"])
-def listar_todos_los_equipos(
-    skip: int = 0,
+async def crear_nuevo_equipo(obj: Team):
+    return await escribir(crear_equipo, obj)
+
+@app.post("/teams/bulk", tags=["Teams"], openapi_extra=LOTE_OPENAPI)
+async def crear_lote_equipos(request: Request, upsert: bool = UPSERT_QUERY):
+    items = await _leer_lote(request)
+    return await escribir(crear_equipos_lote, items, upsert)
+
+@app.post("/teams/bulk-delete", tags=["Teams"])
+async def eliminar_lote_equipos(sel: SeleccionLote):
+    return await escribir(eliminar_equipos_lote, ids=sel.ids, filtro=sel.filter)
+
+@app.post("/teams/bulk-restore", tags=["Teams"])
+async def restaurar_lote_equipos(sel: SeleccionLote):
+    return await escribir(restaurar_equipos_lote, ids=sel.ids, filtro=sel.filter)
+
+@app.get("/teams/", response_model=List[Team], tags=["Teams"], description=descripcion_filtros(Team))
+async def listar_todos_los_equipos(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, description="Obsoleto: usar cursor"),
     limit: int = Query(10, le=100),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
     include_deleted: bool = Query(False, description="Incluir eliminados lógicamente"),
-    session: Session = Depends(get_session)
+    fields: Optional[str] = CAMPOS_QUERY,
+    sort: Optional[str] = ORDEN_QUERY,
+    session=Depends(get_db),
 ):
-    return listar_equipos(session, skip=skip, limit=limit, include_deleted=include_deleted)
+    campos = campos_pedidos(Team, fields)
+    filtros = leer_filtros(Team, request.query_params.multi_items(), sort, include_deleted)
+    items = await ejecutar(
+        session, listar_equipos, skip=skip, limit=limit, include_deleted=include_deleted,
+        after=decodificar_cursor(cursor, filtros.orden), campos=campos, filtros=filtros,
+    )
+    anotar_siguiente_pagina(request, response, items, limit, filtros.orden)
+    return _filas(items, campos, response)
 
 # --- RUTAS ESTÁTICAS (antes de /{team_id})
 @app.get("/teams/deleted", response_model=List[Team], tags=["Teams"])
-def listar_equipos_borrados(session: Session = Depends(get_session)):
-    return listar_equipos_eliminados(session)
+async def listar_equipos_borrados(fields: Optional[str] = CAMPOS_QUERY, session=Depends(get_db)):
+    campos = campos_pedidos(Team, fields)
+    return _filas(await ejecutar(session, listar_equipos_eliminados, campos), campos)
 
 @app.post("/teams/{team_id}/restore", tags=["Teams"])
-def restaurar_equipo_por_id(team_id: int, session: Session = Depends(get_session)):
-    if restaurar_equipo(session, team_id):
+async def restaurar_equipo_por_id(team_id: int):
+    if await escribir(restaurar_equipo, team_id):
         return {"message": "Equipo restaurado correctamente"}
     raise HTTPException(status_code=404, detail="No fue posible restaurar el equipo")
 
 @app.get("/teams/search/", response_model=List[Team], tags=["Teams"])
-def buscar_equipo(nombre: str = Query(..., min_length=1), session: Session = Depends(get_session)):
-    return buscar_equipo_por_nombre(session, nombre)
+async def buscar_equipo(
+    nombre: str = Query(..., min_length=1),
+    fields: Optional[str] = CAMPOS_QUERY,
+    session=Depends(get_db),
+):
+    campos = campos_pedidos(Team, fields)
+    return _filas(await ejecutar(session, buscar_equipo_por_nombre, nombre, campos), campos)
+
+@app.get("/teams/search/fuzzy", tags=["Teams"])
+async def buscar_equipo_difuso(
+    nombre: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    min_score: float = Query(0.5, ge=0.0, le=1.0),
+    session=Depends(get_db),
+):
+    return await ejecutar(session, buscar_equipos_difuso, nombre, limit, min_score)
 
 @app.get("/teams/region/{region}", response_model=List[Team], tags=["Teams"])
-def filtrar_equipos_por_region(region: str, session: Session = Depends(get_session)):
-    equipos = filtrar_equipo_por_region(session, region)
+async def filtrar_equipos_por_region(region: str, fields: Optional[str] = CAMPOS_QUERY, session=Depends(get_db)):
+    campos = campos_pedidos(Team, fields)
+    equipos = await ejecutar(session, filtrar_equipo_por_region, region, campos)
     if not equipos:
         raise HTTPException(status_code=404, detail=f"No hay equipos registrados en la región {region}")
-    return equipos
+    return _filas(equipos, campos)
 
 # --- RUTAS CON PARÁMETRO (al final)
 @app.get("/teams/{team_id}", response_model=Team, tags=["Teams"])
-def obtener_equipo_por_id(team_id: int, session: Session = Depends(get_session)):
-    return obtener_equipo(session, team_id)
+async def obtener_equipo_por_id(team_id: int, fields: Optional[str] = CAMPOS_QUERY, session=Depends(get_db)):
+    return await ejecutar(session, _respuesta_cacheada, "team", team_id, fields, obtener_equipo)
+
+@app.get("/teams/{team_id}/matches", response_model=List[MatchSummaryConEquipos], tags=["Teams"])
+async def listar_partidas_del_equipo(
+    team_id: int,
+    request: Request,
+    response: Response,
+    stage: Optional[str] = Query(None, min_length=1, description="Solo partidas de esa etapa"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
+    session=Depends(get_db),
+):
+    posicion = decodificar_cursor(cursor)
+    items = await ejecutar(
+        session, listar_partidas_de_equipo, team_id,
+        stage=stage, limit=limit, after_id=posicion[0] if posicion else None,
+    )
+    anotar_siguiente_pagina(request, response, items, limit)
+    return items
 
 @app.put("/teams/{team_id}", response_model=Team, tags=["Teams"])
-def actualizar_datos_equipo(team_id: int, obj: Team, session: Session = Depends(get_session)):
-    return actualizar_equipo(session, team_id, obj)
+async def actualizar_datos_equipo(team_id: int, obj: Team):
+    return await escribir(actualizar_equipo, team_id, obj)
 
 @app.delete("/teams/{team_id}", tags=["Teams"])
-def eliminar_equipo_por_id(team_id: int, session: Session = Depends(get_session)):
-    if eliminar_equipo(session, team_id):
+async def eliminar_equipo_por_id(team_id: int):
+    if await escribir(eliminar_equipo, team_id):
         return {"message": "Equipo eliminado correctamente"}
     raise HTTPException(status_code=404, detail="Equipo no encontrado")
 
@@ -263,113 +584,207 @@ def eliminar_equipo_por_id(team_id: int, session: Session = Depends(get_session)
 # MATCHES
 
 @app.post("/matches/", response_model=MatchSummary, tags=["Matches"])
-def crear_nueva_partida(obj: MatchSummary, session: Session = Depends(get_session)):
-    return crear_resumen(session, obj)
-
-@app.get("/matches/", response_model=List[MatchSummary], tags=["Matches"])
-def listar_todas_las_partidas(
-    skip: int = 0,
+async def crear_nueva_partida(obj: MatchSummary):
+    return await escribir(crear_resumen, obj)
+
+@app.post("/matches/bulk", tags=["Matches"], openapi_extra=LOTE_OPENAPI)
+async def crear_lote_partidas(request: Request):
+    items = await _leer_lote(request)
+    return await escribir(crear_resumenes_lote, items)
+
+@app.post("/matches/bulk-delete", tags=["Matches"])
+async def eliminar_lote_partidas(sel: SeleccionLote):
+    return await escribir(eliminar_resumenes_lote, ids=sel.ids, filtro=sel.filter)
+
+@app.post("/matches/bulk-restore", tags=["Matches"])
+async def restaurar_lote_partidas(sel: SeleccionLote):
+    return await escribir(restaurar_resumenes_lote, ids=sel.ids, filtro=sel.filter)
+
+@app.get("/matches/", response_model=List[MatchSummary], tags=["Matches"], description=descripcion_filtros(MatchSummary))
+async def listar_todas_las_partidas(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, description="Obsoleto: usar cursor"),
     limit: int = Query(10, le=100),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
     include_deleted: bool = Query(False, description="Incluir eliminados lógicamente"),
-    session: Session = Depends(get_session)
+    fields: Optional[str] = CAMPOS_QUERY,
+    sort: Optional[str] = ORDEN_QUERY,
+    expand: Optional[Literal["champions"]] = Query(None, description="champions: añade los campeones de cada partida"),
+    session=Depends(get_db),
 ):
-    return listar_resumenes(session, skip=skip, limit=limit, include_deleted=include_deleted)
+    campos = campos_pedidos(MatchSummary, fields)
+    filtros = leer_filtros(MatchSummary, request.query_params.multi_items(), sort, include_deleted)
+    items = await ejecutar(
+        session, listar_resumenes, skip=skip, limit=limit, include_deleted=include_deleted,
+        after=decodificar_cursor(cursor, filtros.orden), campos=campos, filtros=filtros,
+    )
+    anotar_siguiente_pagina(request, response, items, limit, filtros.orden)
+    if expand == "champions":
+        # Una consulta más para toda la página; la clave extra no está en MatchSummary
+        return RespuestaJSON(
+            await ejecutar(session, expandir_campeones, _solo_campos(items, campos)), headers=response.headers
+        )
+    return _filas(items, campos, response)
 
 # --- RUTAS ESTÁTICAS
 @app.get("/matches/deleted", response_model=List[MatchSummary], tags=["Matches"])
-def listar_partidas_borradas(session: Session = Depends(get_session)):
-    return listar_resumenes_eliminados(session)
+async def listar_partidas_borradas(fields: Optional[str] = CAMPOS_QUERY, session=Depends(get_db)):
+    campos = campos_pedidos(MatchSummary, fields)
+    return _filas(await ejecutar(session, listar_resumenes_eliminados, campos), campos)
+
+@app.get("/matches/{resumen_id}/champions", response_model=List[Champion], tags=["Matches"])
+async def listar_campeones_de_partida(resumen_id: int, session=Depends(get_db)):
+    return await ejecutar(session, obtener_campeones_de_match, resumen_id)
+
+@app.put("/matches/{resumen_id}/champions", response_model=List[Champion], tags=["Matches"])
+async def asignar_campeones_a_partida(resumen_id: int, datos: CampeonesDeMatch):
+    return await escribir(asignar_campeones_a_match, resumen_id, datos.champion_ids)
 
 @app.post("/matches/{resumen_id}/restore", tags=["Matches"])
-def restaurar_partida_por_id(resumen_id: int, session: Session = Depends(get_session)):
-    if restaurar_resumen(session, resumen_id):
+async def restaurar_partida_por_id(resumen_id: int):
+    if await escribir(restaurar_resumen, resumen_id):
         return {"message": "Resumen restaurado correctamente"}
     raise HTTPException(status_code=404, detail="No fue posible restaurar el resumen")
 
+@app.get("/matches/{resumen_id}", response_model=MatchSummary, tags=["Matches"])
+async def obtener_partida_por_id(resumen_id: int, fields: Optional[str] = CAMPOS_QUERY, session=Depends(get_db)):
+    return await ejecutar(session, _respuesta_cacheada, "matchsummary", resumen_id, fields, obtener_resumen)
+
+@app.delete("/matches/{resumen_id}", tags=["Matches"])
+async def eliminar_partida_por_id(resumen_id: int):
+    if await escribir(eliminar_resumen, resumen_id):
+        return {"message": "Resumen eliminado correctamente"}
+    raise HTTPException(status_code=404, detail="Resumen no encontrado")
+
 @app.get("/matches/search/", response_model=List[MatchSummary], tags=["Matches"])
-def buscar_partidas_por_etapa(etapa: str = Query(..., min_length=1), session: Session = Depends(get_session)):
-    return buscar_resumen_por_etapa(session, etapa)
+async def buscar_partidas_por_etapa(
+    etapa: str = Query(..., min_length=1),
+    fields: Optional[str] = CAMPOS_QUERY,
+    session=Depends(get_db),
+):
+    campos = campos_pedidos(MatchSummary, fields)
+    return _filas(await ejecutar(session, buscar_resumen_por_etapa, etapa, campos), campos)
 
 @app.get("/matches/winner/{team_id}", response_model=List[MatchSummary], tags=["Matches"])
-def filtrar_partidas_por_ganador(team_id: int, session: Session = Depends(get_session)):
-    partidas = filtrar_resumen_por_ganador(session, team_id)
+async def filtrar_partidas_por_ganador(
+    team_id: int, fields: Optional[str] = CAMPOS_QUERY, session=Depends(get_db)
+):
+    campos = campos_pedidos(MatchSummary, fields)
+    partidas = await ejecutar(session, filtrar_resumen_por_ganador, team_id, campos)
     if not partidas:
         raise HTTPException(status_code=404, detail="No se encontraron partidas ganadas por este equipo")
-    return partidas
+    return _filas(partidas, campos)
 
 
 # PLAYERS
 
 @app.post("/players/", response_model=Player, tags=["Players"])
-def crear_nuevo_jugador(obj: Player, session: Session = Depends(get_session)):
-    return crear_jugador(session, obj)
+async def crear_nuevo_jugador(obj: Player):
+    return await escribir(crear_jugador, obj)
+
 
+@app.post("/players/bulk", tags=["Players"], openapi_extra=LOTE_OPENAPI)
+async def crear_lote_jugadores(request: Request):
+    items = await _leer_lote(request)
+    return await escribir(crear_jugadores_lote, items)
 
-@app.get("/players/", response_model=List[Player], tags=["Players"])
-def listar_todos_los_jugadores(
-    skip: int = 0,
+@app.post("/players/bulk-delete", tags=["Players"])
+async def eliminar_lote_jugadores(sel: SeleccionLote):
+    return await escribir(eliminar_jugadores_lote, ids=sel.ids, filtro=sel.filter)
+
+@app.post("/players/bulk-restore", tags=["Players"])
+async def restaurar_lote_jugadores(sel: SeleccionLote):
+    return await escribir(restaurar_jugadores_lote, ids=sel.ids, filtro=sel.filter)
+
+@app.get("/players/", response_model=List[Player], tags=["Players"], description=descripcion_filtros(Player))
+async def listar_todos_los_jugadores(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, description="Obsoleto: usar cursor"),
     limit: int = Query(10, le=100),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
     include_deleted: bool = Query(False, description="Incluir eliminados lógicamente"),
-    session: Session = Depends(get_session),
+    fields: Optional[str] = CAMPOS_QUERY,
+    sort: Optional[str] = ORDEN_QUERY,
+    session=Depends(get_db),
 ):
-    return listar_jugadores(session, skip=skip, limit=limit, include_deleted=include_deleted)
+    campos = campos_pedidos(Player, fields)
+    filtros = leer_filtros(Player, request.query_params.multi_items(), sort, include_deleted)
+    items = await ejecutar(
+        session, listar_jugadores, skip=skip, limit=limit, include_deleted=include_deleted,
+        after=decodificar_cursor(cursor, filtros.orden), campos=campos, filtros=filtros,
+    )
+    anotar_siguiente_pagina(request, response, items, limit, filtros.orden)
+    return _filas(items, campos, response)
 
 @app.get("/players/deleted", response_model=List[Player], tags=["Players"])
-def listar_jugadores_borrados(session: Session = Depends(get_session)):
+async def listar_jugadores_borrados(fields: Optional[str] = CAMPOS_QUERY, session=Depends(get_db)):
     """Lista solo los jugadores con soft delete (is_deleted = True)."""
-    return listar_jugadores_eliminados(session)
+    campos = campos_pedidos(Player, fields)
+    return _filas(await ejecutar(session, listar_jugadores_eliminados, campos), campos)
 
 
 @app.post("/players/{player_id}/restore", tags=["Players"])
-def restaurar_jugador_por_id(player_id: int, session: Session = Depends(get_session)):
+async def restaurar_jugador_por_id(player_id: int):
     """Restaura un jugador eliminado (is_deleted pasa a False)."""
-    if restaurar_jugador(session, player_id):
+    if await escribir(restaurar_jugador, player_id):
         return {"message": "Jugador restaurado correctamente"}
     raise HTTPException(status_code=404, detail="No fue posible restaurar el jugador")
 
 
 @app.get("/players/search/", response_model=List[Player], tags=["Players"])
-def buscar_jugadores(
+async def buscar_jugadores(
     nickname: str = Query(..., min_length=1),
-    session: Session = Depends(get_session),
+    fields: Optional[str] = CAMPOS_QUERY,
+    session=Depends(get_db),
 ):
-    return buscar_jugadores_por_nickname(session, nickname)
+    campos = campos_pedidos(Player, fields)
+    return _filas(await ejecutar(session, buscar_jugadores_por_nickname, nickname, campos), campos)
+
+
+@app.get("/players/search/fuzzy", tags=["Players"])
+async def buscar_jugadores_difuso_por_nickname(
+    nickname: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    min_score: float = Query(0.5, ge=0.0, le=1.0),
+    session=Depends(get_db),
+):
+    return await ejecutar(session, buscar_jugadores_difuso, nickname, limit, min_score)
 
 
 @app.get("/players/role/{role}", response_model=List[Player], tags=["Players"])
-def filtrar_jugadores_por_role(role: str, session: Session = Depends(get_session)):
-    jugadores = filtrar_jugadores_por_rol(session, role)
+async def filtrar_jugadores_por_role(role: str, fields: Optional[str] = CAMPOS_QUERY, session=Depends(get_db)):
+    campos = campos_pedidos(Player, fields)
+    jugadores = await ejecutar(session, filtrar_jugadores_por_rol, role, campos)
     if not jugadores:
         raise HTTPException(status_code=404, detail="No se encontraron jugadores para ese rol")
-    return jugadores
+    return _filas(jugadores, campos)
 
 
 @app.get("/players/team/{team_id}", response_model=List[Player], tags=["Players"])
-def filtrar_jugadores_por_team(team_id: int, session: Session = Depends(get_session)):
-    jugadores = filtrar_jugadores_por_equipo(session, team_id)
+async def filtrar_jugadores_por_team(team_id: int, fields: Optional[str] = CAMPOS_QUERY, session=Depends(get_db)):
+    campos = campos_pedidos(Player, fields)
+    jugadores = await ejecutar(session, filtrar_jugadores_por_equipo, team_id, campos)
     if not jugadores:
         raise HTTPException(status_code=404, detail="No se encontraron jugadores para ese equipo")
-    return jugadores
+    return _filas(jugadores, campos)
 
 
 # --- RUTAS CON PARÁMETRO (CRUD por id)
 
 @app.get("/players/{player_id}", response_model=Player, tags=["Players"])
-def obtener_jugador_por_id(player_id: int, session: Session = Depends(get_session)):
-    return obtener_jugador(session, player_id)
+async def obtener_jugador_por_id(player_id: int, fields: Optional[str] = CAMPOS_QUERY, session=Depends(get_db)):
+    return await ejecutar(session, _respuesta_cacheada, "player", player_id, fields, obtener_jugador)
 
 
 @app.put("/players/{player_id}", response_model=Player, tags=["Players"])
-def actualizar_datos_jugador(
-    player_id: int,
-    obj: Player,
-    session: Session = Depends(get_session),
-):
-    return actualizar_jugador(session, player_id, obj)
+async def actualizar_datos_jugador(player_id: int, obj: Player):
+    return await escribir(actualizar_jugador, player_id, obj)
 
 
 @app.delete("/players/{player_id}", tags=["Players"])
-def eliminar_jugador_por_id(player_id: int, session: Session = Depends(get_session)):
-    if eliminar_jugador(session, player_id):
+async def eliminar_jugador_por_id(player_id: int):
+    if await escribir(eliminar_jugador, player_id):
         return {"message": "Jugador eliminado correctamente"}
     raise HTTPException(status_code=404, detail="Jugador no encontrado")
@@ -0,0 +1,272 @@
+"""
+Índice de texto completo (SQLite FTS5 con tokenizer trigram).
+
+Cada tabla tiene su tabla virtual fts_<tabla> con las columnas de texto que se
+buscan. La mantienen triggers de la propia BD, así que cualquier escritura
+(API, lotes, seed) queda indexada en la misma transacción. Solo se indexan
+filas activas; el rowid de la tabla FTS es el id del registro.
+
+El tokenizer trigram resuelve LIKE '%x%' (3+ caracteres) desde el índice:
+las búsquedas por subcadena mantienen su semántica sin recorrer la tabla.
+En otros motores, o si SQLite no trae FTS5, se sigue usando ILIKE.
+
+Para autocompletar (/suggest) y la búsqueda difusa se usan además índices en
+memoria (utils.sugerencias), cargados al arrancar y mantenidos con los commits.
+"""
+import logging
+import queue
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, literal, or_, text, union_all
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select
+
+from data.models import Champion, Team, MatchSummary, Player
+from utils.cambios import Cambio
+from utils.sugerencias import IndiceDifuso, IndicePrefijos, normalizar
+
+logger = logging.getLogger(__name__)
+
+# Columnas indexadas por tabla; la primera es el título que devuelve /search
+CAMPOS_FTS = {
+    "champion": ("name", "slug"),
+    "team": ("name", "region"),
+    "player": ("nickname", "real_name"),
+    "matchsummary": ("stage",),
+}
+MODELOS = {"champion": Champion, "team": Team, "player": Player, "matchsummary": MatchSummary}
+
+# El tokenizer trigram no indexa términos más cortos
+MIN_TRIGRAMA = 3
+
+_fts_activo = False
+
+
+def fts_activo() -> bool:
+    return _fts_activo
+
+
+def _ddl(tabla: str) -> List[str]:
+    campos = CAMPOS_FTS[tabla]
+    cols = ", ".join(campos)
+    nuevos = ", ".join(f"new.{c}" for c in campos)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS fts_{tabla} USING fts5({cols}, tokenize='trigram')",
+        f"""CREATE TRIGGER IF NOT EXISTS fts_{tabla}_ai AFTER INSERT ON {tabla} WHEN new.is_deleted = 0 BEGIN
+            INSERT INTO fts_{tabla}(rowid, {cols}) VALUES (new.id, {nuevos});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS fts_{tabla}_au AFTER UPDATE ON {tabla} BEGIN
+            DELETE FROM fts_{tabla} WHERE rowid = old.id;
+            INSERT INTO fts_{tabla}(rowid, {cols}) SELECT new.id, {nuevos} WHERE new.is_deleted = 0;
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS fts_{tabla}_ad AFTER DELETE ON {tabla} BEGIN
+            DELETE FROM fts_{tabla} WHERE rowid = old.id;
+        END""",
+    ]
+
+
+def asegurar_busqueda(session: Session) -> None:
+    """
+    Crea las tablas FTS y sus triggers si faltan.
+    - Si falta algún trigger (BD nueva, reset_db, datos cargados antes) se reindexa esa tabla.
+    """
+    global _fts_activo
+    if session.get_bind().dialect.name != "sqlite":
+        return
+    try:
+        for tabla, campos in CAMPOS_FTS.items():
+            triggers = session.execute(
+                text("SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE :p"),
+                {"p": f"fts_{tabla}_%"},
+            ).scalar_one()
+            for sentencia in _ddl(tabla):
+                session.execute(text(sentencia))
+            if triggers < 3:
+                cols = ", ".join(campos)
+                session.execute(text(f"DELETE FROM fts_{tabla}"))
+                session.execute(text(
+                    f"INSERT INTO fts_{tabla}(rowid, {cols}) SELECT id, {cols} FROM {tabla} WHERE is_deleted = 0"
+                ))
+        session.commit()
+        _fts_activo = True
+    except OperationalError:
+        session.rollback()
+        logger.warning("SQLite sin FTS5: las búsquedas usarán ILIKE")
+
+
+def _expresion_match(q: str) -> str:
+    """Cada término de 3+ caracteres como frase (subcadena con trigram); todos deben aparecer."""
+    terminos = [t for t in re.split(r"\s+", q.strip()) if len(t) >= MIN_TRIGRAMA]
+    return " ".join('"' + t.replace('"', '""') + '"' for t in terminos)
+
+
+def buscar_global(session: Session, q: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Coincidencias en todas las entidades, ordenadas por relevancia (bm25), en una sola consulta."""
+    expresion = _expresion_match(q) if _fts_activo else ""
+    if expresion:
+        partes = [
+            f"SELECT '{tabla}' AS entity, rowid AS id, {campos[0]} AS title, bm25(fts_{tabla}) AS rank "
+            f"FROM fts_{tabla} WHERE fts_{tabla} MATCH :q"
+            for tabla, campos in CAMPOS_FTS.items()
+        ]
+        sql = " UNION ALL ".join(partes) + " ORDER BY rank LIMIT :limit"
+        filas = session.execute(text(sql), {"q": expresion, "limit": limit}).mappings().all()
+    else:
+        # Términos cortos (ej. "T1") o sin FTS: subcadena sobre las tablas, sin ranking
+        patron = f"%{q.strip()}%"
+        partes = []
+        for tabla, campos in CAMPOS_FTS.items():
+            model = MODELOS[tabla]
+            partes.append(
+                select(
+                    literal(tabla).label("entity"),
+                    model.id.label("id"),
+                    getattr(model, campos[0]).label("title"),
+                    literal(0.0).label("rank"),
+                ).where(
+                    model.is_deleted == False,  # noqa: E712
+                    or_(*[getattr(model, c).ilike(patron) for c in campos]),
+                )
+            )
+        consulta = union_all(*partes).subquery()
+        filas = session.execute(
+            select(consulta).order_by(func.length(consulta.c.title), consulta.c.title).limit(limit)
+        ).mappings().all()
+    return [dict(f) for f in filas]
+
+
+# ÍNDICES EN MEMORIA (autocompletar y búsqueda difusa)
+
+CAMPOS_SUGERENCIAS = {"champion": "name", "team": "name", "player": "nickname"}
+indices_sugerencias = {tabla: IndicePrefijos() for tabla in CAMPOS_SUGERENCIAS}
+indices_difusos = {"team": IndiceDifuso(), "player": IndiceDifuso()}
+
+
+def _indices(tabla: str) -> list:
+    return [i for i in (indices_sugerencias.get(tabla), indices_difusos.get(tabla)) if i is not None]
+
+
+def cargar_sugerencias(session: Session, tablas: Optional[Iterable[str]] = None) -> None:
+    """Construye (o reconstruye) los índices en memoria con los nombres activos."""
+    for tabla in tablas if tablas is not None else CAMPOS_SUGERENCIAS:
+        model = MODELOS[tabla]
+        campo = getattr(model, CAMPOS_SUGERENCIAS[tabla])
+        filas = session.execute(select(model.id, campo).where(model.is_deleted == False)).all()  # noqa: E712
+        for indice in _indices(tabla):
+            indice.cargar(filas)
+
+
+def actualizar_sugerencias(session: Session, cambios: List[Cambio]) -> None:
+    """
+    Aplica los cambios de un commit a los índices en memoria.
+    - Cambios con id: se relee el nombre de esos registros por PK.
+    - Cambios de lotes (id None): se recarga la entidad entera.
+    """
+    recargar = set()
+    ids: Dict[str, set] = {}
+    for c in cambios:
+        if c.entidad not in CAMPOS_SUGERENCIAS:
+            continue
+        if c.id is None:
+            recargar.add(c.entidad)
+        else:
+            ids.setdefault(c.entidad, set()).add(c.id)
+    cargar_sugerencias(session, recargar)
+
+    for tabla, pendientes in ids.items():
+        if tabla in recargar:
+            continue
+        model = MODELOS[tabla]
+        campo = getattr(model, CAMPOS_SUGERENCIAS[tabla])
+        indices = _indices(tabla)
+        for id_, nombre, borrado in session.execute(
+            select(model.id, campo, model.is_deleted).where(model.id.in_(pendientes))
+        ).all():
+            for indice in indices:
+                indice.poner(id_, None if borrado else nombre)
+            pendientes.discard(id_)
+        for id_ in pendientes:  # ya no existe
+            for indice in indices:
+                indice.poner(id_, None)
+
+
+class ActualizadorSugerencias:
+    """
+    Aplica los cambios confirmados a los índices en memoria desde un hilo propio.
+    - encolar() es el suscriptor de utils.cambios: corre dentro del after_commit,
+      con la conexión del commit aún tomada, así que solo guarda los cambios.
+    - El hilo junta lo acumulado y lo aplica con una sesión (una conexión a la vez,
+      nunca compite por el pool con las escrituras en curso).
+    """
+
+    def __init__(self, crear_sesion: Callable[[], Session]):
+        self.crear_sesion = crear_sesion
+        self._cola: "queue.Queue[Optional[List[Cambio]]]" = queue.Queue()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        if self._hilo is None or not self._hilo.is_alive():
+            self._hilo = threading.Thread(target=self._bucle, name="sugerencias", daemon=True)
+            self._hilo.start()
+
+    def detener(self, timeout: float = 10.0) -> None:
+        hilo, self._hilo = self._hilo, None
+        if hilo is not None and hilo.is_alive():
+            self._cola.put(None)
+            hilo.join(timeout)
+
+    def encolar(self, cambios: List[Cambio]) -> None:
+        self._cola.put(list(cambios))
+
+    def esperar(self) -> None:
+        """Bloquea hasta que se hayan aplicado todos los cambios encolados."""
+        self._cola.join()
+
+    def _bucle(self) -> None:
+        while True:
+            lote = [self._cola.get()]
+            while True:
+                try:
+                    lote.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            cambios = [c for cambios in lote if cambios is not None for c in cambios]
+            try:
+                if cambios:
+                    with self.crear_sesion() as session:
+                        actualizar_sugerencias(session, cambios)
+            except Exception:
+                logger.exception("Error actualizando los índices de sugerencias")
+            finally:
+                for _ in lote:
+                    self._cola.task_done()
+            if None in lote:
+                return
+
+
+def sugerir(prefijo: str, tabla: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+    """Nombres que empiezan por el prefijo, desde memoria."""
+    resultados = []
+    for t in [tabla] if tabla else CAMPOS_SUGERENCIAS:
+        resultados.extend(
+            {"entity": t, "id": id_, "name": nombre}
+            for id_, nombre in indices_sugerencias[t].sugerir(prefijo, limit)
+        )
+    if not tabla:
+        resultados.sort(key=lambda r: normalizar(r["name"]))
+    return resultados[:limit]
+
+
+def buscar_difuso(session: Session, tabla: str, texto: str, limit: int = 10, min_score: float = 0.5) -> List[Dict[str, Any]]:
+    """Registros activos más parecidos al texto, con su score de similitud (0..1)."""
+    aciertos = indices_difusos[tabla].buscar(texto, limit, min_score)
+    if not aciertos:
+        return []
+    model = MODELOS[tabla]
+    filas = session.exec(
+        select(model).where(model.id.in_([a[0] for a in aciertos]), model.is_deleted == False)  # noqa: E712
+    ).all()
+    por_id = {f.id: f for f in filas}
+    return [dict(por_id[id_].model_dump(), score=score) for id_, _, score in aciertos if id_ in por_id]
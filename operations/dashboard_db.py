@@ -0,0 +1,340 @@
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from sqlalchemy import case, func, insert, or_, union_all, update
+from sqlalchemy.dialects.postgresql import insert as insert_postgres
+from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+from sqlmodel import Session, select, delete
+
+from data.models import (
+    Champion,
+    Team,
+    MatchSummary,
+    Player,
+    DashboardStats,
+    TeamStats,
+)
+
+STATS_ID = 1
+
+# INSERT con ON CONFLICT por motor (agregados por equipo y lotes con columna única)
+INSERTS_CON_CONFLICTO = {"sqlite": insert_sqlite, "postgresql": insert_postgres}
+
+
+# MANTENIMIENTO INCREMENTAL
+# Cada escritura resta la contribución del registro antes del cambio y suma la
+# contribución después del cambio. Nada de esto hace commit: lo hace la
+# operación que llama, así el read model queda en la misma transacción.
+# - Los contadores se suman en SQL (SET col = col + :delta): dos escrituras
+#   concurrentes no se pisan aunque ninguna bloquee la fila global.
+# - Lo que depende de team_stats se calcula con la fila del equipo bloqueada
+#   (SELECT ... FOR UPDATE); toda escritura que cambia team_stats la bloquea antes.
+#   En SQLite las escrituras ya van de una en una (BEGIN IMMEDIATE, utils.db.write_engine).
+# - Un lote (alta, borrado o restauración de N filas) se aplica de una vez: una
+#   sentencia por tabla del read model, no N.
+
+# Ids por IN al leer o bloquear equipos
+MAX_IDS_IN = 500
+
+
+def _acumular(total: Dict[str, float], aporte: Dict[str, float], signo: int = 1) -> None:
+    for campo, valor in aporte.items():
+        total[campo] = total.get(campo, 0) + signo * valor
+
+
+def _sumar(session: Session, **deltas: float) -> None:
+    """UPDATE dashboard_stats SET col = col + :delta (sin leer la fila en Python)."""
+    valores = {campo: getattr(DashboardStats, campo) + delta for campo, delta in deltas.items() if delta}
+    if valores:
+        session.execute(update(DashboardStats).where(DashboardStats.id == STATS_ID).values(valores))
+
+
+def _sumar_team_stats(session: Session, deltas: Dict[int, List[float]]) -> Dict[int, Tuple]:
+    """
+    Suma atómica a los agregados de varios equipos, creando sus filas si no existían:
+    INSERT ... VALUES (...), (...) ON CONFLICT (team_id) DO UPDATE SET col = col + excluded.col RETURNING
+    deltas: {team_id: [matches, duration, players]}. Devuelve {team_id: (matches, duration_sum, players)}
+    después de sumar.
+    """
+    tabla = TeamStats.__table__
+    columnas = (tabla.c.matches, tabla.c.duration_sum, tabla.c.players)
+    filas = [
+        {"team_id": team_id, "matches": matches, "duration_sum": duration, "players": players}
+        for team_id, (matches, duration, players) in sorted(deltas.items())
+    ]
+    dialecto = session.get_bind().dialect.name
+    if dialecto in INSERTS_CON_CONFLICTO:
+        stmt = INSERTS_CON_CONFLICTO[dialecto](tabla)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[tabla.c.team_id], set_={c.name: c + stmt.excluded[c.name] for c in columnas}
+        )
+        return {fila[0]: tuple(fila[1:]) for fila in session.execute(stmt.returning(tabla.c.team_id, *columnas), filas)}
+    despues = {}
+    for fila in filas:
+        sumado = session.execute(
+            update(tabla).where(tabla.c.team_id == fila["team_id"])
+            .values({c.name: c + fila[c.name] for c in columnas}).returning(*columnas)
+        ).first()
+        if sumado is None:
+            session.execute(insert(tabla).values(fila))
+            sumado = (fila["matches"], fila["duration_sum"], fila["players"])
+        despues[fila["team_id"]] = tuple(sumado)
+    return despues
+
+
+def _leer_team_stats(session: Session, team_ids) -> Dict[int, Tuple]:
+    """{team_id: (matches, duration_sum, players)} de los equipos que tienen fila."""
+    tabla = TeamStats.__table__
+    ids = sorted(team_ids)
+    ts = {}
+    for inicio in range(0, len(ids), MAX_IDS_IN):
+        q = select(tabla.c.team_id, tabla.c.matches, tabla.c.duration_sum, tabla.c.players).where(
+            tabla.c.team_id.in_(ids[inicio:inicio + MAX_IDS_IN])
+        )
+        ts.update((fila[0], tuple(fila[1:])) for fila in session.execute(q))
+    return ts
+
+
+def _contribucion_equipo(team: Team, ts: Optional[Tuple]) -> Dict[str, float]:
+    """Lo que aporta a la fila global un equipo con agregados ts = (matches, duration_sum, players)."""
+    if team.is_deleted:
+        return {}
+    aporte = {"teams": 1, "team_win_rate_sum": team.win_rate}
+    if ts is not None:
+        matches, duration_sum, players = ts
+        if matches > 0:
+            aporte["team_duration_sum"] = duration_sum / matches
+            aporte["teams_with_duration"] = 1
+        if players > 0:
+            aporte["player_kda_sum"] = players * team.avg_kda
+            aporte["players_with_team"] = players
+    return aporte
+
+
+def _ajustar_team_stats(session: Session, deltas: Dict[int, List[float]]) -> Dict[str, float]:
+    """
+    Suma los agregados de varios equipos y devuelve lo que eso cambia en la fila global.
+    Las filas de los equipos quedan bloqueadas hasta el commit, en orden de id (dos lotes
+    con equipos en común bloquean en el mismo orden): sus valores y team_stats no cambian por debajo.
+    """
+    ids = sorted(deltas)
+    equipos: Dict[int, Team] = {}
+    for inicio in range(0, len(ids), MAX_IDS_IN):
+        q = (
+            select(Team).where(Team.id.in_(ids[inicio:inicio + MAX_IDS_IN])).order_by(Team.id)
+            .with_for_update().execution_options(populate_existing=True)
+        )
+        equipos.update((team.id, team) for team in session.exec(q))
+    # Un team_id sin equipo no tiene agregados
+    deltas = {team_id: delta for team_id, delta in deltas.items() if team_id in equipos}
+    if not deltas:
+        return {}
+
+    cambio: Dict[str, float] = {}
+    for team_id, despues in _sumar_team_stats(session, deltas).items():
+        matches, duration, players = deltas[team_id]
+        antes = (despues[0] - matches, despues[1] - duration, despues[2] - players)
+        _acumular(cambio, _contribucion_equipo(equipos[team_id], despues))
+        _acumular(cambio, _contribucion_equipo(equipos[team_id], antes), -1)
+    return cambio
+
+
+def aplicar_lote_a_dashboard(session: Session, cambios: Iterable[Tuple[Any, int]]) -> None:
+    """
+    Suma (signo=+1) o resta (signo=-1) la contribución de varios registros activos:
+    cambios son pares (obj, signo) de una misma entidad, los de una operación.
+    - La fila global se comprueba una vez y se actualiza con un solo UPDATE.
+    - Los agregados de jugadores y partidas se agrupan por equipo: un SELECT ... FOR UPDATE
+      de esos equipos y un INSERT ... ON CONFLICT con una fila por equipo.
+    - Para un equipo, obj debe venir bloqueado (session.get con with_for_update, o UPDATE ... RETURNING).
+    """
+    cambios = [(obj, signo) for obj, signo in cambios if not obj.is_deleted]
+    if not cambios:
+        return
+    if session.execute(select(DashboardStats.id).where(DashboardStats.id == STATS_ID)).first() is None:
+        # Aún no materializado: la primera lectura lo reconstruye completo
+        return
+
+    total: Dict[str, float] = {}
+    por_equipo: Dict[int, List[float]] = {}  # team_id -> [matches, duration, players]
+    equipos = [(obj, signo) for obj, signo in cambios if isinstance(obj, Team)]
+    if equipos:
+        # Contribución de cada equipo activo (incluye la de sus jugadores y partidas)
+        ts = _leer_team_stats(session, {obj.id for obj, _ in equipos})
+        for obj, signo in equipos:
+            _acumular(total, _contribucion_equipo(obj, ts.get(obj.id)), signo)
+    for obj, signo in cambios:
+        if isinstance(obj, Champion):
+            _acumular(total, {
+                "champions": 1, "champion_pick_rate_sum": obj.pick_rate, "champion_win_rate_sum": obj.win_rate,
+            }, signo)
+        elif isinstance(obj, Player):
+            _acumular(total, {"players": 1}, signo)
+            if obj.team_id is not None:
+                por_equipo.setdefault(obj.team_id, [0, 0.0, 0])[2] += signo
+        elif isinstance(obj, MatchSummary):
+            _acumular(total, {"matches": 1}, signo)
+            # Un equipo que aparece como team_a y team_b cuenta la partida una sola vez
+            for team_id in {obj.team_a_id, obj.team_b_id} - {None}:
+                delta = por_equipo.setdefault(team_id, [0, 0.0, 0])
+                delta[0] += signo
+                delta[1] += signo * obj.avg_duration_min
+
+    if por_equipo:
+        _acumular(total, _ajustar_team_stats(session, por_equipo))
+    _sumar(session, **total)
+
+
+def aplicar_a_dashboard(session: Session, obj, signo: int) -> None:
+    """
+    Suma (signo=+1) o resta (signo=-1) la contribución de un registro activo.
+    - Llamar con -1 antes de modificar/eliminar y con +1 después de crear/modificar/restaurar.
+    - Para un equipo, obj debe venir bloqueado (session.get con with_for_update, o UPDATE ... RETURNING).
+    """
+    aplicar_lote_a_dashboard(session, [(obj, signo)])
+
+
+# RECONSTRUCCIÓN COMPLETA (arranque, seed o datos cargados por fuera de la API)
+
+
+def _win_rate_sql():
+    """Mismo cálculo que Team.win_rate, en SQL."""
+    total = Team.wins + Team.losses
+    return case((total > 0, Team.wins * 100.0 / total), else_=0.0)
+
+
+def recalcular_dashboard(session: Session, commit: bool = True) -> DashboardStats:
+    """Reconstruye el read model con agregados SQL (GROUP BY), sin recorrer filas en Python."""
+    session.exec(delete(TeamStats))
+
+    # Partidas por equipo: cada partida aporta una fila por equipo distinto (team_a / team_b)
+    activos = MatchSummary.is_deleted == False  # noqa: E712
+    participaciones = union_all(
+        select(MatchSummary.team_a_id.label("team_id"), MatchSummary.avg_duration_min.label("dur"))
+        .where(activos, MatchSummary.team_a_id.is_not(None)),
+        select(MatchSummary.team_b_id.label("team_id"), MatchSummary.avg_duration_min.label("dur"))
+        .where(
+            activos,
+            MatchSummary.team_b_id.is_not(None),
+            or_(MatchSummary.team_a_id.is_(None), MatchSummary.team_b_id != MatchSummary.team_a_id),
+        ),
+    ).subquery()
+    por_equipo = (
+        select(
+            participaciones.c.team_id,
+            func.count().label("matches"),
+            func.sum(participaciones.c.dur).label("duration_sum"),
+        )
+        .group_by(participaciones.c.team_id)
+        .subquery()
+    )
+    jugadores = (
+        select(Player.team_id, func.count().label("players"))
+        .where(Player.is_deleted == False, Player.team_id.is_not(None))  # noqa: E712
+        .group_by(Player.team_id)
+        .subquery()
+    )
+    session.execute(
+        insert(TeamStats).from_select(
+            ["team_id", "matches", "duration_sum", "players"],
+            select(
+                Team.id,
+                func.coalesce(por_equipo.c.matches, 0),
+                func.coalesce(por_equipo.c.duration_sum, 0.0),
+                func.coalesce(jugadores.c.players, 0),
+            )
+            .outerjoin(por_equipo, por_equipo.c.team_id == Team.id)
+            .outerjoin(jugadores, jugadores.c.team_id == Team.id)
+            .where(or_(por_equipo.c.team_id.is_not(None), jugadores.c.team_id.is_not(None))),
+        )
+    )
+
+    campeones = session.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(Champion.pick_rate), 0.0),
+            func.coalesce(func.sum(Champion.win_rate), 0.0),
+        ).where(Champion.is_deleted == False)  # noqa: E712
+    ).one()
+    con_partidas = TeamStats.matches > 0
+    equipos = session.execute(
+        select(
+            func.count(Team.id),
+            func.coalesce(func.sum(_win_rate_sql()), 0.0),
+            func.coalesce(func.sum(case((con_partidas, TeamStats.duration_sum / TeamStats.matches), else_=0.0)), 0.0),
+            func.coalesce(func.sum(case((con_partidas, 1), else_=0)), 0),
+            func.coalesce(func.sum(TeamStats.players * Team.avg_kda), 0.0),
+            func.coalesce(func.sum(TeamStats.players), 0),
+        )
+        .select_from(Team)
+        .outerjoin(TeamStats, TeamStats.team_id == Team.id)
+        .where(Team.is_deleted == False)  # noqa: E712
+    ).one()
+    n_jugadores = session.execute(
+        select(func.count()).select_from(Player).where(Player.is_deleted == False)  # noqa: E712
+    ).scalar_one()
+    n_partidas = session.execute(select(func.count()).select_from(MatchSummary).where(activos)).scalar_one()
+
+    stats = session.get(DashboardStats, STATS_ID)
+    if stats is None:
+        stats = DashboardStats(id=STATS_ID)
+    stats.champions, stats.champion_pick_rate_sum, stats.champion_win_rate_sum = campeones
+    (
+        stats.teams,
+        stats.team_win_rate_sum,
+        stats.team_duration_sum,
+        stats.teams_with_duration,
+        stats.player_kda_sum,
+        stats.players_with_team,
+    ) = equipos
+    stats.players = n_jugadores
+    stats.matches = n_partidas
+    session.add(stats)
+
+    if commit:
+        session.commit()
+        session.refresh(stats)
+    return stats
+
+
+def asegurar_dashboard(session: Session) -> None:
+    """Crea el read model si la base de datos aún no lo tiene."""
+    if session.get(DashboardStats, STATS_ID) is None:
+        recalcular_dashboard(session)
+
+
+# LECTURA
+
+
+def obtener_estadisticas(session: Session) -> Dict[str, Any]:
+    """Promedios del dashboard a partir de la fila materializada."""
+    s = session.get(DashboardStats, STATS_ID)
+    if s is None:
+        s = recalcular_dashboard(session)
+
+    avg_champion_pick_rate = (s.champion_pick_rate_sum / s.champions * 100) if s.champions > 0 else 0.0
+    avg_champion_win_rate = (s.champion_win_rate_sum / s.champions * 100) if s.champions > 0 else 0.0
+    avg_team_win_rate = (s.team_win_rate_sum / s.teams) if s.teams > 0 else 0.0
+    avg_team_duration = "-"
+    if s.teams_with_duration > 0:
+        avg_team_duration = f"{(s.team_duration_sum / s.teams_with_duration):.1f} min"
+    avg_player_kda = (s.player_kda_sum / s.players_with_team) if s.players_with_team > 0 else 0.0
+
+    return {
+        "teams": s.teams,
+        "players": s.players,
+        "champions": s.champions,
+        "matches": s.matches,
+        "avg_champion_pick_rate": avg_champion_pick_rate,
+        "avg_champion_win_rate": avg_champion_win_rate,
+        "avg_team_win_rate": avg_team_win_rate,
+        "avg_team_duration": avg_team_duration,
+        "avg_player_win_rate": avg_team_win_rate,  # Usamos el mismo promedio que equipos
+        "avg_player_kda": avg_player_kda,
+    }
+
+
+def obtener_team_stats(session: Session, team_ids: List[int]) -> Dict[int, TeamStats]:
+    """Agregados por equipo indexados por team_id."""
+    if not team_ids:
+        return {}
+    q = select(TeamStats).where(TeamStats.team_id.in_(team_ids))
+    return {ts.team_id: ts for ts in session.exec(q).all()}
@@ -1,7 +1,10 @@
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Tuple
 from sqlmodel import Session, select
 from fastapi import HTTPException
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import and_, bindparam, delete, insert, union_all
+from sqlalchemy.orm import aliased
 
 from data.models import (
     Champion,
@@ -10,30 +13,78 @@ from data.models import (
     MatchChampionLink,
     Player,
 )
+from operations.busqueda_db import buscar_difuso
+from operations.repositorio import Mensajes, Repositorio
+from utils.cambios import registrar_cambio
+from utils.filtros import SIN_FILTROS, Filtros
 
 
 # HELPERS
 
 
-def _apply_active_filter(model, include_deleted: bool = False):
-    """Condición para incluir/excluir eliminados lógicamente."""
-    if include_deleted:
-        return True
-    return model.is_deleted == False  # noqa: E712
-
-
 def _handle_exception(session: Session, exc: Exception, message: str):
     """Rollback y excepción HTTP unificada."""
     session.rollback()
     raise HTTPException(status_code=500, detail=f"{message}. Error: {str(exc)}")
 
 
-def _created_payload(obj) -> Dict[str, Any]:
-    """
-    Respuesta para CREATE:
-    - oculta 'id' y 'is_deleted' (aunque is_deleted ya está oculto por el modelo)
-    """
-    return obj.dict(exclude={"id", "is_deleted"})
+# REPOSITORIOS
+# El CRUD común (con sentencias precompiladas) vive en operations/repositorio.py;
+# las funciones de abajo son la API que usan las rutas.
+
+campeones = Repositorio(
+    Champion,
+    Mensajes(
+        singular="el campeón",
+        plural="los campeones",
+        no_encontrado="Campeón no encontrado",
+        no_disponible="Campeón no encontrado o eliminado",
+        ya_eliminado="El campeón ya estaba eliminado",
+        no_eliminado="El campeón no está eliminado",
+    ),
+    campo_busqueda="name",
+    unicos=("slug",),
+)
+
+equipos = Repositorio(
+    Team,
+    Mensajes(
+        singular="el equipo",
+        plural="los equipos",
+        no_encontrado="Equipo no encontrado",
+        no_disponible="Equipo no encontrado o eliminado",
+        ya_eliminado="El equipo ya estaba eliminado",
+        no_eliminado="El equipo no está eliminado",
+    ),
+    campo_busqueda="name",
+    unicos=("name",),
+)
+
+resumenes = Repositorio(
+    MatchSummary,
+    Mensajes(
+        singular="el resumen de partida",
+        plural="los resúmenes",
+        no_encontrado="Resumen no encontrado",
+        no_disponible="Match no encontrado o eliminado",
+        ya_eliminado="El resumen ya estaba eliminado",
+        no_eliminado="El resumen no está eliminado",
+    ),
+    campo_busqueda="stage",
+)
+
+jugadores = Repositorio(
+    Player,
+    Mensajes(
+        singular="el jugador",
+        plural="los jugadores",
+        no_encontrado="Jugador no encontrado",
+        no_disponible="Jugador no encontrado o eliminado",
+        ya_eliminado="El jugador ya está eliminado",
+        no_eliminado="El jugador no está eliminado",
+    ),
+    campo_busqueda="nickname",
+)
 
 
 
@@ -41,14 +92,11 @@ def _created_payload(obj) -> Dict[str, Any]:
 
 
 def crear_campeon(session: Session, obj: Champion) -> Dict[str, Any]:
-    try:
-        obj.id = None  # ignorar cualquier id entrante
-        session.add(obj)
-        session.commit()
-        session.refresh(obj)
-        return _created_payload(obj)  # sin id ni is_deleted
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al crear el campeón")
+    return campeones.crear(session, obj)  # sin id ni is_deleted
+
+
+def crear_campeones_lote(session: Session, items: List[Any], upsert: bool = False) -> Dict[str, Any]:
+    return campeones.crear_lote(session, items, upsert)
 
 
 def listar_campeones(
@@ -56,107 +104,60 @@ def listar_campeones(
     skip: int = 0,
     limit: int = 10,
     include_deleted: bool = False,
+    after: Optional[Tuple[Any, ...]] = None,
+    campos: Optional[Tuple[str, ...]] = None,
+    filtros: Filtros = SIN_FILTROS,
 ) -> List[Champion]:
-    try:
-        q = select(Champion).where(_apply_active_filter(Champion, include_deleted)).offset(skip).limit(limit)
-        return session.exec(q).all()
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al listar los campeones")
+    return campeones.listar(session, skip, limit, include_deleted, after, campos, filtros)
 
 
-def listar_campeones_eliminados(session: Session) -> List[Champion]:
-    try:
-        q = select(Champion).where(Champion.is_deleted == True)  # noqa: E712
-        return session.exec(q).all()
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al listar campeones eliminados")
+def listar_campeones_eliminados(session: Session, campos: Optional[Tuple[str, ...]] = None) -> List[Champion]:
+    return campeones.listar_eliminados(session, campos)
 
 
 def restaurar_campeon(session: Session, champion_id: int) -> bool:
-    try:
-        obj = session.get(Champion, champion_id)
-        if not obj:
-            raise HTTPException(status_code=404, detail="Campeón no encontrado")
-        if not obj.is_deleted:
-            raise HTTPException(status_code=400, detail="El campeón no está eliminado")
-        obj.is_deleted = False
-        session.add(obj)
-        session.commit()
-        return True
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al restaurar el campeón")
+    return campeones.restaurar(session, champion_id)
 
 
-def buscar_campeon_por_nombre(session: Session, nombre: str) -> List[Champion]:
+def buscar_campeon_por_nombre(session: Session, nombre: str, campos: Optional[Tuple[str, ...]] = None) -> List[Champion]:
     """Búsqueda por nombre (parcial)."""
-    try:
-        q = select(Champion).where(
-            Champion.name.ilike(f"%{nombre}%"), Champion.is_deleted == False  # noqa: E712
-        )
-        resultados = session.exec(q).all()
-        if not resultados:
-            raise HTTPException(status_code=404, detail=f"No se encontraron campeones que contengan '{nombre}'")
-        return resultados
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al buscar campeones por nombre")
+    resultados = campeones.buscar(session, nombre, campos)
+    if not resultados:
+        raise HTTPException(status_code=404, detail=f"No se encontraron campeones que contengan '{nombre}'")
+    return resultados
 
 
-def filtrar_campeones_por_winrate(session: Session, min_winrate: float = 0.0) -> List[Champion]:
+def filtrar_campeones_por_winrate(
+    session: Session, min_winrate: float = 0.0, campos: Optional[Tuple[str, ...]] = None
+) -> List[Champion]:
     """Campeones con win_rate >= umbral."""
-    try:
-        if min_winrate < 0:
-            raise HTTPException(status_code=400, detail="min_winrate no puede ser negativo")
-        q = select(Champion).where(
-            Champion.win_rate >= min_winrate, Champion.is_deleted == False  # noqa: E712
-        )
-        return session.exec(q).all()
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al filtrar campeones por win rate")
+    if min_winrate < 0:
+        raise HTTPException(status_code=400, detail="min_winrate no puede ser negativo")
+    return campeones.filtrar(session, "win_rate", min_winrate, op=">=", campos=campos)
 
 
-def obtener_campeon(session: Session, champion_id: int) -> Champion:
-    try:
-        obj = session.get(Champion, champion_id)
-        if not obj or obj.is_deleted:
-            raise HTTPException(status_code=404, detail="Campeón no encontrado o eliminado")
-        return obj
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al obtener el campeón")
+def obtener_campeon(session: Session, champion_id: int, campos: Optional[Tuple[str, ...]] = None) -> Champion:
+    return campeones.obtener(session, champion_id, campos)
 
 
 def actualizar_campeon(session: Session, champion_id: int, obj_update: Champion) -> Champion:
-    try:
-        obj = session.get(Champion, champion_id)
-        if not obj or obj.is_deleted:
-            raise HTTPException(status_code=404, detail="Campeón no encontrado o eliminado")
+    return campeones.actualizar(session, champion_id, obj_update)
 
-        data = obj_update.dict(exclude_unset=True)
-        data.pop("id", None)
-        data.pop("is_deleted", None)
 
-        for k, v in data.items():
-            setattr(obj, k, v)
-        session.add(obj)
-        session.commit()
-        session.refresh(obj)
-        return obj
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al actualizar el campeón")
+def eliminar_campeon(session: Session, champion_id: int) -> bool:
+    return campeones.eliminar(session, champion_id)
 
 
-def eliminar_campeon(session: Session, champion_id: int) -> bool:
-    try:
-        obj = session.get(Champion, champion_id)
-        if not obj:
-            raise HTTPException(status_code=404, detail="Campeón no encontrado")
-        if obj.is_deleted:
-            raise HTTPException(status_code=400, detail="El campeón ya estaba eliminado")
-        obj.is_deleted = True
-        session.add(obj)
-        session.commit()
-        return True
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al eliminar el campeón")
+def eliminar_campeones_lote(
+    session: Session, ids: Optional[List[int]] = None, filtro: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    return campeones.eliminar_lote(session, ids, filtro)
+
+
+def restaurar_campeones_lote(
+    session: Session, ids: Optional[List[int]] = None, filtro: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    return campeones.restaurar_lote(session, ids, filtro)
 
 
 
@@ -164,14 +165,11 @@ def eliminar_campeon(session: Session, champion_id: int) -> bool:
 
 
 def crear_equipo(session: Session, obj: Team) -> Dict[str, Any]:
-    try:
-        obj.id = None
-        session.add(obj)
-        session.commit()
-        session.refresh(obj)
-        return _created_payload(obj)  # sin id ni is_deleted
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al crear el equipo")
+    return equipos.crear(session, obj)  # sin id ni is_deleted
+
+
+def crear_equipos_lote(session: Session, items: List[Any], upsert: bool = False) -> Dict[str, Any]:
+    return equipos.crear_lote(session, items, upsert)
 
 
 def listar_equipos(
@@ -179,101 +177,64 @@ def listar_equipos(
     skip: int = 0,
     limit: int = 10,
     include_deleted: bool = False,
+    after: Optional[Tuple[Any, ...]] = None,
+    campos: Optional[Tuple[str, ...]] = None,
+    filtros: Filtros = SIN_FILTROS,
 ) -> List[Team]:
-    try:
-        q = select(Team).where(_apply_active_filter(Team, include_deleted)).offset(skip).limit(limit)
-        return session.exec(q).all()
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al listar equipos")
+    return equipos.listar(session, skip, limit, include_deleted, after, campos, filtros)
 
 
-def listar_equipos_eliminados(session: Session) -> List[Team]:
-    try:
-        q = select(Team).where(Team.is_deleted == True)  # noqa: E712
-        return session.exec(q).all()
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al listar equipos eliminados")
+def listar_equipos_eliminados(session: Session, campos: Optional[Tuple[str, ...]] = None) -> List[Team]:
+    return equipos.listar_eliminados(session, campos)
 
 
 def restaurar_equipo(session: Session, team_id: int) -> bool:
-    try:
-        obj = session.get(Team, team_id)
-        if not obj:
-            raise HTTPException(status_code=404, detail="Equipo no encontrado")
-        if not obj.is_deleted:
-            raise HTTPException(status_code=400, detail="El equipo no está eliminado")
-        obj.is_deleted = False
-        session.add(obj)
-        session.commit()
-        return True
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al restaurar el equipo")
+    return equipos.restaurar(session, team_id)
 
 
-def buscar_equipo_por_nombre(session: Session, nombre: str) -> List[Team]:
+def buscar_equipo_por_nombre(session: Session, nombre: str, campos: Optional[Tuple[str, ...]] = None) -> List[Team]:
     """Búsqueda por nombre (parcial)."""
+    resultados = equipos.buscar(session, nombre, campos)
+    if not resultados:
+        raise HTTPException(status_code=404, detail=f"No se encontró ningún equipo con '{nombre}'")
+    return resultados
+
+
+def buscar_equipos_difuso(session: Session, nombre: str, limit: int = 10, min_score: float = 0.5) -> List[Dict[str, Any]]:
+    """Equipos con nombre parecido aunque esté mal escrito."""
     try:
-        q = select(Team).where(Team.name.ilike(f"%{nombre}%"), Team.is_deleted == False)  # noqa: E712
-        resultados = session.exec(q).all()
-        if not resultados:
-            raise HTTPException(status_code=404, detail=f"No se encontró ningún equipo con '{nombre}'")
-        return resultados
+        return buscar_difuso(session, "team", nombre, limit, min_score)
     except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al buscar equipo por nombre")
+        _handle_exception(session, e, "Error en la búsqueda difusa de equipos")
 
 
-def filtrar_equipo_por_region(session: Session, region: str) -> List[Team]:
+def filtrar_equipo_por_region(session: Session, region: str, campos: Optional[Tuple[str, ...]] = None) -> List[Team]:
     """Filtra equipos por región (LCK, LPL, etc.)."""
-    try:
-        q = select(Team).where(Team.region == region, Team.is_deleted == False)  # noqa: E712
-        return session.exec(q).all()
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al filtrar equipos por región")
+    return equipos.filtrar(session, "region", region, campos=campos)
 
 
-def obtener_equipo(session: Session, team_id: int) -> Team:
-    try:
-        obj = session.get(Team, team_id)
-        if not obj or obj.is_deleted:
-            raise HTTPException(status_code=404, detail="Equipo no encontrado o eliminado")
-        return obj
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al obtener equipo")
+def obtener_equipo(session: Session, team_id: int, campos: Optional[Tuple[str, ...]] = None) -> Team:
+    return equipos.obtener(session, team_id, campos)
 
 
 def actualizar_equipo(session: Session, team_id: int, obj_update: Team) -> Team:
-    try:
-        obj = session.get(Team, team_id)
-        if not obj or obj.is_deleted:
-            raise HTTPException(status_code=404, detail="Equipo no encontrado o eliminado")
+    return equipos.actualizar(session, team_id, obj_update)
 
-        data = obj_update.dict(exclude_unset=True)
-        data.pop("id", None)
-        data.pop("is_deleted", None)
 
-        for k, v in data.items():
-            setattr(obj, k, v)
-        session.add(obj)
-        session.commit()
-        session.refresh(obj)
-        return obj
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al actualizar equipo")
+def eliminar_equipo(session: Session, team_id: int) -> bool:
+    return equipos.eliminar(session, team_id)
 
 
-def eliminar_equipo(session: Session, team_id: int) -> bool:
-    try:
-        obj = session.get(Team, team_id)
-        if not obj:
-            raise HTTPException(status_code=404, detail="Equipo no encontrado")
-        if obj.is_deleted:
-            raise HTTPException(status_code=400, detail="El equipo ya estaba eliminado")
-        obj.is_deleted = True
-        session.add(obj)
-        session.commit()
-        return True
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al eliminar equipo")
+def eliminar_equipos_lote(
+    session: Session, ids: Optional[List[int]] = None, filtro: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    return equipos.eliminar_lote(session, ids, filtro)
+
+
+def restaurar_equipos_lote(
+    session: Session, ids: Optional[List[int]] = None, filtro: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    return equipos.restaurar_lote(session, ids, filtro)
 
 
 
@@ -281,14 +242,11 @@ def eliminar_equipo(session: Session, team_id: int) -> bool:
 
 
 def crear_resumen(session: Session, obj: MatchSummary) -> Dict[str, Any]:
-    try:
-        obj.id = None
-        session.add(obj)
-        session.commit()
-        session.refresh(obj)
-        return _created_payload(obj)  # sin id ni is_deleted
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al crear el resumen de partida")
+    return resumenes.crear(session, obj)  # sin id ni is_deleted
+
+
+def crear_resumenes_lote(session: Session, items: List[Any]) -> Dict[str, Any]:
+    return resumenes.crear_lote(session, items)
 
 
 def listar_resumenes(
@@ -296,84 +254,229 @@ def listar_resumenes(
     skip: int = 0,
     limit: int = 10,
     include_deleted: bool = False,
+    after: Optional[Tuple[Any, ...]] = None,
+    campos: Optional[Tuple[str, ...]] = None,
+    filtros: Filtros = SIN_FILTROS,
 ) -> List[MatchSummary]:
+    return resumenes.listar(session, skip, limit, include_deleted, after, campos, filtros)
+
+
+def _con_nombres_de_equipos(q):
+    """
+    Añade al select los nombres de team_a, team_b y winner (equipos activos) con tres LEFT JOIN.
+    - Ejecutar con session.execute: session.exec devolvería solo la primera columna.
+    """
+    team_a = aliased(Team)
+    team_b = aliased(Team)
+    winner = aliased(Team)
+    return (
+        q.add_columns(team_a.name, team_b.name, winner.name)
+        .outerjoin(team_a, and_(team_a.id == MatchSummary.team_a_id, team_a.is_deleted == False))  # noqa: E712
+        .outerjoin(team_b, and_(team_b.id == MatchSummary.team_b_id, team_b.is_deleted == False))  # noqa: E712
+        .outerjoin(winner, and_(winner.id == MatchSummary.winner_id, winner.is_deleted == False))  # noqa: E712
+    )
+
+
+def listar_resumenes_con_equipos(
+    session: Session,
+    skip: int = 0,
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    """Resúmenes activos con los nombres de team_a, team_b y winner resueltos en un solo JOIN."""
     try:
-        q = select(MatchSummary).where(_apply_active_filter(MatchSummary, include_deleted)).offset(skip).limit(limit)
-        return session.exec(q).all()
+        q = (
+            _con_nombres_de_equipos(select(MatchSummary))
+            .where(MatchSummary.is_deleted == False)  # noqa: E712
+            .order_by(MatchSummary.id)  # sin ORDER BY, skip/limit no dan páginas estables
+            .offset(skip)
+            .limit(limit)
+        )
+        resultados = []
+        for match, team_a_name, team_b_name, winner_name in session.execute(q).all():
+            match_dict = match.model_dump()
+            match_dict["team_a_name"] = team_a_name or f"Team {match.team_a_id}"
+            match_dict["team_b_name"] = team_b_name or f"Team {match.team_b_id}"
+            match_dict["winner_name"] = winner_name or f"Team {match.winner_id}"
+            resultados.append(match_dict)
+        return resultados
     except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al listar los resúmenes")
+        _handle_exception(session, e, "Error al listar los resúmenes con equipos")
 
 
-def listar_resumenes_eliminados(session: Session) -> List[MatchSummary]:
+@lru_cache(maxsize=None)
+def _sentencia_partidas_de_equipo(con_etapa: bool, keyset: bool):
+    """
+    Ids de cada lado por separado (UNION ALL) para que cada mitad use su índice
+    (team_x_id, stage) sin leer la tabla; luego las filas por PK con los nombres.
+    El IN ya descarta repetidos: UNION los ordenaría antes en un B-tree temporal.
+    Un OR sobre team_a_id/team_b_id con ORDER BY id puede acabar recorriendo la tabla por rowid.
+    """
+    def ids(columna):
+        q = select(MatchSummary.id).where(columna == bindparam("team_id"), MatchSummary.is_deleted == False)  # noqa: E712
+        if con_etapa:
+            q = q.where(MatchSummary.stage == bindparam("stage"))
+        if keyset:
+            q = q.where(MatchSummary.id > bindparam("after_id"))
+        return q
+
+    return (
+        _con_nombres_de_equipos(select(MatchSummary))
+        .where(MatchSummary.id.in_(union_all(ids(MatchSummary.team_a_id), ids(MatchSummary.team_b_id))))
+        .order_by(MatchSummary.id)
+        .limit(bindparam("limit"))
+    )
+
+
+def listar_partidas_de_equipo(
+    session: Session,
+    team_id: int,
+    stage: Optional[str] = None,
+    limit: int = 20,
+    after_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Partidas activas en las que juega el equipo (como team_a o team_b), por id; 404 si el equipo no está."""
+    equipos.obtener(session, team_id)
     try:
-        q = select(MatchSummary).where(MatchSummary.is_deleted == True)  # noqa: E712
-        return session.exec(q).all()
+        params = {"team_id": team_id, "limit": limit}
+        if stage is not None:
+            params["stage"] = stage
+        if after_id is not None:
+            params["after_id"] = after_id
+        filas = session.execute(_sentencia_partidas_de_equipo(stage is not None, after_id is not None), params).all()
+        return [
+            dict(match.model_dump(), team_a_name=team_a_name, team_b_name=team_b_name, winner_name=winner_name)
+            for match, team_a_name, team_b_name, winner_name in filas
+        ]
     except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al listar resúmenes eliminados")
+        _handle_exception(session, e, "Error al listar las partidas del equipo")
+
+
+def listar_resumenes_eliminados(session: Session, campos: Optional[Tuple[str, ...]] = None) -> List[MatchSummary]:
+    return resumenes.listar_eliminados(session, campos)
+
+
+def obtener_resumen(session: Session, resumen_id: int, campos: Optional[Tuple[str, ...]] = None) -> MatchSummary:
+    return resumenes.obtener(session, resumen_id, campos)
 
 
 def restaurar_resumen(session: Session, resumen_id: int) -> bool:
-    try:
-        obj = session.get(MatchSummary, resumen_id)
-        if not obj:
-            raise HTTPException(status_code=404, detail="Resumen no encontrado")
-        if not obj.is_deleted:
-            raise HTTPException(status_code=400, detail="El resumen no está eliminado")
-        obj.is_deleted = False
-        session.add(obj)
-        session.commit()
-        return True
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al restaurar resumen")
+    return resumenes.restaurar(session, resumen_id)
+
+
+def eliminar_resumen(session: Session, resumen_id: int) -> bool:
+    """Soft delete del resumen (is_deleted = True)."""
+    return resumenes.eliminar(session, resumen_id)
+
+
+def eliminar_resumenes_lote(
+    session: Session, ids: Optional[List[int]] = None, filtro: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    return resumenes.eliminar_lote(session, ids, filtro)
 
 
-def buscar_resumen_por_etapa(session: Session, etapa: str) -> List[MatchSummary]:
+def restaurar_resumenes_lote(
+    session: Session, ids: Optional[List[int]] = None, filtro: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    return resumenes.restaurar_lote(session, ids, filtro)
+
+
+def buscar_resumen_por_etapa(session: Session, etapa: str, campos: Optional[Tuple[str, ...]] = None) -> List[MatchSummary]:
     """Busca partidas por fase/etapa (Worlds, Playoffs, etc.)."""
-    try:
-        q = select(MatchSummary).where(
-            MatchSummary.stage.ilike(f"%{etapa}%"), MatchSummary.is_deleted == False  # noqa: E712
-        )
-        resultados = session.exec(q).all()
-        if not resultados:
-            raise HTTPException(status_code=404, detail=f"No se encontraron partidas en la etapa '{etapa}'")
-        return resultados
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al buscar resúmenes por etapa")
+    resultados = resumenes.buscar(session, etapa, campos)
+    if not resultados:
+        raise HTTPException(status_code=404, detail=f"No se encontraron partidas en la etapa '{etapa}'")
+    return resultados
 
 
-def filtrar_resumen_por_ganador(session: Session, team_id: int) -> List[MatchSummary]:
+def filtrar_resumen_por_ganador(
+    session: Session, team_id: int, campos: Optional[Tuple[str, ...]] = None
+) -> List[MatchSummary]:
     """Partidas ganadas por un equipo específico."""
-    try:
-        q = select(MatchSummary).where(
-            MatchSummary.winner_id == team_id,
-            MatchSummary.is_deleted == False,  # noqa: E712
-        )
-        return session.exec(q).all()
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al filtrar resúmenes por ganador")
+    return resumenes.filtrar(session, "winner_id", team_id, campos=campos)
 
 
-def obtener_campeones_de_match(session: Session, match_id: int) -> List[Champion]:
+def campeones_por_match(session: Session, match_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Campeones activos de varias partidas en una sola consulta (JOIN con la tabla de enlace + IN).
+    - Devuelve filas proyectadas (dicts), sin construir modelos ni tocar la relación lazy match.champions.
+    """
+    resultado: Dict[int, List[Dict[str, Any]]] = {m: [] for m in match_ids}
+    if not match_ids:
+        return resultado
+    for match_id, *valores in session.execute(_sentencia_campeones_por_match(), {"ids": list(match_ids)}):
+        resultado[match_id].append(dict(zip(campeones.campos, valores)))
+    return resultado
+
+
+@lru_cache(maxsize=None)
+def _sentencia_campeones_por_match():
+    return (
+        select(MatchChampionLink.match_id, *(Champion.__table__.c[c] for c in campeones.campos))
+        .join(Champion, Champion.id == MatchChampionLink.champion_id)
+        .where(MatchChampionLink.match_id.in_(bindparam("ids", expanding=True)), Champion.is_deleted == False)  # noqa: E712
+        # Orden de la PK del enlace (match_id, champion_id): lo da el índice, sin ordenar aparte
+        .order_by(MatchChampionLink.match_id, MatchChampionLink.champion_id)
+    )
+
+
+def obtener_campeones_de_match(session: Session, match_id: int) -> List[Dict[str, Any]]:
     """Campeones asociados a un match (solo activos)."""
+    resumenes.obtener(session, match_id)
     try:
-        match = session.get(MatchSummary, match_id)
-        if not match or match.is_deleted:
-            raise HTTPException(status_code=404, detail="Match no encontrado o eliminado")
-        return [c for c in match.champions if not c.is_deleted]
+        return campeones_por_match(session, [match_id])[match_id]
     except SQLAlchemyError as e:
         _handle_exception(session, e, "Error al obtener campeones del match")
 
-# PLAYER
 
-def crear_jugador(session: Session, obj: Player) -> Dict[str, Any]:
-    try:
-        obj.id = None
-        session.add(obj)
+def asignar_campeones_a_match(session: Session, match_id: int, champion_ids: List[int]) -> List[Dict[str, Any]]:
+    """
+    Reemplaza los campeones del match: un DELETE de los enlaces y un INSERT multi-fila con los nuevos.
+    - 404 si el match no está; 400 si algún campeón no existe o está eliminado.
+    """
+    resumenes.obtener(session, match_id)
+    ids = list(dict.fromkeys(champion_ids))
+    try:
+        if ids:
+            activos = set(session.execute(
+                select(Champion.id).where(Champion.id.in_(ids), Champion.is_deleted == False)  # noqa: E712
+            ).scalars())
+            faltan = [i for i in ids if i not in activos]
+            if faltan:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Campeones no encontrados o eliminados: {', '.join(map(str, faltan))}",
+                )
+        session.execute(delete(MatchChampionLink).where(MatchChampionLink.match_id == match_id))
+        if ids:
+            session.execute(insert(MatchChampionLink).values([{"match_id": match_id, "champion_id": i} for i in ids]))
+        registrar_cambio(session, "matchsummary", match_id, "update")
         session.commit()
-        session.refresh(obj)
-        return _created_payload(obj)  # sin id ni is_deleted
+        return campeones_por_match(session, [match_id])[match_id]
+    except SQLAlchemyError as e:
+        _handle_exception(session, e, "Error al asignar campeones al match")
+
+
+def expandir_campeones(session: Session, partidas: List[Any]) -> List[Dict[str, Any]]:
+    """Añade 'champions' a cada partida (modelo o dict) con una consulta extra para toda la página."""
+    try:
+        por_match = campeones_por_match(session, [p["id"] if isinstance(p, dict) else p.id for p in partidas])
     except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al crear el jugador")
+        _handle_exception(session, e, "Error al cargar los campeones de las partidas")
+    resultado = []
+    for p in partidas:
+        fila = dict(p) if isinstance(p, dict) else p.model_dump()
+        fila["champions"] = por_match[fila["id"]]
+        resultado.append(fila)
+    return resultado
+
+# PLAYER
+
+def crear_jugador(session: Session, obj: Player) -> Dict[str, Any]:
+    return jugadores.crear(session, obj)  # sin id ni is_deleted
+
+
+def crear_jugadores_lote(session: Session, items: List[Any]) -> Dict[str, Any]:
+    return jugadores.crear_lote(session, items)
 
 
 def listar_jugadores(
@@ -381,127 +484,72 @@ def listar_jugadores(
     skip: int = 0,
     limit: int = 10,
     include_deleted: bool = False,
+    after: Optional[Tuple[Any, ...]] = None,
+    campos: Optional[Tuple[str, ...]] = None,
+    filtros: Filtros = SIN_FILTROS,
 ) -> List[Player]:
-    try:
-        q = (
-            select(Player)
-            .where(_apply_active_filter(Player, include_deleted))
-            .offset(skip)
-            .limit(limit)
-        )
-        return session.exec(q).all()
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al listar los jugadores")
+    return jugadores.listar(session, skip, limit, include_deleted, after, campos, filtros)
 
 
-def listar_jugadores_eliminados(session: Session) -> List[Player]:
+def listar_jugadores_eliminados(session: Session, campos: Optional[Tuple[str, ...]] = None) -> List[Player]:
     """Solo jugadores con is_deleted = True."""
-    try:
-        q = select(Player).where(Player.is_deleted == True)  # noqa: E712
-        return session.exec(q).all()
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al listar jugadores eliminados")
+    return jugadores.listar_eliminados(session, campos)
 
 
-def obtener_jugador(session: Session, player_id: int) -> Player:
+def obtener_jugador(session: Session, player_id: int, campos: Optional[Tuple[str, ...]] = None) -> Player:
     """Obtener un jugador por id (solo si no está eliminado)."""
-    try:
-        obj = session.get(Player, player_id)
-        if not obj or obj.is_deleted:
-            raise HTTPException(status_code=404, detail="Jugador no encontrado o eliminado")
-        return obj
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al obtener jugador")
+    return jugadores.obtener(session, player_id, campos)
 
 
 def actualizar_jugador(session: Session, player_id: int, obj_update: Player) -> Player:
-    try:
-        db_obj = session.get(Player, player_id)
-        if not db_obj or db_obj.is_deleted:
-            raise HTTPException(status_code=404, detail="Jugador no encontrado o eliminado")
-
-        # Copiar campos uno a uno, ignorando id / is_deleted
-        update_data = obj_update.dict(exclude_unset=True, exclude={"id", "is_deleted"})
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
-
-        session.add(db_obj)
-        session.commit()
-        session.refresh(db_obj)
-        return db_obj
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al actualizar jugador")
+    return jugadores.actualizar(session, player_id, obj_update)
 
 
 def eliminar_jugador(session: Session, player_id: int) -> bool:
     """Soft delete del jugador (is_deleted = True)."""
-    try:
-        obj = session.get(Player, player_id)
-        if not obj:
-            raise HTTPException(status_code=404, detail="Jugador no encontrado")
-        if obj.is_deleted:
-            raise HTTPException(status_code=400, detail="El jugador ya está eliminado")
-        obj.is_deleted = True
-        session.add(obj)
-        session.commit()
-        return True
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al eliminar jugador (soft delete)")
+    return jugadores.eliminar(session, player_id)
 
 
 def restaurar_jugador(session: Session, player_id: int) -> bool:
     """Revertir soft delete (is_deleted = False)."""
-    try:
-        obj = session.get(Player, player_id)
-        if not obj:
-            raise HTTPException(status_code=404, detail="Jugador no encontrado")
-        if not obj.is_deleted:
-            raise HTTPException(status_code=400, detail="El jugador no está eliminado")
-        obj.is_deleted = False
-        session.add(obj)
-        session.commit()
-        return True
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al restaurar jugador")
+    return jugadores.restaurar(session, player_id)
 
 
-def buscar_jugadores_por_nickname(session: Session, nickname_query: str) -> List[Player]:
-    try:
-        if not nickname_query:
-            raise HTTPException(status_code=400, detail="Debe proporcionar un texto de búsqueda")
+def eliminar_jugadores_lote(
+    session: Session, ids: Optional[List[int]] = None, filtro: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    return jugadores.eliminar_lote(session, ids, filtro)
 
-        pattern = f"%{nickname_query}%"
-        q = select(Player).where(
-            Player.nickname.ilike(pattern),  # type: ignore[attr-defined]
-            Player.is_deleted == False,      # noqa: E712
-        )
-        return session.exec(q).all()
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al buscar jugadores por nickname")
 
+def restaurar_jugadores_lote(
+    session: Session, ids: Optional[List[int]] = None, filtro: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    return jugadores.restaurar_lote(session, ids, filtro)
 
-def filtrar_jugadores_por_rol(session: Session, role: str) -> List[Player]:
-    """Filtrar jugadores por rol (TOP, JNG, MID, ADC, SUP, etc.)."""
-    try:
-        if not role:
-            raise HTTPException(status_code=400, detail="El rol no puede ser vacío")
-        q = select(Player).where(
-            Player.role == role,
-            Player.is_deleted == False,  # noqa: E712
-        )
-        return session.exec(q).all()
-    except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al filtrar jugadores por rol")
 
+def buscar_jugadores_por_nickname(
+    session: Session, nickname_query: str, campos: Optional[Tuple[str, ...]] = None
+) -> List[Player]:
+    if not nickname_query:
+        raise HTTPException(status_code=400, detail="Debe proporcionar un texto de búsqueda")
+    return jugadores.buscar(session, nickname_query, campos)
 
-def filtrar_jugadores_por_equipo(session: Session, team_id: int) -> List[Player]:
-    """Todos los jugadores activos de un equipo concreto."""
+
+def buscar_jugadores_difuso(session: Session, nickname: str, limit: int = 10, min_score: float = 0.5) -> List[Dict[str, Any]]:
+    """Jugadores con nickname parecido aunque esté mal escrito ("Fakr" -> "Faker")."""
     try:
-        q = select(Player).where(
-            Player.team_id == team_id,
-            Player.is_deleted == False,  # noqa: E712
-        )
-        return session.exec(q).all()
+        return buscar_difuso(session, "player", nickname, limit, min_score)
     except SQLAlchemyError as e:
-        _handle_exception(session, e, "Error al filtrar jugadores por equipo")
+        _handle_exception(session, e, "Error en la búsqueda difusa de jugadores")
 
+
+def filtrar_jugadores_por_rol(session: Session, role: str, campos: Optional[Tuple[str, ...]] = None) -> List[Player]:
+    """Filtrar jugadores por rol (TOP, JNG, MID, ADC, SUP, etc.)."""
+    if not role:
+        raise HTTPException(status_code=400, detail="El rol no puede ser vacío")
+    return jugadores.filtrar(session, "role", role, campos=campos)
+
+
+def filtrar_jugadores_por_equipo(session: Session, team_id: int, campos: Optional[Tuple[str, ...]] = None) -> List[Player]:
+    """Todos los jugadores activos de un equipo concreto."""
+    return jugadores.filtrar(session, "team_id", team_id, campos=campos)
@@ -0,0 +1,539 @@
+"""
+Repositorio genérico para las entidades con soft delete (Champion, Team,
+MatchSummary, Player).
+
+Las sentencias se construyen una sola vez por entidad (y proyección) con
+bindparam() y se reutilizan en cada petición: no se rearma el select(...) en
+cada llamada y SQLAlchemy encuentra la versión compilada en su caché. Las operaciones de
+escritura mantienen el dashboard y registran el cambio en la misma transacción.
+
+Las lecturas sin límite (eliminados, búsqueda, filtros) llevan yield_per y
+_ejecutar las consume por particiones: en Postgres es un cursor de servidor y
+el driver guarda TAMANO_CHUNK filas por vez mientras se arman los modelos, en
+lugar del resultado entero además de la lista que se devuelve.
+"""
+import json
+import operator
+from typing import Any, Callable, Dict, Generic, List, NamedTuple, Optional, Tuple, Type, TypeVar
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import Integer, and_, bindparam, column, insert, or_, text, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+
+from data.models import TableBase
+from operations.busqueda_db import MIN_TRIGRAMA, fts_activo
+from operations.dashboard_db import INSERTS_CON_CONFLICTO, aplicar_a_dashboard, aplicar_lote_a_dashboard
+from utils.cambios import registrar_cambio
+from utils.filtros import SIN_FILTROS, Filtros, convertir_valor
+
+M = TypeVar("M", bound=TableBase)
+
+# Filas por sentencia INSERT multi-fila (muy por debajo del límite de parámetros de SQLite)
+# y por partición al leer con yield_per
+TAMANO_CHUNK = 500
+# Sentencias de lectura guardadas por entidad (las combinaciones de filtros no tienen tope)
+MAX_SENTENCIAS = 1024
+
+COMPARADORES = {"eq": operator.eq, "gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+
+
+class Mensajes(NamedTuple):
+    singular: str           # "el campeón": para los errores 500
+    plural: str             # "los campeones"
+    no_encontrado: str      # 404 al eliminar/restaurar
+    no_disponible: str      # 404 al obtener/actualizar (no existe o está eliminado)
+    ya_eliminado: str       # 400 al eliminar
+    no_eliminado: str       # 400 al restaurar
+
+
+class Repositorio(Generic[M]):
+    def __init__(
+        self,
+        model: Type[M],
+        mensajes: Mensajes,
+        campo_busqueda: Optional[str] = None,
+        unicos: Tuple[str, ...] = (),
+    ):
+        self.model = model
+        self.mensajes = mensajes
+        self.campo_busqueda = campo_busqueda
+        self.unicos = unicos
+        self.tabla = model.__table__
+        self.entidad = model.__tablename__
+
+        # Campos que salen en el JSON (sin los exclude=True), en el orden de la tabla
+        self.campos = tuple(c.name for c in self.tabla.columns if not model.model_fields[c.name].exclude)
+        self._activos = model.is_deleted == False  # noqa: E712
+        # Lecturas por (consulta, campos, ...); campos None = modelos completos
+        self._sentencias: Dict[Tuple, Any] = {}
+        self._existe = select(model.id).where(model.id == bindparam("id"))
+        # UPDATE ... WHERE id=:id AND is_deleted=:esperado RETURNING *
+        self._cambiar_borrado = (
+            update(self.tabla)
+            .where(self.tabla.c.id == bindparam("obj_id"), self.tabla.c.is_deleted == bindparam("esperado"))
+            .values(is_deleted=bindparam("nuevo"))
+            .returning(*self.tabla.columns)
+        )
+        # INSERT multi-fila RETURNING id, con los ids en el orden de las filas. SQLite no da ese
+        # orden a SQLAlchemy (lo haría fila a fila), pero dentro de un INSERT los rowid nuevos
+        # crecen en el orden de VALUES: basta con ordenarlos (ver _insertar_filas)
+        self._insertar = insert(model).returning(model.id, sort_by_parameter_order=True)
+        self._insertar_sqlite = insert(model).returning(model.id)
+
+    def _error(self, session: Session, exc: Exception, accion: str):
+        """Rollback y excepción HTTP unificada."""
+        session.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al {accion}. Error: {str(exc)}")
+
+    # LECTURA
+    # Con campos (tupla de nombres de self.campos) se seleccionan solo esas columnas
+    # y se devuelven dicts, sin construir modelos; sin campos, instancias del modelo.
+
+    def _select(self, campos: Optional[Tuple[str, ...]]):
+        if campos is None:
+            return select(self.model)
+        return select(*(self.tabla.c[nombre] for nombre in campos))
+
+    def _sentencia(self, clave: Tuple, construir: Callable[[], Any]):
+        """La sentencia se arma la primera vez que se pide y se reutiliza después (hasta MAX_SENTENCIAS)."""
+        sentencia = self._sentencias.get(clave)
+        if sentencia is None:
+            sentencia = construir()
+            if len(self._sentencias) < MAX_SENTENCIAS:
+                self._sentencias[clave] = sentencia
+        return sentencia
+
+    def _ejecutar(self, session: Session, sentencia, params: Dict[str, Any], campos: Optional[Tuple[str, ...]]) -> list:
+        if campos is None:
+            resultado = session.exec(sentencia, params=params)
+            return [obj for parte in resultado.partitions(TAMANO_CHUNK) for obj in parte]
+        resultado = session.execute(sentencia, params)
+        return [dict(zip(campos, fila)) for parte in resultado.partitions(TAMANO_CHUNK) for fila in parte]
+
+    def obtener(self, session: Session, obj_id: int, campos: Optional[Tuple[str, ...]] = None) -> M:
+        """Por id (mapa de identidad de la sesión); 404 si no existe o está eliminado."""
+        try:
+            if campos is None:
+                obj = session.get(self.model, obj_id)
+                if obj and not obj.is_deleted:
+                    return obj
+            else:
+                sentencia = self._sentencia(
+                    ("obtener", campos),
+                    lambda: self._select(campos).where(self.model.id == bindparam("id"), self._activos),
+                )
+                filas = self._ejecutar(session, sentencia, {"id": obj_id}, campos)
+                if filas:
+                    return filas[0]
+        except SQLAlchemyError as e:
+            self._error(session, e, f"obtener {self.mensajes.singular}")
+        raise HTTPException(status_code=404, detail=self.mensajes.no_disponible)
+
+    def _despues_de(self, orden: Tuple[Tuple[str, bool], ...]):
+        """Filas posteriores a la posición :k0..:kn en ese orden (keyset)."""
+        columnas = [self.tabla.c[campo] for campo, _ in orden]
+        params = [bindparam(f"k{i}", type_=c.type) for i, c in enumerate(columnas)]
+        direcciones = {desc for _, desc in orden}
+        if len(direcciones) == 1:
+            # Mismo sentido en todas: comparación de tuplas, que el índice resuelve como un rango
+            izq = columnas[0] if len(columnas) == 1 else tuple_(*columnas)
+            der = params[0] if len(params) == 1 else tuple_(*params)
+            return izq < der if direcciones.pop() else izq > der
+        return or_(*[
+            and_(*[columnas[j] == params[j] for j in range(i)], c < p if desc else c > p)
+            for i, ((_, desc), c, p) in enumerate(zip(orden, columnas, params))
+        ])
+
+    def listar(
+        self,
+        session: Session,
+        skip: int = 0,
+        limit: int = 10,
+        include_deleted: bool = False,
+        after: Optional[Tuple[Any, ...]] = None,
+        campos: Optional[Tuple[str, ...]] = None,
+        filtros: Filtros = SIN_FILTROS,
+    ) -> List[M]:
+        """
+        Orden de filtros.orden (por defecto id), siempre estable porque termina en id.
+        - Con after (posición del cursor): keyset, usa el índice y no descarta filas.
+        - Sin él: offset clásico, solo por compatibilidad.
+        - Los predicados de filtros se añaden al WHERE de la misma sentencia.
+        """
+        keyset = after is not None
+        if keyset:
+            if len(after) != len(filtros.orden):
+                raise HTTPException(status_code=400, detail="Cursor no válido para este orden")
+            # Los valores del cursor vienen del cliente: del tipo de cada columna o 400
+            try:
+                after = tuple(
+                    convertir_valor(self.tabla.c[campo], valor) for (campo, _), valor in zip(filtros.orden, after)
+                )
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Cursor no válido")
+        if campos is not None:
+            # Las columnas de orden van en la proyección: el cursor sale de ellas y la ruta las quita después
+            faltan = set(filtros.columnas_orden) - set(campos)
+            if faltan:
+                campos = tuple(c for c in self.campos if c in faltan or c in campos)
+
+        def construir():
+            q = self._select(campos)
+            if not include_deleted:
+                q = q.where(self._activos)
+            for i, (campo, op) in enumerate(filtros.predicados):
+                columna = self.tabla.c[campo]
+                if op == "in":
+                    q = q.where(columna.in_(bindparam(f"f{i}", expanding=True)))
+                else:
+                    q = q.where(COMPARADORES[op](columna, bindparam(f"f{i}", type_=columna.type)))
+            q = q.order_by(*[
+                self.tabla.c[campo].desc() if desc else self.tabla.c[campo].asc() for campo, desc in filtros.orden
+            ])
+            if keyset:
+                return q.where(self._despues_de(filtros.orden)).limit(bindparam("limit"))
+            return q.offset(bindparam("skip")).limit(bindparam("limit"))
+
+        try:
+            sentencia = self._sentencia(("listar", campos, include_deleted, keyset, filtros.forma), construir)
+            params = {f"f{i}": v for i, v in enumerate(filtros.valores)}
+            params["limit"] = limit
+            if keyset:
+                params.update({f"k{i}": v for i, v in enumerate(after)})
+            else:
+                params["skip"] = skip
+            return self._ejecutar(session, sentencia, params, campos)
+        except SQLAlchemyError as e:
+            self._error(session, e, f"listar {self.mensajes.plural}")
+
+    def listar_eliminados(self, session: Session, campos: Optional[Tuple[str, ...]] = None) -> List[M]:
+        try:
+            sentencia = self._sentencia(
+                ("eliminados", campos),
+                lambda: self._select(campos).where(self.model.is_deleted == True)  # noqa: E712
+                .execution_options(yield_per=TAMANO_CHUNK),
+            )
+            return self._ejecutar(session, sentencia, {}, campos)
+        except SQLAlchemyError as e:
+            self._error(session, e, f"listar {self.mensajes.plural} eliminados")
+
+    def _sentencia_busqueda(self, con_fts: bool, campos: Optional[Tuple[str, ...]]):
+        """Subcadena en campo_busqueda: por el índice FTS (trigram) o con ILIKE."""
+        def construir():
+            model = self.model
+            if con_fts:
+                ids = text(
+                    f"SELECT rowid FROM fts_{self.entidad} WHERE {self.campo_busqueda} LIKE :patron"
+                ).columns(column("rowid", Integer))
+                condicion = model.id.in_(ids)
+            else:
+                condicion = getattr(model, self.campo_busqueda).ilike(bindparam("patron"))
+            return self._select(campos).where(condicion, self._activos).execution_options(yield_per=TAMANO_CHUNK)
+
+        return self._sentencia(("buscar", campos, con_fts), construir)
+
+    def buscar(self, session: Session, texto: str, campos: Optional[Tuple[str, ...]] = None) -> List[M]:
+        """Activos cuyo campo_busqueda contiene el texto (sin distinguir mayúsculas)."""
+        try:
+            con_fts = fts_activo() and len(texto) >= MIN_TRIGRAMA
+            return self._ejecutar(session, self._sentencia_busqueda(con_fts, campos), {"patron": f"%{texto}%"}, campos)
+        except SQLAlchemyError as e:
+            self._error(session, e, f"buscar {self.mensajes.plural}")
+
+    def filtrar(
+        self, session: Session, campo: str, valor: Any, op: str = "==", campos: Optional[Tuple[str, ...]] = None
+    ) -> List[M]:
+        """Activos con campo == valor (u op '>=')."""
+        def construir():
+            columna = getattr(self.model, campo)
+            condicion = columna >= bindparam("valor") if op == ">=" else columna == bindparam("valor")
+            return self._select(campos).where(condicion, self._activos).execution_options(yield_per=TAMANO_CHUNK)
+
+        try:
+            sentencia = self._sentencia(("filtrar", campos, campo, op), construir)
+            return self._ejecutar(session, sentencia, {"valor": valor}, campos)
+        except SQLAlchemyError as e:
+            self._error(session, e, f"filtrar {self.mensajes.plural}")
+
+    # ESCRITURA
+
+    def crear(self, session: Session, obj: M) -> Dict[str, Any]:
+        """Respuesta sin 'id' ni 'is_deleted'."""
+        try:
+            obj.id = None  # ignorar cualquier id entrante
+            session.add(obj)
+            session.flush()
+            aplicar_a_dashboard(session, obj, +1)
+            registrar_cambio(session, self.entidad, obj.id, "create")
+            session.commit()
+            session.refresh(obj)
+            return obj.dict(exclude={"id", "is_deleted"})
+        except SQLAlchemyError as e:
+            self._error(session, e, f"crear {self.mensajes.singular}")
+
+    def actualizar(self, session: Session, obj_id: int, obj_update: M) -> M:
+        try:
+            # Bloqueada hasta el commit: la contribución que se resta al dashboard es la vigente
+            obj = session.get(self.model, obj_id, with_for_update=True)
+            if not obj or obj.is_deleted:
+                raise HTTPException(status_code=404, detail=self.mensajes.no_disponible)
+
+            # Copiar campos uno a uno, ignorando id / is_deleted
+            data = obj_update.dict(exclude_unset=True, exclude={"id", "is_deleted"})
+            aplicar_a_dashboard(session, obj, -1)
+            for k, v in data.items():
+                setattr(obj, k, v)
+            aplicar_a_dashboard(session, obj, +1)
+            session.add(obj)
+            registrar_cambio(session, self.entidad, obj.id, "update")
+            session.commit()
+            session.refresh(obj)
+            return obj
+        except SQLAlchemyError as e:
+            self._error(session, e, f"actualizar {self.mensajes.singular}")
+
+    def _aplicar_filas_a_dashboard(self, session: Session, filas, signo: int) -> None:
+        """Contribución al dashboard de filas devueltas por RETURNING, como si estuvieran activas (todas juntas)."""
+        aplicar_lote_a_dashboard(session, [(self.model(**dict(fila, is_deleted=False)), signo) for fila in filas])
+
+    def _cambiar_borrado_uno(self, session: Session, obj_id: int, eliminar: bool) -> bool:
+        """
+        Soft delete / restauración atómica de un registro:
+        UPDATE ... SET is_deleted=:eliminar WHERE id=:id AND is_deleted=:contrario RETURNING *
+        - Si no cambia nada, una consulta por id distingue 404 (no existe) de 400 (ya estaba así).
+        - Dos peticiones concurrentes sobre el mismo id: solo una ve la fila, la otra recibe 400.
+        """
+        accion = "eliminar" if eliminar else "restaurar"
+        try:
+            params = {"obj_id": obj_id, "esperado": not eliminar, "nuevo": eliminar}
+            fila = session.execute(self._cambiar_borrado, params).mappings().first()
+            if fila is None:
+                session.rollback()
+                if session.exec(self._existe, params={"id": obj_id}).first() is None:
+                    raise HTTPException(status_code=404, detail=self.mensajes.no_encontrado)
+                mismo_estado = self.mensajes.ya_eliminado if eliminar else self.mensajes.no_eliminado
+                raise HTTPException(status_code=400, detail=mismo_estado)
+
+            self._aplicar_filas_a_dashboard(session, [fila], -1 if eliminar else +1)
+            registrar_cambio(session, self.entidad, obj_id, "delete" if eliminar else "restore")
+            session.commit()
+            return True
+        except SQLAlchemyError as e:
+            self._error(session, e, f"{accion} {self.mensajes.singular}")
+
+    def eliminar(self, session: Session, obj_id: int) -> bool:
+        return self._cambiar_borrado_uno(session, obj_id, True)
+
+    def restaurar(self, session: Session, obj_id: int) -> bool:
+        return self._cambiar_borrado_uno(session, obj_id, False)
+
+    # LOTES
+
+    def _insertar_con_conflicto(self, dialecto: str, upsert: bool):
+        """
+        INSERT ... ON CONFLICT (columna única) RETURNING id, columna (SQLite y Postgres).
+        - DO NOTHING: un registro creado por otra transacción entre la comprobación
+          y el INSERT no aborta el lote; ese item se reporta como duplicado.
+        - DO UPDATE (upsert): el registro existente toma los valores del item (salvo id e is_deleted).
+        """
+        def construir():
+            clave = self.tabla.c[self.unicos[0]]
+            stmt = INSERTS_CON_CONFLICTO[dialecto](self.tabla)
+            if upsert:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[clave],
+                    set_={
+                        c.name: stmt.excluded[c.name]
+                        for c in self.tabla.columns if c.name not in ("id", "is_deleted", clave.name)
+                    },
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[clave])
+            return stmt.returning(self.tabla.c.id, clave)
+
+        return self._sentencia(("insertar", dialecto, upsert), construir)
+
+    def _insertar_filas(self, session: Session, dialecto: str, filas: List[Dict[str, Any]]) -> List[int]:
+        """Ids de las filas insertadas, en su orden."""
+        if dialecto == "sqlite":
+            return sorted(session.execute(self._insertar_sqlite, filas).scalars().all())
+        return session.execute(self._insertar, filas).scalars().all()
+
+    def crear_lote(self, session: Session, items: List[Any], upsert: bool = False) -> Dict[str, Any]:
+        """
+        Inserta un lote en una sola transacción con INSERT multi-fila por chunks.
+        - Cada item se valida por separado; los inválidos o duplicados no frenan al resto.
+        - ids[i] es el id del item i (nuevo o, con upsert, el del registro actualizado), o None si tiene error.
+        - upsert: un item cuya columna única ya existe actualiza ese registro en lugar de dar error.
+        """
+        model = self.model
+        dialecto = session.get_bind().dialect.name
+        con_conflicto = bool(self.unicos) and dialecto in INSERTS_CON_CONFLICTO
+        if upsert and not con_conflicto:
+            raise HTTPException(status_code=400, detail=f"No se admite upsert para {self.mensajes.plural}")
+        try:
+            errores: List[Dict[str, Any]] = []
+            validos = []  # (índice en el lote, objeto validado)
+            for i, item in enumerate(items):
+                try:
+                    obj = model.model_validate(item)
+                except ValidationError as e:
+                    errores.append({"index": i, "detail": json.loads(e.json(include_url=False))})
+                    continue
+                obj.id = None
+                obj.is_deleted = False
+                validos.append((i, obj))
+
+            # Columnas únicas: contra la BD (también eliminados) y dentro del propio lote.
+            # Con upsert los que ya existen no son error: se guarda su fila para el dashboard.
+            previos: Dict[Any, Any] = {}
+            for campo in self.unicos:
+                columna = self.tabla.c[campo]
+                valores = list({getattr(obj, campo) for _, obj in validos})
+                existentes: Dict[Any, Any] = {}
+                for inicio in range(0, len(valores), TAMANO_CHUNK):
+                    grupo = valores[inicio:inicio + TAMANO_CHUNK]
+                    if upsert:
+                        q = select(self.tabla).where(columna.in_(grupo)).with_for_update()
+                        existentes.update((fila[campo], fila) for fila in session.execute(q).mappings())
+                    else:
+                        existentes.update(dict.fromkeys(session.exec(select(columna).where(columna.in_(grupo))).all()))
+                vistos = set()
+                restantes = []
+                for i, obj in validos:
+                    valor = getattr(obj, campo)
+                    if valor in vistos or (valor in existentes and not upsert):
+                        errores.append({"index": i, "detail": f"Ya existe un registro con {campo} '{valor}'"})
+                    else:
+                        vistos.add(valor)
+                        restantes.append((i, obj))
+                validos = restantes
+                if upsert:
+                    previos = existentes
+
+            filas = [dict(obj.model_dump(exclude={"id"}), is_deleted=False) for _, obj in validos]
+            if con_conflicto:
+                clave = self.unicos[0]
+                stmt = self._insertar_con_conflicto(dialecto, upsert)
+                por_clave: Dict[Any, int] = {}
+                for inicio in range(0, len(filas), TAMANO_CHUNK):
+                    por_clave.update(
+                        (valor, id_) for id_, valor in session.execute(stmt, filas[inicio:inicio + TAMANO_CHUNK])
+                    )
+                resultado = [(i, obj, por_clave.get(getattr(obj, clave))) for i, obj in validos]
+            else:
+                nuevos_ids: List[int] = []
+                for inicio in range(0, len(filas), TAMANO_CHUNK):
+                    nuevos_ids.extend(self._insertar_filas(session, dialecto, filas[inicio:inicio + TAMANO_CHUNK]))
+                resultado = [(i, obj, id_) for (i, obj), id_ in zip(validos, nuevos_ids)]
+
+            ids: List[Optional[int]] = [None] * len(items)
+            creados = actualizados = 0
+            cambios = []  # (obj, signo) para el dashboard, aplicados juntos al final
+            for i, obj, id_ in resultado:
+                if id_ is None:
+                    campo = self.unicos[0]
+                    errores.append({"index": i, "detail": f"Ya existe un registro con {campo} '{getattr(obj, campo)}'"})
+                    continue
+                ids[i] = obj.id = id_
+                previo = previos.get(getattr(obj, self.unicos[0])) if upsert else None
+                if previo is not None:
+                    cambios.append((model(**previo), -1))
+                    obj.is_deleted = previo["is_deleted"]
+                    actualizados += 1
+                else:
+                    creados += 1
+                cambios.append((obj, +1))
+            aplicar_lote_a_dashboard(session, cambios)
+            # Un solo aviso por lote: los clientes refrescan la tabla entera igualmente
+            if creados:
+                registrar_cambio(session, self.entidad, None, "create")
+            if actualizados:
+                registrar_cambio(session, self.entidad, None, "update")
+            session.commit()
+
+            errores.sort(key=lambda e: e["index"])
+            respuesta = {"created": creados, "ids": ids, "errors": errores}
+            if upsert:
+                respuesta["updated"] = actualizados
+            return respuesta
+        except SQLAlchemyError as e:
+            self._error(session, e, f"crear el lote de {self.mensajes.plural}")
+
+    def _cambiar_borrado_lote(
+        self,
+        session: Session,
+        eliminar: bool,
+        ids: Optional[List[int]],
+        filtro: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Soft delete (eliminar=True) o restauración por lotes con un UPDATE por chunk:
+        UPDATE ... SET is_deleted=:eliminar WHERE <ids|filtro> AND is_deleted=:contrario RETURNING *
+        - Con ids: los que no cambian se reportan con 404 (no existe) o 400 (ya estaba así).
+        """
+        accion = "eliminar" if eliminar else "restaurar"
+        tabla = self.tabla
+        try:
+            condiciones = []
+            if filtro:
+                columnas = {c.name for c in tabla.columns} - {"id", "is_deleted"}
+                desconocidas = sorted(set(filtro) - columnas)
+                if desconocidas:
+                    raise HTTPException(
+                        status_code=400, detail=f"Campos de filtro no válidos: {', '.join(desconocidas)}"
+                    )
+                for campo, valor in filtro.items():
+                    try:
+                        condiciones.append(tabla.c[campo] == convertir_valor(tabla.c[campo], valor))
+                    except ValueError:
+                        raise HTTPException(status_code=400, detail=f"Valor no válido para '{campo}': {valor!r}")
+
+            pedidos = list(dict.fromkeys(ids)) if ids is not None else None
+            grupos = (
+                [pedidos[i:i + TAMANO_CHUNK] for i in range(0, len(pedidos), TAMANO_CHUNK)]
+                if pedidos is not None else [None]
+            )
+            filas = []
+            for grupo in grupos:
+                where = condiciones + [tabla.c.is_deleted == (not eliminar)]
+                if grupo is not None:
+                    where.append(tabla.c.id.in_(grupo))
+                stmt = update(tabla).where(*where).values(is_deleted=eliminar).returning(*tabla.columns)
+                filas.extend(session.execute(stmt).mappings().all())
+
+            self._aplicar_filas_a_dashboard(session, filas, -1 if eliminar else +1)
+            if filas:
+                registrar_cambio(session, self.entidad, None, "delete" if eliminar else "restore")
+
+            errores: List[Dict[str, Any]] = []
+            if pedidos is not None:
+                cambiados = {fila["id"] for fila in filas}
+                faltantes = [i for i in pedidos if i not in cambiados]
+                existentes = set()
+                for inicio in range(0, len(faltantes), TAMANO_CHUNK):
+                    q = select(self.model.id).where(self.model.id.in_(faltantes[inicio:inicio + TAMANO_CHUNK]))
+                    existentes.update(session.exec(q).all())
+                estado = "ya estaba eliminado" if eliminar else "no está eliminado"
+                for i in faltantes:
+                    if i in existentes:
+                        errores.append({"id": i, "status_code": 400, "detail": f"El registro {estado}"})
+                    else:
+                        errores.append({"id": i, "status_code": 404, "detail": "Registro no encontrado"})
+
+            session.commit()
+            return {"affected": len(filas), "ids": sorted(fila["id"] for fila in filas), "errors": errores}
+        except SQLAlchemyError as e:
+            self._error(session, e, f"{accion} {self.mensajes.plural} por lote")
+
+    def eliminar_lote(
+        self, session: Session, ids: Optional[List[int]] = None, filtro: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        return self._cambiar_borrado_lote(session, True, ids, filtro)
+
+    def restaurar_lote(
+        self, session: Session, ids: Optional[List[int]] = None, filtro: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        return self._cambiar_borrado_lote(session, False, ids, filtro)
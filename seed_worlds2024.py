@@ -5,6 +5,7 @@ from sqlmodel import Session, select, delete
 
 from utils.db import engine, crear_db
 from data.models import Team, Player, Champion, MatchSummary, MatchChampionLink
+from operations.dashboard_db import recalcular_dashboard
 
 
 # =========================
@@ -187,6 +188,8 @@ def main():
         seed_players(session)
         seed_champions(session)
         seed_matches(session)
+        # El seed inserta por fuera de operations_db: reconstruir el read model
+        recalcular_dashboard(session)
 
     print("✅ Seed Worlds 2024 COMPLETADO.")
 
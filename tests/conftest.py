@@ -0,0 +1,212 @@
+"""
+Fixtures comunes de las pruebas.
+
+La API se importa una vez por proceso y su engine sale de DATABASE_URL, así que
+la BD se elige antes de importarla:
+- TEST_DATABASE_URL: una BD vacía ya creada (p. ej. el Postgres de CI).
+- Si no, --motor {auto,sqlite,postgres} crea una BD temporal sin Docker
+  (benchmarks/bd_local.py): Postgres local si hay initdb/pg_ctl (PATH o PG_BIN),
+  si no SQLite. Con auto las pruebas van por Postgres siempre que se pueda.
+
+Las pruebas que piden database_url quedan parametrizadas con esa URL (el id de
+la prueba lleva el motor, ej. test_x[postgresql]).
+
+    python -m pytest -q                    # Postgres local si existe, si no SQLite
+    python -m pytest -q --motor sqlite
+    python -m pytest -q --db-async         # rutas de lectura por el AsyncEngine (DB_ASYNC=1)
+"""
+import os
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.bd_local import MOTORES, bd_temporal  # noqa: E402
+
+# BD temporal abierta durante toda la sesión de pytest
+_CLAVE_PILA = pytest.StashKey[ExitStack]()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--motor", choices=MOTORES, default="auto",
+        help="BD temporal de las pruebas (se ignora con TEST_DATABASE_URL)",
+    )
+    parser.addoption(
+        "--db-async", action="store_true",
+        help="Lecturas por el AsyncEngine, como con DB_ASYNC=1",
+    )
+
+
+def pytest_configure(config):
+    pila = ExitStack()
+    url = os.getenv("TEST_DATABASE_URL") or pila.enter_context(bd_temporal(config.getoption("--motor")))
+    config.stash[_CLAVE_PILA] = pila
+    os.environ["DATABASE_URL"] = url
+    if config.getoption("--db-async"):
+        os.environ["DB_ASYNC"] = "1"
+    # Con DB_ESCRITOR_UNICO=0, 16 hilos hacen cola en el bloqueo de escritura de SQLite:
+    # con el GIL repartido entre todos, 5 s de espera no siempre bastan
+    os.environ.setdefault("SQLITE_BUSY_TIMEOUT", "60000")
+    # Las rutas de templates/ y static/ son relativas al directorio del proyecto
+    os.chdir(BASE_DIR)
+
+
+def pytest_unconfigure(config):
+    pila = config.stash.get(_CLAVE_PILA, None)
+    if pila is not None:
+        pila.close()
+
+
+def pytest_generate_tests(metafunc):
+    if "database_url" in metafunc.fixturenames:
+        url = os.environ["DATABASE_URL"]
+        metafunc.parametrize("database_url", [url], ids=[url.split(":", 1)[0].split("+")[0]], scope="session")
+
+
+@pytest.fixture(scope="session")
+def app(database_url):
+    """TestClient de la API con el arranque hecho (tablas, dashboard, índices de búsqueda)."""
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as cliente:
+        yield cliente
+
+
+@pytest.fixture
+def bd(app):
+    """BD vacía para cada prueba: borra todas las tablas y reinicia read model, cachés e índices en memoria."""
+    from sqlmodel import SQLModel, Session
+    import main
+    from operations.busqueda_db import cargar_sugerencias
+    from operations.dashboard_db import recalcular_dashboard
+    from utils.db import engine
+
+    tablas = list(reversed(SQLModel.metadata.sorted_tables))
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            # Los ids vuelven a empezar en 1, como en SQLite con las tablas vacías
+            conn.exec_driver_sql(f"TRUNCATE {', '.join(t.name for t in tablas)} RESTART IDENTITY CASCADE")
+        else:
+            for tabla in tablas:
+                conn.execute(tabla.delete())
+    with Session(engine) as session:
+        recalcular_dashboard(session)
+        cargar_sugerencias(session)
+    for cache in main.cache_entidades.values():
+        cache.limpiar()
+    main.dashboard_cache.limpiar()
+    return engine
+
+
+@pytest.fixture
+def cliente(app, bd):
+    return app
+
+
+@pytest.fixture
+def comprobar_dashboard(bd):
+    """
+    Compara el dashboard mantenido por las escrituras con uno recalculado desde
+    cero (sin confirmarlo) y devuelve el mantenido.
+    """
+    from sqlmodel import Session
+    from operations.dashboard_db import obtener_estadisticas, recalcular_dashboard
+
+    def comprobar():
+        with Session(bd) as session:
+            materializado = obtener_estadisticas(session)
+        with Session(bd) as session:
+            recalcular_dashboard(session, commit=False)
+            reconstruido = obtener_estadisticas(session)
+            session.rollback()
+        distintos = {
+            clave: (valor, reconstruido[clave])
+            for clave, valor in materializado.items()
+            if valor != pytest.approx(reconstruido[clave])
+        }
+        assert distintos == {}, f"dashboard (mantenido, reconstruido): {distintos}"
+        return materializado
+
+    return comprobar
+
+
+@pytest.fixture
+def sentencias(bd):
+    """
+    sentencias(llamada) ejecuta la llamada y devuelve el SQL que lanzó, en cualquier
+    engine (también el del escritor único).
+    """
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    def lanzadas(llamada) -> list:
+        sql = []
+
+        def capturar(conn, cursor, sentencia, params, contexto, varias):
+            sql.append(sentencia)
+
+        event.listen(Engine, "before_cursor_execute", capturar)
+        try:
+            llamada()
+        finally:
+            event.remove(Engine, "before_cursor_execute", capturar)
+        return sql
+
+    return lanzadas
+
+
+@pytest.fixture(params=["escritor_unico", "threadpool"])
+def modo_escritura(request, monkeypatch, app):
+    """Las escrituras por el escritor único (si el motor lo usa) y por el threadpool (DB_ESCRITOR_UNICO=0)."""
+    import utils.escritor
+
+    if request.param == "threadpool":
+        monkeypatch.setattr(utils.escritor, "escritor", None)
+    elif utils.escritor.escritor is None:
+        pytest.skip("este motor no usa escritor único")
+    return request.param
+
+
+@pytest.fixture
+def planes(bd):
+    """
+    planes(llamada) ejecuta la llamada y devuelve {sql: [detalle de EXPLAIN QUERY PLAN]}
+    de cada SELECT que lanzó por los engines de lectura (solo SQLite).
+    - Con DB_ASYNC=1 las rutas leen por async_engine: se escucha su sync_engine.
+    """
+    from sqlalchemy import event
+    from utils.db import async_engine, read_engine
+
+    if bd.dialect.name != "sqlite":
+        pytest.skip("EXPLAIN QUERY PLAN es de SQLite")
+    motores = {bd, read_engine}
+    if async_engine is not None:
+        motores.add(async_engine.sync_engine)
+
+    def planes_de(llamada) -> dict:
+        consultas = []
+
+        def capturar(conn, cursor, sql, params, contexto, varias):
+            if sql.lstrip().upper().startswith("SELECT"):
+                consultas.append((sql, params))
+
+        for motor in motores:
+            event.listen(motor, "before_cursor_execute", capturar)
+        try:
+            llamada()
+        finally:
+            for motor in motores:
+                event.remove(motor, "before_cursor_execute", capturar)
+        with bd.connect() as conn:
+            return {
+                sql: [fila[3] for fila in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params)]
+                for sql, params in consultas
+            }
+
+    return planes_de
@@ -0,0 +1,94 @@
+"""
+Peticiones concurrentes por la API (TestClient desde un ThreadPoolExecutor):
+ninguna falla con 500 y conteos y agregados quedan igual que una reconstrucción.
+"""
+import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+HILOS = 16
+EQUIPOS = 8
+JUGADORES = 40
+
+
+def _poblar(cliente):
+    equipos = []
+    for i in range(EQUIPOS):
+        cliente.post("/teams/", json={"name": f"Team {i}", "region": "LCK", "wins": i, "losses": 2, "avg_kda": 3.0})
+    equipos = [t["id"] for t in cliente.get("/teams/", params={"limit": 100}).json()]
+    for i in range(JUGADORES):
+        cliente.post("/players/", json={
+            "nickname": f"jugador{i}", "role": "MID", "team_id": equipos[i % EQUIPOS], "kda": 2.0 + i % 5,
+        })
+    jugadores = [p["id"] for p in cliente.get("/players/", params={"limit": 100}).json()]
+    assert (len(equipos), len(jugadores)) == (EQUIPOS, JUGADORES)
+    return equipos, jugadores
+
+
+def test_borrado_y_restauracion_concurrentes(cliente, modo_escritura, comprobar_dashboard):
+    """Cada id termina borrado si y solo si tuvo un DELETE correcto más que restauraciones correctas."""
+    _, jugadores = _poblar(cliente)
+    pedidos = [(op, id_) for id_ in jugadores for op in ("delete", "restore", "delete") * 3]
+    random.Random(9).shuffle(pedidos)
+
+    def enviar(pedido):
+        op, id_ = pedido
+        if op == "delete":
+            return op, id_, cliente.delete(f"/players/{id_}").status_code
+        return op, id_, cliente.post(f"/players/{id_}/restore").status_code
+
+    with ThreadPoolExecutor(max_workers=HILOS) as pool:
+        resultados = list(pool.map(enviar, pedidos))
+
+    assert {estado for _, _, estado in resultados} <= {200, 400}
+    correctos = Counter((op, id_) for op, id_, estado in resultados if estado == 200)
+    borrados = {p["id"] for p in cliente.get("/players/deleted").json()}
+    for id_ in jugadores:
+        saldo = correctos[("delete", id_)] - correctos[("restore", id_)]
+        assert saldo == (1 if id_ in borrados else 0)
+    assert comprobar_dashboard()["players"] == JUGADORES - len(borrados)
+
+
+def test_escrituras_y_lecturas_concurrentes(cliente, modo_escritura, comprobar_dashboard):
+    equipos, jugadores = _poblar(cliente)
+
+    def peticion(n: int) -> tuple:
+        rnd = random.Random(n)
+        tipo = rnd.random()
+        equipo = rnd.choice(equipos)
+        if tipo < 0.2:
+            return "crear", cliente.post("/players/", json={
+                "nickname": f"nuevo{n}", "role": "TOP", "team_id": equipo, "kda": rnd.uniform(1, 8),
+            }).status_code
+        if tipo < 0.35:
+            return "mover", cliente.put(f"/players/{rnd.choice(jugadores)}", json={
+                "nickname": f"movido{n}", "role": "ADC", "team_id": equipo, "kda": rnd.uniform(1, 8),
+            }).status_code
+        if tipo < 0.45:
+            return "equipo", cliente.put(f"/teams/{equipo}", json={
+                "name": f"Team {equipos.index(equipo)}", "region": "LCK",
+                "wins": rnd.randint(0, 20), "losses": rnd.randint(0, 20), "avg_kda": rnd.uniform(1, 6),
+            }).status_code
+        if tipo < 0.55:
+            return "partida", cliente.post("/matches/", json={
+                "stage": "Groups", "team_a_id": equipo, "team_b_id": rnd.choice(equipos),
+                "winner_id": equipo, "avg_duration_min": rnd.uniform(25, 40),
+            }).status_code
+        if tipo < 0.65:
+            return "borrar", cliente.delete(f"/players/{rnd.choice(jugadores)}").status_code
+        if tipo < 0.75:
+            return "lectura", cliente.get("/players/", params={"limit": 20, "sort": "-kda"}).status_code
+        if tipo < 0.85:
+            return "lectura", cliente.get(f"/teams/{equipo}").status_code
+        if tipo < 0.95:
+            return "lectura", cliente.get("/api/dashboard", params={"sections": "stats"}).status_code
+        return "lectura", cliente.get("/search", params={"q": "jugador"}).status_code
+
+    with ThreadPoolExecutor(max_workers=HILOS) as pool:
+        resultados = Counter(pool.map(peticion, range(400)))
+
+    assert {estado for _, estado in resultados} <= {200, 400, 404}, resultados
+    stats = comprobar_dashboard()
+    assert stats["players"] == JUGADORES + resultados[("crear", 200)] - resultados[("borrar", 200)]
+    assert stats["matches"] == resultados[("partida", 200)]
+    assert stats["teams"] == EQUIPOS
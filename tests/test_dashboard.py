@@ -0,0 +1,124 @@
+"""Read model del dashboard: las escrituras concurrentes lo dejan igual que una reconstrucción completa."""
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from data.models import MatchSummary, Player, Team
+from operations.operations_db import (
+    actualizar_equipo, actualizar_jugador, crear_equipo, crear_jugador, crear_resumen,
+    eliminar_equipo, eliminar_jugador, eliminar_resumen, restaurar_equipo, restaurar_jugador,
+)
+
+HILOS = 16
+OPERACIONES = 600
+EQUIPOS = 12
+
+
+def _operacion(motor, rnd: random.Random, n: int) -> None:
+    """Una escritura al azar sobre pocos equipos, para que choquen entre sí."""
+    equipo = rnd.randint(1, EQUIPOS)
+    tipo = rnd.random()
+    with Session(motor) as session:
+        if tipo < 0.25:
+            crear_jugador(session, Player(
+                nickname=f"p{n}", role="MID", team_id=equipo, kda=round(rnd.uniform(1, 8), 2),
+            ))
+        elif tipo < 0.40:
+            crear_resumen(session, MatchSummary(
+                stage="Groups", team_a_id=equipo, team_b_id=rnd.randint(1, EQUIPOS),
+                avg_duration_min=round(rnd.uniform(25, 40), 1),
+            ))
+        elif tipo < 0.55:
+            actualizar_equipo(session, equipo, Team(
+                name=f"Team {equipo}", region="LCK", wins=rnd.randint(0, 20), losses=rnd.randint(0, 20),
+                avg_kda=round(rnd.uniform(1, 6), 2),
+            ))
+        elif tipo < 0.70:
+            actualizar_jugador(session, rnd.randint(1, max(n, 1)), Player(
+                nickname=f"mov{n}", role="TOP", team_id=equipo, kda=round(rnd.uniform(1, 8), 2),
+            ))
+        elif tipo < 0.78:
+            eliminar_jugador(session, rnd.randint(1, max(n, 1)))
+        elif tipo < 0.84:
+            restaurar_jugador(session, rnd.randint(1, max(n, 1)))
+        elif tipo < 0.90:
+            eliminar_resumen(session, rnd.randint(1, max(n // 4, 1)))
+        elif tipo < 0.95:
+            eliminar_equipo(session, equipo)
+        else:
+            restaurar_equipo(session, equipo)
+
+
+@pytest.fixture
+def equipos(bd):
+    with Session(bd) as session:
+        for i in range(1, EQUIPOS + 1):
+            crear_equipo(session, Team(name=f"Team {i}", region="LCK", wins=i, losses=1, avg_kda=2.0))
+    return bd
+
+
+def test_escrituras_concurrentes_mantienen_el_dashboard(equipos, comprobar_dashboard):
+    from utils.db import write_engine
+
+    errores = []
+    lock = threading.Lock()
+
+    def trabajo(n: int) -> None:
+        try:
+            _operacion(write_engine, random.Random(n), n)
+        except HTTPException as exc:
+            # 404/400 son esperables (ids al azar); un 500 es un fallo de la prueba
+            if exc.status_code >= 500:
+                with lock:
+                    errores.append(exc.detail)
+
+    with ThreadPoolExecutor(max_workers=HILOS) as pool:
+        list(pool.map(trabajo, range(1, OPERACIONES + 1)))
+
+    assert errores == []
+    comprobar_dashboard()
+
+
+
+def test_lote_en_pocas_sentencias(equipos, comprobar_dashboard):
+    """Un lote de N jugadores o partidas toca el read model con las mismas sentencias que uno de 1."""
+    from sqlalchemy import event, insert
+    from operations.dashboard_db import aplicar_lote_a_dashboard
+
+    rnd = random.Random(7)
+    lotes = {
+        # Algunos team_id sin equipo: no tienen agregados
+        Player: [
+            {"nickname": f"p{n}", "role": "MID", "team_id": rnd.randint(1, EQUIPOS + 2), "kda": rnd.uniform(1, 8)}
+            for n in range(300)
+        ],
+        MatchSummary: [
+            {"stage": "Groups", "team_a_id": rnd.randint(1, EQUIPOS), "team_b_id": rnd.randint(1, EQUIPOS),
+             "avg_duration_min": rnd.uniform(25, 40)}
+            for _ in range(300)
+        ],
+    }
+    sentencias = []
+
+    def contar(conn, cursor, sql, *args):
+        sentencias.append(sql)
+
+    with Session(equipos) as session:
+        for model, filas in lotes.items():
+            ids = session.execute(insert(model).returning(model.id, sort_by_parameter_order=True), filas).scalars()
+            objs = [model(id=id_, **fila) for id_, fila in zip(ids, filas)]
+            event.listen(equipos, "before_cursor_execute", contar)
+            try:
+                aplicar_lote_a_dashboard(session, [(obj, +1) for obj in objs])
+            finally:
+                event.remove(equipos, "before_cursor_execute", contar)
+            # Fila global, bloqueo de equipos, team_stats y UPDATE de la fila global
+            assert len(sentencias) == 4, sentencias
+            sentencias.clear()
+        session.commit()
+
+    comprobar_dashboard()
@@ -0,0 +1,76 @@
+"""Filtros y orden de los listados (utils.filtros + Repositorio.listar)."""
+import pytest
+
+
+def _jugadores(cliente, n=30):
+    for i in range(n):
+        cliente.post("/players/", json={"nickname": f"p{i}", "role": "MID", "kda": float(i % 7)})
+
+
+def _paginas(cliente, ruta, params):
+    """Todas las filas de un listado siguiendo el cursor."""
+    filas, cursor = [], None
+    while True:
+        r = cliente.get(ruta, params=dict(params, **({"cursor": cursor} if cursor else {})))
+        assert r.status_code == 200
+        filas += r.json()
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            return filas
+
+
+@pytest.mark.parametrize("sort", ["kda", "-kda"])
+def test_desempate_sigue_el_sentido_del_orden(cliente, sort):
+    _jugadores(cliente)
+    filas = _paginas(cliente, "/players/", {"sort": sort, "limit": 4})
+    desc = sort.startswith("-")
+    assert [(p["kda"], p["id"]) for p in filas] == sorted(((p["kda"], p["id"]) for p in filas), reverse=desc)
+    assert len({p["id"] for p in filas}) == 30
+
+
+@pytest.mark.parametrize("sort", ["kda", "-kda"])
+def test_orden_por_campo_usa_el_indice(cliente, planes, sort):
+    _jugadores(cliente)
+    cursor = cliente.get("/players/", params={"sort": sort, "limit": 4}).headers["X-Next-Cursor"]
+    consultas = planes(lambda: cliente.get("/players/", params={"sort": sort, "limit": 4, "cursor": cursor}))
+    (plan,) = consultas.values()
+    assert any("USING INDEX ix_player_activos_kda (kda" in paso for paso in plan), plan
+    assert not any("TEMP B-TREE" in paso for paso in plan), plan
+
+
+def test_error_de_campo_lista_los_filtrables_ordenados(cliente):
+    r = cliente.get("/players/", params={"nickname__gt": "a", "country": "KR"})
+    assert r.status_code == 400
+    campos = r.json()["detail"].split("Campos filtrables: ")[1].split(", ")
+    assert campos == sorted(campos)
+
+
+def test_fields_con_orden_no_devuelve_columnas_extra(cliente):
+    _jugadores(cliente, 8)
+    filas = _paginas(cliente, "/players/", {"fields": "nickname", "sort": "-kda", "limit": 3})
+    assert len(filas) == 8
+    assert all(set(fila) == {"id", "nickname"} for fila in filas)
+
+    for i in range(3):
+        cliente.post("/matches/", json={"stage": "Groups", "avg_duration_min": 30.0 + i})
+    r = cliente.get("/matches/", params={"fields": "stage", "sort": "-avg_duration_min", "expand": "champions"})
+    assert [set(fila) for fila in r.json()] == [{"id", "stage", "champions"}] * 3
+
+
+def test_cursor_de_otro_orden_es_400(cliente):
+    from utils.paginacion import codificar_cursor
+
+    for i in range(5):
+        cliente.post("/teams/", json={"name": f"Team {i}", "region": "LCK", "wins": i, "losses": 1})
+    cursor = cliente.get("/teams/", params={"sort": "name", "limit": 2}).headers["X-Next-Cursor"]
+    assert cliente.get("/teams/", params={"sort": "name", "limit": 2, "cursor": cursor}).status_code == 200
+
+    for sort in ("wins", "-name", None):
+        r = cliente.get("/teams/", params={"sort": sort, "limit": 2, "cursor": cursor} if sort else {"cursor": cursor})
+        assert r.status_code == 400, (sort, r.text)
+
+    # El cursor por id tampoco sirve con sort=-id, ni uno con valores de otro tipo
+    por_id = cliente.get("/teams/", params={"limit": 2}).headers["X-Next-Cursor"]
+    assert cliente.get("/teams/", params={"sort": "-id", "cursor": por_id}).status_code == 400
+    falso = codificar_cursor(["x", "y"], (("wins", False), ("id", False)))
+    assert cliente.get("/teams/", params={"sort": "wins", "cursor": falso}).status_code == 400
@@ -0,0 +1,94 @@
+"""Carga por lotes: INSERT ... ON CONFLICT, upsert y dashboard (en el motor de database_url)."""
+
+
+def _campeon(n, **cambios):
+    return dict({"name": f"Campeón {n}", "slug": f"campeon-{n}", "win_rate": 50.0, "pick_rate": 5.0}, **cambios)
+
+
+def test_lote_reporta_duplicados_sin_abortar(cliente, comprobar_dashboard):
+    r = cliente.post("/champions/bulk", json=[_campeon(1), _campeon(2), _campeon(2)])
+    assert r.status_code == 200
+    cuerpo = r.json()
+    assert cuerpo["created"] == 2
+    assert cuerpo["ids"][2] is None
+    assert [e["index"] for e in cuerpo["errors"]] == [2]
+
+    # Un slug ya existente es error sin upsert
+    r = cliente.post("/champions/bulk", json=[_campeon(1), _campeon(3)])
+    assert r.json()["created"] == 1
+    assert [e["index"] for e in r.json()["errors"]] == [0]
+
+    comprobar_dashboard()
+
+
+def test_upsert_actualiza_existentes(cliente, comprobar_dashboard):
+    ids = cliente.post("/champions/bulk", json=[_campeon(1), _campeon(2)]).json()["ids"]
+
+    r = cliente.post("/champions/bulk?upsert=true", json=[_campeon(1, win_rate=90.0), _campeon(3)])
+    assert r.status_code == 200
+    cuerpo = r.json()
+    assert (cuerpo["created"], cuerpo["updated"]) == (1, 1)
+    assert cuerpo["ids"][0] == ids[0]
+    assert cliente.get(f"/champions/{ids[0]}").json()["win_rate"] == 90.0
+
+    assert comprobar_dashboard()["champions"] == 3
+
+
+def test_borrado_por_filtro_convierte_los_valores(cliente, comprobar_dashboard):
+    cliente.post("/champions/bulk", json=[_campeon(1), _campeon(2, win_rate=60.0)])
+
+    for filtro in ({"win_rate": [1, 2]}, {"win_rate": "alto"}, {"win_rate": {"gte": 1}}):
+        r = cliente.post("/champions/bulk-delete", json={"filter": filtro})
+        assert r.status_code == 400, (filtro, r.text)
+
+    # "50" y 50 valen para una columna float
+    r = cliente.post("/champions/bulk-delete", json={"filter": {"win_rate": "50"}})
+    assert r.status_code == 200
+    assert r.json()["affected"] == 1
+    assert comprobar_dashboard()["champions"] == 1
+
+
+def test_lote_sin_columna_unica_en_pocas_sentencias(cliente, sentencias, comprobar_dashboard):
+    for i in range(4):
+        cliente.post("/teams/", json={"name": f"Team {i}", "region": "LCK"})
+
+    def lote(n):
+        jugadores = [{"nickname": f"p{n}-{k}", "role": "MID", "team_id": k % 5 + 1, "kda": 2.0} for k in range(n)]
+        partidas = [
+            {"stage": "Groups", "team_a_id": k % 4 + 1, "team_b_id": 1, "avg_duration_min": 30.0 + k % 7}
+            for k in range(n)
+        ]
+        respuestas = []
+        sql = sentencias(lambda: respuestas.extend(
+            [cliente.post("/players/bulk", json=jugadores), cliente.post("/matches/bulk", json=partidas)]
+        ))
+        r = respuestas[0].json()
+        assert r["created"] == n
+        # ids[i] es el del item i
+        assert cliente.get(f"/players/{r['ids'][-1]}").json()["nickname"] == f"p{n}-{n - 1}"
+        return len(sql)
+
+    # Un lote más grande solo añade INSERT multi-fila (uno por chunk), no sentencias por fila
+    assert lote(1200) - lote(10) <= 6
+    comprobar_dashboard()
+
+
+def test_borrado_por_lote_en_pocas_sentencias(cliente, sentencias, comprobar_dashboard):
+    for i in range(4):
+        cliente.post("/teams/", json={"name": f"Team {i}", "region": "LCK"})
+    partidas = [
+        {"stage": "Groups" if k % 3 else "Finals", "team_a_id": k % 4 + 1, "team_b_id": 2, "avg_duration_min": 30.0}
+        for k in range(1500)
+    ]
+    cliente.post("/matches/bulk", json=partidas)
+
+    respuestas = []
+    sql = sentencias(lambda: respuestas.append(cliente.post("/matches/bulk-delete", json={"filter": {"stage": "Groups"}})))
+    assert respuestas[0].json()["affected"] == 1000
+    assert len(sql) <= 12, sql
+    comprobar_dashboard()
+
+    sql = sentencias(lambda: respuestas.append(cliente.post("/matches/bulk-restore", json={"filter": {"stage": "Groups"}})))
+    assert respuestas[1].json()["affected"] == 1000
+    assert len(sql) <= 12, sql
+    assert comprobar_dashboard()["matches"] == 1500
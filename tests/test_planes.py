@@ -0,0 +1,172 @@
+"""
+Planes de las consultas de los listados (EXPLAIN QUERY PLAN, solo SQLite):
+ni recorridos de tabla sin índice ni ordenaciones en un B-tree temporal.
+Cada listado se prueba con orden ascendente y descendente, y en la primera
+página y en una página de cursor. También los filtros con orden, las partidas
+de un equipo, los campeones de las partidas, el dashboard y la búsqueda.
+"""
+import re
+
+import pytest
+
+from data.models import Champion, MatchSummary, Player, Team
+from operations.busqueda_db import fts_activo
+from utils.filtros import columnas_indexadas
+
+LISTADOS = {"/champions/": Champion, "/teams/": Team, "/matches/": MatchSummary, "/players/": Player}
+FILTROS = [
+    "/champions/filter/winrate/?min_winrate=50",
+    "/teams/region/LCK",
+    "/matches/winner/1",
+    "/players/role/MID",
+    "/players/team/1",
+    "/teams/1/matches",
+    "/champions/deleted",
+    "/teams/deleted",
+    "/matches/deleted",
+    "/players/deleted",
+]
+# Filtro y orden juntos: igualdad sobre la categoría de un índice (categoría, métrica)
+# o rango sobre la misma columna del orden
+FILTROS_CON_ORDEN = [
+    ("/players/", {"role": "MID", "sort": "-kda"}),
+    ("/players/", {"team_id": 1, "sort": "kda"}),
+    ("/players/", {"kda__gte": 1, "sort": "-kda"}),
+    ("/teams/", {"region": "LCK", "sort": "-wins"}),
+    ("/matches/", {"stage": "Groups", "sort": "-avg_duration_min"}),
+    ("/champions/", {"win_rate__gte": 45, "sort": "-win_rate"}),
+]
+# "SCAN player" a secas: la tabla entera; "SCAN player USING INDEX ..." recorre un índice
+SCAN_SIN_INDICE = re.compile(r"^SCAN (\w+)$")
+
+
+def _ordenes():
+    for ruta, model in LISTADOS.items():
+        for campo, columna in columnas_indexadas(model.__table__).items():
+            if not columna.nullable:
+                for sort in (campo, f"-{campo}"):
+                    yield pytest.param(ruta, sort, id=f"{ruta.strip('/')}-{sort}")
+
+
+@pytest.fixture
+def datos(cliente):
+    for i in range(12):
+        cliente.post("/teams/", json={"name": f"Team {i}", "region": "LCK" if i % 2 else "LPL", "wins": i, "losses": 3})
+        cliente.post("/champions/", json={"name": f"Campeón {i}", "slug": f"c-{i}", "win_rate": 40.0 + i})
+        cliente.post("/players/", json={"nickname": f"p{i}", "role": "MID", "team_id": i % 4 + 1, "kda": float(i % 5)})
+        cliente.post("/matches/", json={
+            "stage": "Groups", "team_a_id": i % 4 + 1, "team_b_id": 1, "winner_id": 1, "avg_duration_min": 30.0 + i,
+        })
+    for match_id in (1, 3, 4):
+        cliente.put(f"/matches/{match_id}/champions", json={"champion_ids": [3, 1, 5]})
+    for ruta in ("/champions/2", "/teams/12", "/matches/2", "/players/2"):
+        cliente.delete(ruta)
+    return cliente
+
+
+def _recorre_tabla(paso: str, sql: str) -> bool:
+    """
+    SCAN sin índice. La excepción es la primera página por id: la tabla es el
+    B-tree de la PK (rowid), así que recorrerla en orden con LIMIT ya es un índice.
+    """
+    scan = SCAN_SIN_INDICE.match(paso)
+    if scan is None:
+        return False
+    tabla = scan.group(1)
+    return not re.search(rf"ORDER BY {tabla}\.id( ASC| DESC)?\s+LIMIT", sql)
+
+
+def _comprobar(planes: dict) -> None:
+    assert planes, "la llamada no lanzó ningún SELECT"
+    for sql, plan in planes.items():
+        malos = [paso for paso in plan if _recorre_tabla(paso, sql) or "TEMP B-TREE" in paso]
+        assert not malos, f"{malos} en:\n{sql}\n{plan}"
+
+
+@pytest.mark.parametrize("ruta, sort", _ordenes())
+def test_listado_usa_indices(datos, planes, ruta, sort):
+    params = {"sort": sort, "limit": 3}
+    r = datos.get(ruta, params=params)
+    assert r.status_code == 200
+    _comprobar(planes(lambda: datos.get(ruta, params=params)))
+    cursor = r.headers["X-Next-Cursor"]
+    _comprobar(planes(lambda: datos.get(ruta, params=dict(params, cursor=cursor))))
+
+
+@pytest.mark.parametrize("ruta", FILTROS)
+def test_filtro_usa_indices(datos, planes, ruta):
+    assert datos.get(ruta).status_code == 200
+    _comprobar(planes(lambda: datos.get(ruta)))
+
+
+def _comprobar_paginas(cliente, planes, ruta: str, params: dict) -> None:
+    """Primera página y página de cursor."""
+    r = cliente.get(ruta, params=params)
+    assert r.status_code == 200
+    _comprobar(planes(lambda: cliente.get(ruta, params=params)))
+    cursor = r.headers["X-Next-Cursor"]
+    _comprobar(planes(lambda: cliente.get(ruta, params=dict(params, cursor=cursor))))
+
+
+@pytest.mark.parametrize("ruta, params", FILTROS_CON_ORDEN, ids=lambda v: v if isinstance(v, str) else ",".join(v))
+def test_filtro_con_orden_usa_indices(datos, planes, ruta, params):
+    _comprobar_paginas(datos, planes, ruta, dict(params, limit=2))
+
+
+@pytest.mark.parametrize("params", [{}, {"stage": "Groups"}], ids=["todas", "stage"])
+def test_partidas_de_equipo_usan_indices(datos, planes, params):
+    """IN sobre el UNION ALL de los dos lados: cada lado sale de su índice (equipo, stage)."""
+    _comprobar_paginas(datos, planes, "/teams/1/matches", dict(params, limit=2))
+
+
+@pytest.mark.parametrize("ruta, params", [
+    ("/matches/1/champions", {}),
+    ("/matches/", {"expand": "champions", "limit": 3}),
+], ids=["una", "expand"])
+def test_campeones_de_partidas_usan_indices(datos, planes, ruta, params):
+    consultas = planes(lambda: datos.get(ruta, params=params))
+    assert any("matchchampionlink" in sql for sql in consultas)
+    _comprobar(consultas)
+
+
+def test_partidas_del_dashboard_en_orden_de_id(datos, planes):
+    consultas = planes(lambda: datos.get("/api/dashboard", params={"sections": "matches"}))
+    assert any("ORDER BY matchsummary.id" in sql for sql in consultas)
+    _comprobar(consultas)
+    ids = [m["id"] for m in datos.get("/api/dashboard", params={"sections": "matches"}).json()["matches"]]
+    assert ids == sorted(ids)
+
+
+def test_busqueda_usa_fts(datos, planes):
+    """
+    Cada tabla se lee por su índice FTS (MATCH), nunca la tabla base. El orden por
+    relevancia (bm25) no sale de ningún índice: cada rama ordena solo sus coincidencias y se mezclan.
+    """
+    if not fts_activo():
+        pytest.skip("SQLite sin FTS5")
+    consultas = planes(lambda: datos.get("/search", params={"q": "Team 1"}))
+    assert consultas
+    for sql, plan in consultas.items():
+        lecturas = [paso for paso in plan if paso.startswith(("SCAN", "SEARCH"))]
+        assert lecturas and all(re.match(r"SCAN fts_\w+ VIRTUAL TABLE INDEX \d+:M", p) for p in lecturas), plan
+        assert all(p == "USE TEMP B-TREE FOR ORDER BY" for p in plan if "TEMP B-TREE" in p), plan
+
+
+def test_busqueda_corta_solo_lee_filas_activas(datos, planes):
+    """
+    Un término más corto que un trigrama no puede usar FTS: cada tabla se recorre por un
+    índice parcial (solo filas activas, nunca la tabla entera) y se ordenan las coincidencias.
+    """
+    consultas = planes(lambda: datos.get("/search", params={"q": "T1"}))
+    assert consultas
+    for sql, plan in consultas.items():
+        for tabla in LISTADOS.values():
+            lecturas = [p for p in plan if re.match(rf"(SCAN|SEARCH) {tabla.__tablename__}\b", p)]
+            assert lecturas and all(f"USING INDEX ix_{tabla.__tablename__}_activos" in p for p in lecturas), plan
+
+
+def test_sugerencias_no_consultan_la_bd(datos, planes):
+    """/suggest responde desde el índice en memoria."""
+    r = datos.get("/suggest", params={"prefix": "Te"})
+    assert r.status_code == 200 and r.json()
+    assert planes(lambda: datos.get("/suggest", params={"prefix": "Te"})) == {}
@@ -0,0 +1,50 @@
+"""Índices de /suggest: se mantienen con escrituras concurrentes sin agotar el pool."""
+from concurrent.futures import ThreadPoolExecutor
+
+HILOS = 16
+EQUIPOS = 120
+
+
+def test_escrituras_concurrentes_actualizan_sugerencias(cliente, modo_escritura):
+    import main
+
+    def crear(n: int) -> int:
+        return cliente.post("/teams/", json={"name": f"Zeta {n:03d}", "region": "LCK"}).status_code
+
+    with ThreadPoolExecutor(max_workers=HILOS) as pool:
+        estados = list(pool.map(crear, range(EQUIPOS)))
+    assert estados == [200] * EQUIPOS
+
+    main.actualizador_sugerencias.esperar()
+    r = cliente.get("/suggest", params={"prefix": "zeta 1", "entity": "team", "limit": 50})
+    assert r.status_code == 200
+    assert sorted(s["name"] for s in r.json()) == [f"Zeta {n}" for n in range(100, EQUIPOS)]
+
+
+def test_publicar_no_abre_conexiones(cliente):
+    """Los suscriptores corren dentro del after_commit: no deben pedir conexiones al pool."""
+    import threading
+
+    from sqlalchemy import event
+
+    import main
+    from utils.cambios import Cambio, publicar
+    from utils.db import engine
+
+    assert cliente.post("/teams/", json={"name": "Omega", "region": "LEC"}).status_code == 200
+    id_ = cliente.get("/teams/", params={"limit": 1}).json()[0]["id"]
+    main.actualizador_sugerencias.esperar()
+
+    hilos = []
+
+    def al_pedir(dbapi_connection, connection_record, connection_proxy):
+        hilos.append(threading.get_ident())
+
+    event.listen(engine, "checkout", al_pedir)
+    try:
+        publicar([Cambio("team", id_, "update")])
+        assert threading.get_ident() not in hilos
+    finally:
+        event.remove(engine, "checkout", al_pedir)
+    main.actualizador_sugerencias.esperar()
+    assert [s["id"] for s in cliente.get("/suggest", params={"prefix": "omega"}).json()] == [id_]
@@ -0,0 +1,90 @@
+"""
+Difusión de cambios a clientes SSE (/events).
+
+Los commits ocurren en hilos del threadpool; publicar() pasa cada mensaje al
+event loop y desde ahí se reparte a una cola acotada por cliente. Un cliente
+que no consume a tiempo (cola llena) se desconecta en vez de frenar al resto.
+"""
+import asyncio
+import json
+import threading
+from typing import List, Optional, Set
+
+from utils.cambios import Cambio, version_actual
+
+MAX_COLA_CLIENTE = 100
+
+
+class ClienteEventos:
+    def __init__(self, max_cola: int):
+        self.cola: asyncio.Queue = asyncio.Queue(maxsize=max_cola)
+        self.expulsado = False
+
+
+class Broadcaster:
+    def __init__(self, max_cola: int = MAX_COLA_CLIENTE):
+        self.max_cola = max_cola
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clientes: Set[ClienteEventos] = set()
+        self._lock = threading.Lock()
+
+    def iniciar(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    @property
+    def clientes(self) -> int:
+        return len(self._clientes)
+
+    def conectar(self) -> ClienteEventos:
+        cliente = ClienteEventos(self.max_cola)
+        with self._lock:
+            self._clientes.add(cliente)
+        return cliente
+
+    def desconectar(self, cliente: ClienteEventos) -> None:
+        with self._lock:
+            self._clientes.discard(cliente)
+
+    def cerrar(self) -> None:
+        """Termina todos los streams (apagado del servidor)."""
+        with self._lock:
+            clientes = list(self._clientes)
+            self._clientes.clear()
+        for cliente in clientes:
+            self._expulsar(cliente)
+
+    def publicar(self, mensaje: str) -> None:
+        """Seguro desde cualquier hilo."""
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self._clientes:
+            return
+        loop.call_soon_threadsafe(self._repartir, mensaje)
+
+    def _repartir(self, mensaje: str) -> None:
+        with self._lock:
+            clientes = list(self._clientes)
+        for cliente in clientes:
+            try:
+                cliente.cola.put_nowait(mensaje)
+            except asyncio.QueueFull:
+                # Consumidor lento: fuera, el navegador reconecta y refresca por ETag
+                self.desconectar(cliente)
+                self._expulsar(cliente)
+
+    @staticmethod
+    def _expulsar(cliente: ClienteEventos) -> None:
+        """Vacía la cola del cliente y le deja el fin del stream (None)."""
+        cliente.expulsado = True
+        while not cliente.cola.empty():
+            cliente.cola.get_nowait()
+        cliente.cola.put_nowait(None)
+
+
+broadcaster = Broadcaster()
+
+
+def publicar_cambios(cambios: List[Cambio]) -> None:
+    """Suscriptor de utils.cambios: un mensaje pequeño por registro modificado."""
+    version = version_actual()
+    for c in cambios:
+        broadcaster.publicar(json.dumps({"entity": c.entidad, "id": c.id, "op": c.op, "version": version}))
@@ -0,0 +1,130 @@
+"""Cachés en memoria del proceso."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Vuelo:
+    """Un cálculo en curso; los que llegan tarde esperan su resultado."""
+
+    def __init__(self):
+        self.listo = threading.Event()
+        self.valor: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class CacheVersionada:
+    """
+    Guarda un único valor asociado a una versión de datos.
+    - Si la versión pedida coincide con la guardada, es una búsqueda en dict.
+    - Single-flight: varias peticiones concurrentes con la misma versión
+      calculan el valor una sola vez; el resto espera y reutiliza el resultado.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._valores: Dict[int, Any] = {}
+        self._vuelos: Dict[int, _Vuelo] = {}
+
+    def obtener(self, version: int, generar: Callable[[], Any]) -> Any:
+        with self._lock:
+            if version in self._valores:
+                return self._valores[version]
+            vuelo = self._vuelos.get(version)
+            lider = vuelo is None
+            if lider:
+                vuelo = self._vuelos[version] = _Vuelo()
+
+        if not lider:
+            vuelo.listo.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.valor
+
+        try:
+            vuelo.valor = generar()
+            with self._lock:
+                # Solo se conserva la versión más reciente
+                if all(version >= v for v in self._valores):
+                    self._valores = {version: vuelo.valor}
+            return vuelo.valor
+        except BaseException as exc:
+            vuelo.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._vuelos.pop(version, None)
+            vuelo.listo.set()
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._valores.clear()
+
+
+class CacheLRU:
+    """
+    Caché acotada por número de entradas (LRU) y por antigüedad (TTL).
+    - invalidar(clave) descarta una entrada; un cálculo que empezó antes de la
+      invalidación no vuelve a guardar su valor (ya podría estar desactualizado).
+    - guardar=False sirve un acierto pero no guarda lo calculado en un fallo.
+    - Contadores de aciertos, fallos, expulsiones y caducadas en estadisticas().
+    """
+
+    def __init__(self, max_entradas: int = 10_000, ttl: float = 60.0):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._valores: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._generaciones: Dict[Hashable, int] = {}
+        self._generacion_global = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self.caducadas = 0
+
+    def obtener(self, clave: Hashable, generar: Callable[[], Any], guardar: bool = True) -> Any:
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._valores.get(clave)
+            if entrada is not None:
+                if entrada[0] > ahora:
+                    self._valores.move_to_end(clave)
+                    self.aciertos += 1
+                    return entrada[1]
+                del self._valores[clave]
+                self.caducadas += 1
+            self.fallos += 1
+            generacion = (self._generacion_global, self._generaciones.get(clave, 0))
+
+        valor = generar()
+
+        with self._lock:
+            if guardar and generacion == (self._generacion_global, self._generaciones.get(clave, 0)):
+                self._valores[clave] = (time.monotonic() + self.ttl, valor)
+                self._valores.move_to_end(clave)
+                while len(self._valores) > self.max_entradas:
+                    self._valores.popitem(last=False)
+                    self.expulsiones += 1
+        return valor
+
+    def invalidar(self, clave: Hashable) -> None:
+        with self._lock:
+            self._valores.pop(clave, None)
+            self._generaciones[clave] = self._generaciones.get(clave, 0) + 1
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._valores.clear()
+            self._generaciones.clear()
+            self._generacion_global += 1
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._valores),
+                "hits": self.aciertos,
+                "misses": self.fallos,
+                "evictions": self.expulsiones,
+                "expired": self.caducadas,
+            }
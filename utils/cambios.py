@@ -0,0 +1,100 @@
+"""
+Registro de cambios confirmados.
+
+Las operaciones de escritura anotan en la sesión qué registro cambiaron
+(registrar_cambio). Cuando la transacción hace commit se incrementa la versión
+de datos y se avisa a los suscriptores; si hace rollback los cambios se descartan.
+
+Con diferir_publicacion() el commit de la sesión solo libera un SAVEPOINT
+(escritor único, utils.escritor): los cambios se acumulan y se publican
+con publicar() tras el COMMIT real del lote.
+"""
+import hashlib
+import logging
+import threading
+import uuid
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class Cambio(NamedTuple):
+    entidad: str        # nombre de la tabla: champion, team, matchsummary, player
+    id: Optional[int]
+    op: str             # create, update, delete, restore
+
+
+# Las versiones empiezan en 0 en cada arranque: la época distingue procesos
+EPOCA = uuid.uuid4().hex[:8]
+
+_lock = threading.Lock()
+_version = 0
+_versiones_tabla: Dict[str, int] = {}
+_suscriptores: List[Callable[[List[Cambio]], None]] = []
+
+
+def registrar_cambio(session: Session, entidad: str, id: Optional[int], op: str) -> None:
+    """Anota un cambio pendiente; solo se publica si la transacción hace commit."""
+    session.info.setdefault("cambios", []).append(Cambio(entidad, id, op))
+
+
+def diferir_publicacion(session: Session, destino: List[Cambio]) -> None:
+    """Los commits de esta sesión añaden sus cambios a destino en lugar de publicarlos."""
+    session.info["diferidos"] = destino
+
+
+def suscribir(callback: Callable[[List[Cambio]], None]) -> None:
+    """El callback recibe la lista de cambios de cada commit, en el hilo que hizo commit."""
+    if callback not in _suscriptores:
+        _suscriptores.append(callback)
+
+
+def version_actual() -> int:
+    """Versión global de los datos: sube en cada commit con cambios."""
+    return _version
+
+
+def version_tabla(entidad: str) -> int:
+    return _versiones_tabla.get(entidad, 0)
+
+
+def etag_tablas(entidades: Iterable[str], extra: str = "") -> str:
+    """ETag fuerte derivado de las versiones de las tablas indicadas."""
+    partes = [EPOCA, extra] + [f"{e}:{version_tabla(e)}" for e in sorted(entidades)]
+    return '"' + hashlib.sha1("|".join(partes).encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def publicar(cambios: List[Cambio]) -> None:
+    """Sube las versiones y avisa a los suscriptores, en el hilo que llama."""
+    global _version
+    if not cambios:
+        return
+    with _lock:
+        _version += 1
+        for entidad in {c.entidad for c in cambios}:
+            _versiones_tabla[entidad] = _versiones_tabla.get(entidad, 0) + 1
+    for callback in list(_suscriptores):
+        try:
+            callback(cambios)
+        except Exception:  # un suscriptor roto no debe romper la escritura ya confirmada
+            logger.exception("Error notificando cambios a %r", callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar(session: Session) -> None:
+    cambios = session.info.pop("cambios", None)
+    if not cambios:
+        return
+    diferidos = session.info.get("diferidos")
+    if diferidos is not None:
+        diferidos.extend(cambios)
+        return
+    publicar(cambios)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar(session: Session) -> None:
+    session.info.pop("cambios", None)
@@ -1,6 +1,11 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
 import os
+import time
 
 load_dotenv()
 
@@ -9,11 +14,250 @@ if not DATABASE_URL:
     raise ValueError("DATABASE_URL no está definido")
 
 print("DEBUG DATABASE_URL =>", DATABASE_URL)
-engine = create_engine(DATABASE_URL, echo=True)
+
+# PERFIL POSTGRES (DATABASE_URL postgresql://...)
+# - Pool dimensionado por variables: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+#   DB_POOL_RECYCLE (segundos) y DB_POOL_PRE_PING (descarta conexiones caídas al
+#   sacarlas del pool, p. ej. tras un reinicio o un failover).
+# - Sentencias preparadas en el servidor con asyncpg (caché por conexión,
+#   DB_SENTENCIAS_PREPARADAS) y con psycopg 3 (a partir de la 2ª ejecución).
+#   psycopg2 no las soporta: ahí queda solo la caché de SQL compilado.
+# En todos los motores la caché de SQL compilado de SQLAlchemy se amplía
+# (DB_CACHE_SENTENCIAS): cada combinación de filtros/orden/campos es una entrada.
+
+
+def _entero(nombre: str, defecto: int) -> int:
+    return int(os.getenv(nombre, defecto))
+
+
+def _booleano(nombre: str, defecto: str = "0") -> bool:
+    return os.getenv(nombre, defecto).lower() in ("1", "true", "yes")
+
+
+def es_postgres(url: str) -> bool:
+    return url.split("://", 1)[0].split("+")[0] == "postgresql"
+
+
+def opciones_engine(url: str) -> dict:
+    """Argumentos de create_engine / create_async_engine según el motor y driver de la URL."""
+    opciones = {"query_cache_size": _entero("DB_CACHE_SENTENCIAS", 1200)}
+    if not es_postgres(url):
+        return opciones
+    opciones.update(
+        pool_size=_entero("DB_POOL_SIZE", 10),
+        max_overflow=_entero("DB_MAX_OVERFLOW", 20),
+        pool_timeout=_entero("DB_POOL_TIMEOUT", 30),
+        pool_recycle=_entero("DB_POOL_RECYCLE", 1800),
+        pool_pre_ping=_booleano("DB_POOL_PRE_PING", "1"),
+    )
+    driver = url.split("://", 1)[0]
+    if driver.endswith("+asyncpg"):
+        opciones["connect_args"] = {"prepared_statement_cache_size": _entero("DB_SENTENCIAS_PREPARADAS", 500)}
+    elif driver.endswith("+psycopg"):
+        opciones["connect_args"] = {"prepare_threshold": 2}
+    return opciones
+
+
+# DB_ECHO=1 registra cada sentencia SQL (solo para depurar)
+engine = create_engine(DATABASE_URL, echo=_booleano("DB_ECHO"), **opciones_engine(DATABASE_URL))
+
+# PERFIL DE ALMACENAMIENTO SQLITE (SQLITE_PERFIL)
+# Pragmas aplicados a cada conexión nueva del pool:
+# - WAL: los lectores no se bloquean con el escritor, y el commit solo añade al log.
+# - synchronous=NORMAL: en WAL no se pierde consistencia; solo puede perderse el
+#   último commit si se cae el sistema operativo (no el proceso).
+# - busy_timeout: un escritor espera al otro en lugar de fallar con "database is locked".
+# Cada pragma se puede cambiar con SQLITE_<PRAGMA> (ej. SQLITE_MMAP_SIZE=0).
+
+PERFILES_SQLITE = {
+    "produccion": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,   # bytes
+        "cache_size": -64 * 1024,         # negativo: KiB (64 MiB por conexión)
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,             # ms
+    },
+    # Valores por defecto de SQLite
+    "ninguno": {},
+}
+
+SQLITE_PERFIL = os.getenv("SQLITE_PERFIL", "produccion")
+if SQLITE_PERFIL not in PERFILES_SQLITE:
+    raise ValueError(f"SQLITE_PERFIL no válido: {SQLITE_PERFIL} (opciones: {', '.join(PERFILES_SQLITE)})")
+
+
+def pragmas_sqlite(perfil: str = SQLITE_PERFIL) -> dict:
+    """Pragmas del perfil con los cambios de las variables SQLITE_<PRAGMA>."""
+    pragmas = dict(PERFILES_SQLITE[perfil])
+    for nombre in PERFILES_SQLITE["produccion"]:
+        valor = os.getenv(f"SQLITE_{nombre.upper()}")
+        if valor is not None:
+            pragmas[nombre] = valor
+    return pragmas
+
+
+def configurar_sqlite(motor: Engine, pragmas: dict) -> None:
+    """Ejecuta los pragmas en cada conexión que abra el engine (no hace nada en otros motores)."""
+    if motor.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(motor, "connect")
+    def _aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nombre, valor in pragmas.items():
+                cursor.execute(f"PRAGMA {nombre}={valor}")
+        finally:
+            cursor.close()
+
+
+configurar_sqlite(engine, pragmas_sqlite())
+
+# ESCRITURAS (write_engine)
+# pysqlite abre la transacción en el primer INSERT/UPDATE/DELETE: lo que una escritura
+# lee antes (la fila que va a modificar, team_stats) puede quedar viejo si otra confirma
+# entre medias. En SQLite write_engine empieza cada transacción con BEGIN IMMEDIATE: las
+# escrituras van de una en una y leen datos al día. En otros motores es engine (bloqueos
+# de fila con SELECT ... FOR UPDATE).
+
+
+def transacciones_inmediatas(motor: Engine) -> None:
+    """Cada transacción del engine SQLite empieza con BEGIN IMMEDIATE (toma el lock de escritura al empezar)."""
+    @event.listens_for(motor, "connect")
+    def _sin_transacciones_del_driver(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(motor, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+write_engine = engine
+if engine.dialect.name == "sqlite":
+    write_engine = create_engine(DATABASE_URL, echo=engine.echo, **opciones_engine(DATABASE_URL))
+    configurar_sqlite(write_engine, pragmas_sqlite())
+    transacciones_inmediatas(write_engine)
+
+# RÉPLICA DE LECTURA (DATABASE_READ_URL)
+# Las rutas GET leen de read_engine; las escrituras, el arranque y los suscriptores
+# de cambios usan siempre engine (primaria). Sin DATABASE_READ_URL son el mismo engine.
+# La réplica va por detrás de la primaria: durante LECTURA_PROPIA_SEGUNDOS tras una
+# escritura, el cliente que la hizo (cookie LECTURA_PROPIA_COOKIE) lee de la primaria.
+
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or None
+HAY_REPLICA = DATABASE_READ_URL is not None and DATABASE_READ_URL != DATABASE_URL
+
+LECTURA_PROPIA_COOKIE = "lectura_primaria"
+LECTURA_PROPIA_SEGUNDOS = float(os.getenv("DB_LECTURA_PROPIA_SEGUNDOS", "5"))
+
+read_engine = engine
+if HAY_REPLICA:
+    print("DEBUG DATABASE_READ_URL =>", make_url(DATABASE_READ_URL).render_as_string(hide_password=True))
+    read_engine = create_engine(DATABASE_READ_URL, echo=engine.echo, **opciones_engine(DATABASE_READ_URL))
+    configurar_sqlite(read_engine, pragmas_sqlite())
+
+_ultima_escritura = 0.0
+
+
+def anotar_escritura(cambios=None) -> None:
+    """Suscriptor de utils.cambios: hora del último commit en la primaria."""
+    global _ultima_escritura
+    _ultima_escritura = time.monotonic()
+
+
+def replica_al_dia() -> bool:
+    """False mientras la réplica puede no tener aún el último commit (dentro de la ventana)."""
+    return not HAY_REPLICA or time.monotonic() - _ultima_escritura > LECTURA_PROPIA_SEGUNDOS
+
+
+def lee_de_replica(session) -> bool:
+    return session.info.get("replica", False)
+
+
+def lectura_propia(request: Request) -> bool:
+    """El cliente escribió hace menos de LECTURA_PROPIA_SEGUNDOS: debe leer de la primaria."""
+    if not HAY_REPLICA:
+        return False
+    try:
+        return float(request.cookies.get(LECTURA_PROPIA_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+# MODO ASÍNCRONO (DB_ASYNC=1)
+# Las rutas de lectura usan un AsyncEngine (aiosqlite / asyncpg) sobre la BD de
+# lectura: mientras esperan a la BD no ocupan un hilo del threadpool. El engine
+# síncrono se mantiene para el arranque, las escrituras y los suscriptores de cambios.
+
+DB_ASYNC = _booleano("DB_ASYNC")
+
+# Driver asíncrono por cada driver síncrono
+DRIVERS_ASYNC = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+psycopg",
+}
+
+
+def url_async(url: str) -> str:
+    esquema, resto = url.split("://", 1)
+    if esquema not in DRIVERS_ASYNC:
+        raise ValueError(f"DB_ASYNC no soporta DATABASE_URL con '{esquema}'")
+    return f"{DRIVERS_ASYNC[esquema]}://{resto}"
+
+
+async_engine = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    _url_lectura = url_async(DATABASE_READ_URL if HAY_REPLICA else DATABASE_URL)
+    async_engine = create_async_engine(_url_lectura, echo=engine.echo, **opciones_engine(_url_lectura))
+    configurar_sqlite(async_engine.sync_engine, pragmas_sqlite())
+
 
 def crear_db():
     SQLModel.metadata.create_all(engine)
+    # create_all no añade índices nuevos a tablas que ya existían
+    for tabla in SQLModel.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            indice.create(engine, checkfirst=True)
 
 def get_session():
+    """Sesión sobre la primaria: escrituras y lecturas que deben ver el último commit."""
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+def get_read_session(request: Request):
+    """Sesión sobre la réplica, o sobre la primaria dentro de la ventana de lectura propia."""
+    replica = HAY_REPLICA and not lectura_propia(request)
+    with Session(read_engine if replica else engine, info={"replica": replica}) as session:
+        yield session
+
+
+async def get_async_session(request: Request):
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    if lectura_propia(request):
+        # Sin AsyncEngine sobre la primaria: Session síncrona, ejecutar() la lleva al threadpool
+        with Session(engine) as session:
+            yield session
+        return
+    async with AsyncSession(async_engine, info={"replica": HAY_REPLICA}) as session:
+        yield session
+
+
+# Dependencia de las rutas de lectura: AsyncSession con DB_ASYNC, Session si no
+get_db = get_async_session if DB_ASYNC else get_read_session
+
+
+async def ejecutar(session, funcion, *args, **kwargs):
+    """
+    Llama a una función de operations (síncrona, session como primer argumento) sin bloquear el event loop.
+    - AsyncSession: run_sync, las consultas esperan en el driver asíncrono.
+    - Session: en el threadpool, como una ruta def.
+    """
+    if isinstance(session, Session):
+        return await run_in_threadpool(funcion, session, *args, **kwargs)
+    return await session.run_sync(funcion, *args, **kwargs)
@@ -0,0 +1,189 @@
+"""
+Escritor único para SQLite.
+
+SQLite admite un solo escritor a la vez, también en WAL: las escrituras
+concurrentes del threadpool compiten por el lock y esperan (busy_timeout) o
+fallan con "database is locked". Aquí las escrituras se encolan en una cola
+acotada y las ejecuta un hilo dedicado en lotes (group commit):
+
+- Todo lo que se acumuló mientras se confirmaba el lote anterior forma el
+  siguiente (hasta MAX_LOTE), en una transacción BEGIN IMMEDIATE con un solo COMMIT.
+- Cada operación va en su propio SAVEPOINT: su session.commit() libera el
+  savepoint y su rollback (o una excepción) solo deshace lo suyo.
+- Quien escribe recibe un Future con el resultado o la excepción de su operación.
+- Los cambios (utils.cambios) se publican después del COMMIT real del lote.
+
+Las lecturas siguen usando el pool del engine. En otros motores, o con
+DB_ESCRITOR_UNICO=0, cada escritura usa su propia sesión de utils.db.write_engine
+en el threadpool.
+"""
+import asyncio
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, NamedTuple, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from utils.cambios import Cambio, diferir_publicacion, publicar
+from utils.db import (
+    DATABASE_URL, configurar_sqlite, engine, opciones_engine, pragmas_sqlite, transacciones_inmediatas, write_engine,
+)
+
+logger = logging.getLogger(__name__)
+
+# Escrituras en espera; con la cola llena se responde 503
+MAX_COLA = 10_000
+# Operaciones por transacción
+MAX_LOTE = 256
+
+
+class _Tarea(NamedTuple):
+    funcion: Callable[..., Any]
+    args: tuple
+    kwargs: dict
+    futuro: Future
+
+
+def crear_motor_escritor(url: str, pragmas: Optional[dict] = None) -> Engine:
+    """
+    Engine de una sola conexión para el hilo escritor.
+    - pysqlite abre sus transacciones por su cuenta y un SAVEPOINT fuera de ellas
+      se confirmaría al liberarlo: se desactiva y cada transacción empieza con
+      BEGIN IMMEDIATE (toma el lock de escritura al empezar, sin esperas a mitad).
+    """
+    motor = create_engine(url, echo=engine.echo, **dict(opciones_engine(url), pool_size=1, max_overflow=0))
+    configurar_sqlite(motor, pragmas_sqlite() if pragmas is None else pragmas)
+    if motor.dialect.name == "sqlite":
+        transacciones_inmediatas(motor)
+    return motor
+
+
+class EscritorUnico:
+    def __init__(self, motor: Engine, max_cola: int = MAX_COLA, max_lote: int = MAX_LOTE):
+        self.motor = motor
+        self.max_lote = max_lote
+        self._cola: "queue.Queue[Optional[_Tarea]]" = queue.Queue(maxsize=max_cola)
+        self._hilo: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.lotes = 0
+        self.operaciones = 0
+
+    def iniciar(self) -> None:
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._bucle, name="escritor-unico", daemon=True)
+                self._hilo.start()
+
+    def detener(self, timeout: float = 30.0) -> None:
+        """Termina las escrituras ya encoladas y para el hilo."""
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        if hilo is not None and hilo.is_alive():
+            self._cola.put(None)
+            hilo.join(timeout)
+
+    def enviar(self, funcion: Callable[..., Any], *args, **kwargs) -> Future:
+        """Encola funcion(session, *args, **kwargs); 503 si la cola está llena."""
+        if self._hilo is None:
+            self.iniciar()
+        futuro: Future = Future()
+        try:
+            self._cola.put_nowait(_Tarea(funcion, args, kwargs, futuro))
+        except queue.Full:
+            raise HTTPException(
+                status_code=503, detail="Demasiadas escrituras pendientes", headers={"Retry-After": "1"}
+            )
+        return futuro
+
+    def estadisticas(self) -> dict:
+        return {
+            "pending": self._cola.qsize(),
+            "batches": self.lotes,
+            "operations": self.operaciones,
+        }
+
+    def _bucle(self) -> None:
+        while True:
+            tarea = self._cola.get()
+            if tarea is None:
+                return
+            lote = [tarea]
+            fin = False
+            while len(lote) < self.max_lote:
+                try:
+                    tarea = self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                if tarea is None:
+                    fin = True
+                    break
+                lote.append(tarea)
+            self._ejecutar_lote(lote)
+            if fin:
+                return
+
+    def _ejecutar_lote(self, lote: List[_Tarea]) -> None:
+        # Las canceladas (cliente que se fue antes de empezar) no se ejecutan
+        lote = [t for t in lote if t.futuro.set_running_or_notify_cancel()]
+        if not lote:
+            return
+        cambios: List[Cambio] = []
+        resultados = []
+        try:
+            with self.motor.connect() as conn, conn.begin():
+                for t in lote:
+                    with Session(bind=conn, join_transaction_mode="create_savepoint") as session:
+                        diferir_publicacion(session, cambios)
+                        try:
+                            resultados.append((t.funcion(session, *t.args, **t.kwargs), None))
+                        except Exception as exc:
+                            resultados.append((None, exc))
+        except Exception as exc:
+            logger.exception("Error al confirmar un lote de %d escrituras", len(lote))
+            for t in lote:
+                t.futuro.set_exception(
+                    HTTPException(status_code=500, detail=f"Error al confirmar la escritura. Error: {exc}")
+                )
+            return
+
+        self.lotes += 1
+        self.operaciones += len(lote)
+        publicar(cambios)
+        for t, (resultado, exc) in zip(lote, resultados):
+            if exc is not None:
+                t.futuro.set_exception(exc)
+            else:
+                t.futuro.set_result(resultado)
+
+
+def _escritor_activo() -> bool:
+    valor = os.getenv("DB_ESCRITOR_UNICO", "auto").lower()
+    if valor == "auto":
+        return engine.dialect.name == "sqlite"
+    return valor in ("1", "true", "yes")
+
+
+escritor: Optional[EscritorUnico] = EscritorUnico(crear_motor_escritor(DATABASE_URL)) if _escritor_activo() else None
+
+
+def _en_sesion_propia(funcion: Callable[..., Any], *args, **kwargs) -> Any:
+    with Session(write_engine) as session:
+        return funcion(session, *args, **kwargs)
+
+
+async def escribir(funcion: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Ejecuta una escritura de operations (session como primer argumento) y devuelve su resultado.
+    - Con escritor único: por la cola, sin ocupar un hilo del threadpool mientras espera.
+    - Sin él: en el threadpool con una sesión propia, como una ruta def.
+    """
+    if escritor is None:
+        return await run_in_threadpool(_en_sesion_propia, funcion, *args, **kwargs)
+    return await asyncio.wrap_future(escritor.enviar(funcion, *args, **kwargs))
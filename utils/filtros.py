@@ -0,0 +1,164 @@
+"""
+Filtros y orden de los listados: ?win_rate__gte=0.5&pick_rate__gte=0.3&sort=-kda
+
+- Solo se admiten columnas que encabezan algún índice de la tabla (o la PK),
+  así ningún predicado ni orden obliga a recorrer la tabla entera.
+- Los índices parciales (is_deleted = 0) no sirven con include_deleted: en ese
+  caso solo quedan las columnas con índice completo.
+- Todo se compila en una sola sentencia (Repositorio.listar), que se reutiliza
+  para cada combinación de predicados y orden.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from sqlalchemy import Column, Table
+from sqlmodel import SQLModel
+
+OPERADORES = ("eq", "gt", "gte", "lt", "lte", "in")
+# Parámetros de los listados que no son filtros
+RESERVADOS = {"skip", "limit", "cursor", "include_deleted", "fields", "sort", "expand"}
+MAX_VALORES_IN = 100
+
+
+class Filtros(NamedTuple):
+    predicados: Tuple[Tuple[str, str], ...] = ()   # (campo, op): forma de la sentencia
+    valores: Tuple[Any, ...] = ()                   # un valor (o lista para "in") por predicado
+    orden: Tuple[Tuple[str, bool], ...] = (("id", False),)   # (campo, descendente); siempre incluye id
+
+    @property
+    def forma(self) -> Tuple:
+        """Clave de la sentencia compilada: no depende de los valores."""
+        return self.predicados, self.orden
+
+    @property
+    def columnas_orden(self) -> Tuple[str, ...]:
+        """Columnas que forman la posición del cursor."""
+        return tuple(campo for campo, _ in self.orden)
+
+
+SIN_FILTROS = Filtros()
+
+
+def _es_parcial(indice) -> bool:
+    return any(opciones.get("where") is not None for opciones in indice.dialect_options.values())
+
+
+@lru_cache(maxsize=None)
+def columnas_indexadas(tabla: Table, solo_completos: bool = False) -> Dict[str, Column]:
+    """Columnas que encabezan un índice (las de los índices parciales solo si solo_completos es False)."""
+    columnas = {c.name: c for c in tabla.primary_key.columns}
+    for indice in tabla.indexes:
+        if solo_completos and _es_parcial(indice):
+            continue
+        primera = next(iter(indice.columns))
+        columnas[primera.name] = primera
+    return columnas
+
+
+def descripcion_filtros(model: Type[SQLModel]) -> str:
+    """Texto para la documentación de cada listado."""
+    tabla = model.__table__
+    filtrables = ", ".join(columnas_indexadas(tabla))
+    ordenables = ", ".join(n for n, c in columnas_indexadas(tabla).items() if not c.nullable)
+    return (
+        f"Filtros: ?campo=valor o ?campo__op=valor con op en {', '.join(OPERADORES)} "
+        f"('in' con valores separados por comas). Campos: {filtrables}. "
+        f"Orden: sort=campo,-campo con {ordenables}."
+    )
+
+
+def _convertir(columna: Column, texto: str) -> Any:
+    try:
+        tipo = columna.type.python_type
+    except NotImplementedError:  # AutoString de SQLModel
+        tipo = str
+    if tipo is bool:
+        if texto.lower() not in ("true", "false", "1", "0"):
+            raise ValueError(texto)
+        return texto.lower() in ("true", "1")
+    return tipo(texto)
+
+
+def convertir_valor(columna: Column, valor: Any) -> Any:
+    """Valor de un filtro JSON (lotes) al tipo de la columna; ValueError si no es un escalar de ese tipo."""
+    if valor is None:
+        return None
+    if isinstance(valor, (list, dict)):
+        raise ValueError(valor)
+    return _convertir(columna, str(valor))
+
+
+def leer_filtros(
+    model: Type[SQLModel],
+    params: Iterable[Tuple[str, str]],
+    sort: Optional[str] = None,
+    include_deleted: bool = False,
+) -> Filtros:
+    """
+    Valida los parámetros de la query (request.query_params.multi_items()) contra las columnas indexadas.
+    - Se ignoran los parámetros reservados y los que no parecen filtros (ni campo del modelo ni '__').
+    - 400 si el campo no tiene índice, el operador no existe o el valor no es del tipo de la columna.
+    """
+    tabla = model.__table__
+    permitidas = columnas_indexadas(tabla, solo_completos=include_deleted)
+
+    predicados = []
+    for clave, texto in params:
+        if clave in RESERVADOS:
+            continue
+        campo, _, op = clave.partition("__")
+        if not op and campo not in tabla.c:
+            continue
+        op = op or "eq"
+        if campo not in permitidas:
+            raise HTTPException(
+                status_code=400,
+                detail=f"No se puede filtrar por '{campo}'. Campos filtrables: {', '.join(sorted(permitidas))}",
+            )
+        if op not in OPERADORES:
+            raise HTTPException(status_code=400, detail=f"Operador no válido: '{op}'. Operadores: {', '.join(OPERADORES)}")
+        columna = permitidas[campo]
+        try:
+            if op == "in":
+                valores = [_convertir(columna, t.strip()) for t in texto.split(",") if t.strip()]
+                if not valores or len(valores) > MAX_VALORES_IN:
+                    raise ValueError(texto)
+                valor = valores
+            else:
+                valor = _convertir(columna, texto)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Valor no válido para '{clave}': '{texto}'")
+        predicados.append(((campo, op), valor))
+
+    orden = []
+    for parte in (sort or "").split(","):
+        parte = parte.strip()
+        if not parte:
+            continue
+        campo = parte.lstrip("-+")
+        columna = permitidas.get(campo)
+        # Las columnas con NULL no sirven para el cursor (keyset)
+        if columna is None or columna.nullable:
+            ordenables = ", ".join(n for n, c in permitidas.items() if not c.nullable)
+            raise HTTPException(status_code=400, detail=f"No se puede ordenar por '{campo}'. Campos: {ordenables}")
+        if campo not in (c for c, _ in orden):
+            orden.append((campo, parte.startswith("-")))
+    if "id" not in (c for c, _ in orden):
+        # El desempate va en el sentido de la última clave: con un solo sentido el
+        # cursor es una comparación de tuplas y el índice (que lleva id) da el orden
+        orden.append(("id", orden[-1][1] if orden else False))
+
+    predicados.sort(key=lambda p: p[0])
+    return Filtros(
+        predicados=tuple(p for p, _ in predicados),
+        valores=tuple(v for _, v in predicados),
+        orden=tuple(orden),
+    )
+
+
+def posicion(item: Any, columnas: Tuple[str, ...]) -> Tuple[Any, ...]:
+    """Valores de las columnas de orden de un item (modelo o dict): lo que guarda el cursor."""
+    if isinstance(item, dict):
+        return tuple(item[c] for c in columnas)
+    return tuple(getattr(item, c) for c in columnas)
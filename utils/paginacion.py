@@ -0,0 +1,78 @@
+"""
+Cursores opacos para paginación por keyset.
+
+El cursor codifica la posición de la última fila devuelta: su id ("id:N") o,
+con sort=, el orden y los valores de sus columnas ("k:{"o": "-kda,-id", "v": [...]}").
+La página siguiente filtra las filas posteriores a esa posición en lugar de
+saltarse filas con OFFSET. Un cursor solo vale para el orden con el que se
+generó: con otro sort= es un 400, no una página equivocada.
+"""
+import base64
+import binascii
+import json
+from typing import Any, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response
+
+from utils.filtros import posicion
+
+
+# Orden por defecto de los listados: (campo, descendente)
+ORDEN_ID: Tuple[Tuple[str, bool], ...] = (("id", False),)
+
+
+def texto_orden(orden: Sequence[Tuple[str, bool]]) -> str:
+    """Orden como en sort=: "-kda,-id"."""
+    return ",".join(("-" if desc else "") + campo for campo, desc in orden)
+
+
+def codificar_cursor(valores: Sequence[Any], orden: Sequence[Tuple[str, bool]] = ORDEN_ID) -> str:
+    """valores: posición en el orden del listado; (id,) para el orden por defecto."""
+    if tuple(orden) == ORDEN_ID:
+        texto = f"id:{valores[0]}"
+    else:
+        texto = "k:" + json.dumps({"o": texto_orden(orden), "v": list(valores)}, separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(texto.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(
+    cursor: Optional[str], orden: Sequence[Tuple[str, bool]] = ORDEN_ID
+) -> Optional[Tuple[Any, ...]]:
+    """Posición a partir de la cual continuar; 400 si el cursor no es válido o es de otro orden."""
+    if not cursor:
+        return None
+    try:
+        texto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        prefijo, valor = texto.split(":", 1)
+        if prefijo == "id":
+            valores, de_orden = (int(valor),), texto_orden(ORDEN_ID)
+        elif prefijo == "k":
+            datos = json.loads(valor)
+            if not isinstance(datos, dict) or not isinstance(datos.get("v"), list):
+                raise ValueError(valor)
+            valores, de_orden = tuple(datos["v"]), datos.get("o")
+        else:
+            raise ValueError(prefijo)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor no válido")
+    if de_orden != texto_orden(orden):
+        raise HTTPException(status_code=400, detail="Cursor no válido para este orden")
+    if len(valores) != len(orden):
+        raise HTTPException(status_code=400, detail="Cursor no válido")
+    return valores
+
+
+def anotar_siguiente_pagina(
+    request: Request, response: Response, items: list, limit: int, orden: Sequence[Tuple[str, bool]] = ORDEN_ID
+) -> None:
+    """
+    Añade X-Next-Cursor y Link rel="next" si la página vino llena.
+    - El cuerpo sigue siendo una lista, así los clientes con skip/limit no cambian.
+    - items pueden ser modelos o filas (dicts) de la ruta rápida.
+    """
+    if limit <= 0 or len(items) < limit:
+        return
+    cursor = codificar_cursor(posicion(items[-1], tuple(campo for campo, _ in orden)), orden)
+    siguiente = request.url.remove_query_params(["skip", "cursor"]).include_query_params(cursor=cursor)
+    response.headers["X-Next-Cursor"] = cursor
+    response.headers["Link"] = f'<{siguiente}>; rel="next"'
@@ -0,0 +1,63 @@
+"""
+Serialización JSON directa (sin pasar por los modelos pydantic).
+
+Con RESPUESTA_RAPIDA=1 los listados y los GET por id devuelven las filas tal
+como salen de la proyección SQL, codificadas con orjson: FastAPI no construye
+ni revalida un modelo por fila. Las rutas conservan su response_model, así que
+el esquema OpenAPI no cambia. Sin orjson instalado se usa json de la stdlib.
+
+?fields=id,name usa el mismo camino con solo esas columnas en el SELECT.
+"""
+import json
+import os
+from functools import lru_cache
+from typing import Any, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from sqlmodel import SQLModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+RESPUESTA_RAPIDA = os.getenv("RESPUESTA_RAPIDA", "0").lower() in ("1", "true", "yes")
+
+
+def a_json(contenido: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(contenido)
+    return json.dumps(contenido, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class RespuestaJSON(JSONResponse):
+    """JSONResponse que codifica con a_json (dicts y listas de filas, sin modelos)."""
+
+    def render(self, content: Any) -> bytes:
+        return a_json(content)
+
+
+def campos_publicos(model: Type[SQLModel]) -> Tuple[str, ...]:
+    return tuple(nombre for nombre, campo in model.model_fields.items() if not campo.exclude)
+
+
+@lru_cache(maxsize=256)
+def campos_pedidos(model: Type[SQLModel], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Columnas a seleccionar para ?fields=a,b (siempre con id, en el orden del modelo).
+    - Sin fields: todas con RESPUESTA_RAPIDA, o None (modelos completos y response_model).
+    - 400 si se pide un campo que el modelo no expone.
+    """
+    publicos = campos_publicos(model)
+    if not fields:
+        return publicos if RESPUESTA_RAPIDA else None
+    pedidos = {f.strip() for f in fields.split(",") if f.strip()}
+    desconocidos = sorted(pedidos - set(publicos))
+    if desconocidos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos no válidos: {', '.join(desconocidos)}. Disponibles: {', '.join(publicos)}",
+        )
+    pedidos.add("id")
+    return tuple(nombre for nombre in publicos if nombre in pedidos)
@@ -0,0 +1,155 @@
+"""
+Índices de nombres en memoria: prefijos para autocompletar y trigramas para
+búsqueda difusa.
+
+Por entidad se guarda un array ordenado de (clave, nombre, id); una búsqueda
+es un bisect al primer candidato y un recorrido corto mientras la clave empiece
+por el prefijo, sin tocar la BD. Cada palabra del nombre aporta su propia
+clave, así "sin" sugiere "Lee Sin".
+"""
+import bisect
+import heapq
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes: 'Ñúñez' y 'nunez' comparten clave."""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+
+def _claves(nombre: str) -> List[str]:
+    palabras = normalizar(nombre).split()
+    return list(dict.fromkeys(" ".join(palabras[i:]) for i in range(len(palabras))))
+
+
+class IndicePrefijos:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entradas: List[Tuple[str, str, int]] = []
+        self._nombres: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._nombres)
+
+    def cargar(self, filas: Iterable[Tuple[int, str]]) -> None:
+        nombres = {id_: nombre for id_, nombre in filas if nombre}
+        entradas = sorted((clave, nombre, id_) for id_, nombre in nombres.items() for clave in _claves(nombre))
+        with self._lock:
+            self._nombres, self._entradas = nombres, entradas
+
+    def poner(self, id_: int, nombre: Optional[str]) -> None:
+        """Alta, cambio de nombre o baja (nombre=None)."""
+        with self._lock:
+            anterior = self._nombres.pop(id_, None)
+            if anterior is not None:
+                for clave in _claves(anterior):
+                    i = bisect.bisect_left(self._entradas, (clave, anterior, id_))
+                    if i < len(self._entradas) and self._entradas[i] == (clave, anterior, id_):
+                        del self._entradas[i]
+            if nombre:
+                self._nombres[id_] = nombre
+                for clave in _claves(nombre):
+                    bisect.insort(self._entradas, (clave, nombre, id_))
+
+    def sugerir(self, prefijo: str, limit: int = 10) -> List[Tuple[int, str]]:
+        """(id, nombre) cuyo nombre o alguna de sus palabras empieza por el prefijo."""
+        p = normalizar(prefijo)
+        resultados: Dict[int, str] = {}
+        with self._lock:
+            i = bisect.bisect_left(self._entradas, (p,))
+            while i < len(self._entradas) and len(resultados) < limit:
+                clave, nombre, id_ = self._entradas[i]
+                if not clave.startswith(p):
+                    break
+                resultados.setdefault(id_, nombre)
+                i += 1
+        return list(resultados.items())
+
+
+def _trigramas(clave: str) -> set:
+    relleno = f"  {clave} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def distancia_edicion(a: str, b: str) -> int:
+    """Levenshtein clásico en O(len(a) * len(b)); solo se usa sobre unos pocos candidatos."""
+    if len(a) < len(b):
+        a, b = b, a
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i]
+        for j, cb in enumerate(b, 1):
+            actual.append(min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        anterior = actual
+    return anterior[-1]
+
+
+class IndiceDifuso:
+    """
+    Búsqueda tolerante a errores ("Fakr" -> "Faker") con listas invertidas de trigramas.
+    - Los candidatos salen de contar trigramas compartidos en las listas del texto buscado,
+      sin recorrer todos los nombres.
+    - La distancia de edición exacta solo se calcula sobre los mejores candidatos.
+    """
+
+    # Candidatos que pasan a la comparación exacta, por cada resultado pedido
+    CANDIDATOS_POR_RESULTADO = 5
+    MIN_CANDIDATOS = 50
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._claves: Dict[int, Tuple[str, str]] = {}   # id -> (clave, nombre)
+        self._listas: Dict[str, set] = {}                # trigrama -> ids
+
+    def __len__(self) -> int:
+        return len(self._claves)
+
+    def cargar(self, filas: Iterable[Tuple[int, str]]) -> None:
+        claves = {id_: (normalizar(nombre), nombre) for id_, nombre in filas if nombre}
+        listas: Dict[str, set] = {}
+        for id_, (clave, _) in claves.items():
+            for g in _trigramas(clave):
+                listas.setdefault(g, set()).add(id_)
+        with self._lock:
+            self._claves, self._listas = claves, listas
+
+    def poner(self, id_: int, nombre: Optional[str]) -> None:
+        with self._lock:
+            anterior = self._claves.pop(id_, None)
+            if anterior is not None:
+                for g in _trigramas(anterior[0]):
+                    ids = self._listas.get(g)
+                    if ids is not None:
+                        ids.discard(id_)
+                        if not ids:
+                            del self._listas[g]
+            if nombre:
+                clave = normalizar(nombre)
+                self._claves[id_] = (clave, nombre)
+                for g in _trigramas(clave):
+                    self._listas.setdefault(g, set()).add(id_)
+
+    def buscar(self, texto: str, limit: int = 10, min_score: float = 0.5) -> List[Tuple[int, str, float]]:
+        """(id, nombre, score) ordenados por similitud; score = 1 - distancia / longitud mayor."""
+        consulta = normalizar(texto).strip()
+        if not consulta:
+            return []
+        with self._lock:
+            compartidos: Dict[int, int] = {}
+            for g in _trigramas(consulta):
+                for id_ in self._listas.get(g, ()):
+                    compartidos[id_] = compartidos.get(id_, 0) + 1
+            n = max(self.MIN_CANDIDATOS, limit * self.CANDIDATOS_POR_RESULTADO)
+            candidatos = heapq.nlargest(n, compartidos, key=compartidos.__getitem__)
+            claves = [(id_, *self._claves[id_]) for id_ in candidatos]
+
+        resultados = []
+        for id_, clave, nombre in claves:
+            score = 1 - distancia_edicion(consulta, clave) / max(len(consulta), len(clave))
+            if score >= min_score:
+                resultados.append((id_, nombre, round(score, 3)))
+        resultados.sort(key=lambda r: (-r[2], r[1]))
+        return resultados[:limit]